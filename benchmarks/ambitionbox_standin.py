@@ -0,0 +1,146 @@
+"""
+Local stand-in for AmbitionBox used by the scraper benchmarks.
+
+Serves `/reviews/<slug>-reviews?page=N` from saved HTML pages (`page_<N>.html` in a
+directory) or, when no directory is given, from pages rendered out of the review
+backup CSV in the same markup AmbitionBox uses. Pages past the last one come back
+without review markup, exactly like the real site. Responses carry an ETag and
+honour If-None-Match; `fail_every=N` answers the first request for every Nth
+page with a 503 to exercise retries. The scraper tests also use it:
+`page_latency` delays individual pages (so they complete out of order),
+`fail_pages` answers those pages with a 500 every time, and the server's
+`request_log` records (monotonic time, page) for every request received.
+"""
+import hashlib
+import html
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BACKUP_REVIEWS = sorted((PROJECT_ROOT / "Backup" / "reviews").glob("*.csv"))
+
+EMPTY_PAGE = b"<html><body><p>No reviews</p></body></html>"
+
+
+def render_review_page(rows):
+    """Render review records (scraper output dicts) as an AmbitionBox-style page."""
+    blocks = []
+    for r in rows:
+        rid = html.escape(str(r["ReviewID"]))
+        body = f"Likes: {r['Pros']}" + (f" Dislikes: {r['Cons']}" if r["Cons"] else "")
+        blocks.append(
+            f'<span itemscope itemtype="https://schema.org/Review" id="{rid}">'
+            f'<span itemprop="itemReviewed" itemscope itemtype="https://schema.org/Organization">'
+            f'<meta itemprop="name" content="{html.escape(str(r["Company"]))}"></span>'
+            f'<span itemprop="author" itemscope itemtype="https://schema.org/Person">'
+            f'<meta itemprop="jobTitle" content="{html.escape(str(r["JobTitle"]))}">'
+            f'<meta itemprop="workLocation" content="{html.escape(str(r["Location"]))}"></span>'
+            f'<meta itemprop="datePublished" content="{html.escape(str(r["ReviewDate"]))}">'
+            f'<span itemprop="reviewRating" itemscope itemtype="https://schema.org/Rating">'
+            f'<meta itemprop="ratingValue" content="{html.escape(str(r["OverallRating"]))}"></span>'
+            f'<span itemprop="reviewBody">{html.escape(body)}</span></span>'
+            f'<div id="{rid}" class="review-card"><h2>{html.escape(str(r["JobTitle"]))}</h2>'
+            f'<div class="flex mt-1"><p>{html.escape(str(r["Location"]))}</p>'
+            f'<p>{html.escape(str(r["Department"]))}</p></div>'
+            f'<div class="body"><p>{html.escape(str(r["Pros"]))}</p><p>{html.escape(str(r["Cons"]))}</p></div></div>'
+        )
+    return ("<html><head><title>Reviews</title></head><body><main>"
+            + "".join(blocks) + "</main></body></html>").encode("utf-8")
+
+
+def sample_pages(num_pages, per_page=10):
+    """Render `num_pages` pages from the backed-up reviews, cycling through them."""
+    df = pd.read_csv(BACKUP_REVIEWS[-1]).fillna("")
+    records = df.to_dict("records")
+    pages = []
+    for page in range(num_pages):
+        rows = []
+        for i in range(per_page):
+            r = dict(records[(page * per_page + i) % len(records)])
+            r["ReviewID"] = f"{r['ReviewID']}-{page}-{i}"
+            rows.append(r)
+        pages.append(render_review_page(rows))
+    return pages
+
+
+def load_pages(pages_dir=None, num_pages=20):
+    """
+    Saved pages from `pages_dir` (page_1.html, page_2.html, ... or a scraper page cache,
+    e.g. data/page_cache) or rendered samples.
+    """
+    if pages_dir and (Path(pages_dir) / "refs").exists():
+        from etl.page_cache import PageCache, read_blob
+        cache = PageCache(pages_dir)
+        return [read_blob(blob) for slug in cache.companies() for _, blob in cache.pages(slug)]
+    if pages_dir:
+        files = sorted(Path(pages_dir).glob("page_*.html"), key=lambda p: int(p.stem.split("_")[1]))
+        return [f.read_bytes() for f in files]
+    return sample_pages(num_pages)
+
+
+def serve(pages, latency=0.0, port=0, fail_every=0, page_latency=None, fail_pages=()):
+    """Start the stand-in on a background thread; returns (server, root_url)."""
+    failed_once = set()
+    lock = threading.Lock()
+    request_log = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            page = int(query.get("page", ["1"])[0])
+            with lock:
+                request_log.append((time.monotonic(), page))
+            time.sleep((page_latency or {}).get(page, latency))
+
+            if page in fail_pages:
+                self.send_response(500)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            with lock:
+                should_fail = fail_every and page % fail_every == 0 and self.path not in failed_once
+                failed_once.add(self.path)
+            if should_fail:
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            body = pages[page - 1] if 1 <= page <= len(pages) else EMPTY_PAGE
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.request_log = request_log
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
+
+
+if __name__ == "__main__":
+    server, url = serve(load_pages(), port=8765)
+    print(f"Serving AmbitionBox stand-in at {url}/reviews/<slug>-reviews?page=N")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
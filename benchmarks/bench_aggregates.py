@@ -0,0 +1,87 @@
+"""
+Report KPIs from the full merged_data table vs. from the hr_kpi_monthly aggregates
+that push.py maintains (etl/aggregates.py).
+
+    PYTHONPATH=. python benchmarks/bench_aggregates.py --url postgresql+psycopg2://postgres@localhost/bench
+
+Loads --rows fake rows into a scratch schema (bench_aggregates, dropped and
+recreated) through push.push_to_database in batches of --batch rows. It then
+times, and checks for identical results:
+
+- reading merged_data and running Email_Report.compute_kpis and
+  department_summary;
+- reading the aggregates and deriving the same numbers from them.
+
+It also times one incremental push against a full rebuild of the aggregates.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from benchmarks.bench_fake_rows import seed_frame
+from etl import push
+from etl.aggregates import (department_summary_from_aggregates, kpis_from_aggregates, read_aggregates,
+                            rebuild_aggregates)
+from etl.data_merger import generate_fake_rows
+from etl.Email_Report import compute_kpis, department_summary
+from etl.id_index import IdIndex
+
+REPORT_COLUMNS = ["department", "status", "performance_rating", "engagement_score", "age", "name",
+                  "joining_date", "exit_date"]
+
+
+def from_rows(conn):
+    df = pd.read_sql(text(f"SELECT {', '.join(REPORT_COLUMNS)} FROM merged_data"), conn)
+    df["tenure_years"] = (pd.to_datetime(df["exit_date"]) - pd.to_datetime(df["joining_date"])).dt.days / 365.25
+    df["status"] = df["status"].str.lower()
+    return compute_kpis(df), department_summary(df)
+
+
+def from_aggregates(conn):
+    agg = read_aggregates(conn)
+    return kpis_from_aggregates(agg), department_summary_from_aggregates(agg)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", required=True, help="disposable PostgreSQL database")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=250_000)
+    args = parser.parse_args()
+    engine = create_engine(args.url, connect_args={"options": "-csearch_path=bench_aggregates"})
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA IF EXISTS bench_aggregates CASCADE"))
+        conn.execute(text("CREATE SCHEMA bench_aggregates"))
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        pushed_ids = IdIndex(Path(tmp) / "pushed_ids.npy")
+        for start in range(0, args.rows, args.batch):
+            push.push_to_database(engine, generate_fake_rows(min(args.batch, args.rows - start), seed_frame(), rng),
+                                  pushed_ids)
+        increment, _ = timed(push.push_to_database, engine, generate_fake_rows(250, seed_frame(), rng), pushed_ids)
+
+    with engine.connect() as conn:
+        full, (kpis, summary) = timed(from_rows, conn)
+        fast, (agg_kpis, agg_summary) = timed(from_aggregates, conn)
+        aggregate_rows = conn.execute(text("SELECT COUNT(*) FROM hr_kpi_monthly")).scalar()
+    assert kpis == agg_kpis, (kpis, agg_kpis)
+    pd.testing.assert_frame_equal(summary.reset_index(drop=True), agg_summary, check_dtype=False)
+    with engine.begin() as conn:
+        rebuild, _ = timed(rebuild_aggregates, conn)
+
+    print(f"\n{args.rows + 250:,} rows in merged_data, {aggregate_rows:,} aggregate rows")
+    print(f"KPIs + department summary from merged_data: {full:.2f}s")
+    print(f"KPIs + department summary from aggregates:  {fast:.3f}s ({full / fast:.0f}x), identical results")
+    print(f"push of 250 rows incl. aggregate delta: {increment:.2f}s; full aggregate rebuild: {rebuild:.2f}s")
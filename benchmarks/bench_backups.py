@@ -0,0 +1,52 @@
+"""
+Backup/ growth over repeated pipeline runs: full timestamped CSV copies vs. the
+deduplicated BackupStore (etl/backup_store.py).
+
+    PYTHONPATH=. python benchmarks/bench_backups.py --rows 500000 --runs 10 --growth 0.01
+
+Each run appends --growth x rows to the dataset and backs it up both ways; the
+last snapshot is restored and compared with the frame it was taken from.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_fake_rows import seed_frame
+from etl.backup_store import BackupStore
+from etl.data_merger import generate_fake_rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--growth", type=float, default=0.01)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    df = generate_fake_rows(args.rows, seed_frame(), rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir, store = Path(tmp) / "legacy", BackupStore(Path(tmp) / "store")
+        legacy_dir.mkdir()
+        legacy_t = store_t = 0.0
+        print(f"{'run':>4} {'rows':>10} {'legacy MB':>10} {'store MB':>9}")
+        for run in range(args.runs):
+            if run:
+                df = pd.concat([df, generate_fake_rows(int(args.rows * args.growth), seed_frame(), rng)],
+                               ignore_index=True)
+            start = time.perf_counter()
+            df.to_csv(legacy_dir / f"reviews_enriched_{run:03d}.csv", index=False)
+            legacy_t += time.perf_counter() - start
+            start = time.perf_counter()
+            store.snapshot(df, f"reviews_enriched_{run:03d}")
+            store_t += time.perf_counter() - start
+            legacy_mb = sum(p.stat().st_size for p in legacy_dir.iterdir()) / 1e6
+            print(f"{run:>4} {len(df):>10,} {legacy_mb:>10.1f} {store.size() / 1e6:>9.1f}")
+
+        restored = store.restore(f"reviews_enriched_{args.runs - 1:03d}")
+        pd.testing.assert_frame_equal(restored, df, check_dtype=False)
+
+    print(f"backup time: legacy {legacy_t:.1f}s, store {store_t:.1f}s; restore matches the last frame")
@@ -0,0 +1,58 @@
+"""
+Rows/sec of DataFrame.to_sql (the old push path) vs. etl/db_loader.load_dataframe.
+
+    PYTHONPATH=. python benchmarks/bench_db_loader.py --url postgresql+psycopg2://postgres@localhost/bench
+
+Needs a disposable database: merged_data is created if missing and emptied
+before every load. With a non-PostgreSQL URL (e.g. sqlite:///bench.db) the
+loader's executemany fallback is measured instead of COPY.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from benchmarks.bench_fake_rows import seed_frame
+from etl.data_merger import generate_fake_rows
+from etl.db_loader import ensure_schema, load_dataframe
+
+
+def timed_load(engine, load):
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM merged_data"))
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+    with engine.connect() as conn:
+        count = conn.execute(text("SELECT COUNT(*) FROM merged_data")).scalar()
+    return elapsed, count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=os.getenv("BENCH_DATABASE_URL", "sqlite:///bench_db_loader.db"))
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--legacy-max", type=int, default=1_000_000,
+                        help="skip to_sql above this many rows")
+    args = parser.parse_args()
+    engine = create_engine(args.url)
+    ensure_schema(engine)
+
+    print(f"dialect: {engine.dialect.name}")
+    print(f"{'rows':>10} {'to_sql rows/s':>14} {'loader rows/s':>14} {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        df = generate_fake_rows(size, seed_frame(), np.random.default_rng(size))
+        legacy = "-"
+        loader_t, count = timed_load(engine, lambda: load_dataframe(df, "merged_data", engine))
+        assert count == size
+        if size <= args.legacy_max:
+            legacy_t, count = timed_load(
+                engine, lambda: df.to_sql("merged_data", engine, if_exists="append", index=False))
+            assert count == size
+            legacy = f"{size / legacy_t:,.0f}"
+            speedup = f"{legacy_t / loader_t:.1f}x"
+        else:
+            speedup = "-"
+        print(f"{size:>10,} {legacy:>14} {size / loader_t:>14,.0f} {speedup:>8}")
@@ -0,0 +1,90 @@
+"""
+Throughput of the batched generate_fake_rows vs. the original per-row Faker loop.
+
+    PYTHONPATH=. python benchmarks/bench_fake_rows.py --rows 1000000
+
+The loop is timed on --legacy-rows and reported as rows/sec.
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from faker import Faker
+
+from etl.data_merger import fake_text_pool, generate_fake_rows
+
+COLUMNS = ["review_id", "company", "job_title", "department", "location", "review_date", "overall_rating",
+           "pros", "cons", "employee_id", "name", "status", "joining_date", "exit_date", "engagement_score",
+           "performance_rating", "salary_band", "gender", "age"]
+
+
+def legacy_generate_fake_rows(n, real_df, fake):
+    """The original per-row implementation (kept for comparison)."""
+    job_titles = real_df["job_title"].dropna().unique().tolist()
+    departments = real_df["department"].dropna().unique().tolist()
+    locations = real_df["location"].dropna().unique().tolist()
+    salary_bands = real_df["salary_band"].dropna().unique().tolist()
+    today = date.today()
+    rows = []
+    for _ in range(n):
+        joining_date = fake.date_between(start_date="-10y", end_date="-1y")
+        status = random.choices(["Active", "Exited"], weights=[0.6, 0.4])[0]
+        if status == "Exited":
+            min_exit_date = joining_date + timedelta(days=400)
+            exit_date = fake.date_between(start_date=min_exit_date, end_date=today) if min_exit_date < today else pd.NaT
+        else:
+            exit_date = pd.NaT
+        rows.append([
+            f"reviews-{uuid.uuid4().hex}", "Nineleaps Technology Solutions", random.choice(job_titles),
+            random.choice(departments), random.choice(locations),
+            fake.date_between(start_date=joining_date, end_date="today"),
+            random.choices([1, 2, 3, 4, 5], weights=[5, 10, 25, 35, 25])[0], fake.sentence(nb_words=5),
+            fake.sentence(nb_words=5), f"FAKE{random.randint(10000, 99999)}", fake.name(), status, joining_date,
+            exit_date, round(random.uniform(4, 9), 1), random.choice([1, 2, 3, 4, 5]), random.choice(salary_bands),
+            random.choice(["Male", "Female"]), random.randint(22, 55),
+        ])
+    return pd.DataFrame(rows, columns=real_df.columns)
+
+
+def seed_frame():
+    return pd.DataFrame([
+        ["r1", "Nineleaps Technology Solutions", "Data Engineer", "IT Support", "Bangalore / Bengaluru",
+         "2024-12-18", 2, "p", "c", "EMP0001", "Diya Iyer", "Active", "2020-06-25", None, 4.4, 5, "B", "Female", 31],
+        ["r2", "Nineleaps Technology Solutions", "SDE", "Software Development", "Hyderabad / Secunderabad",
+         "2025-01-31", 5, "p", "c", "EMP0002", "Ishaan Sharma", "Exited", "2021-09-27", "2023-01-02", 6.5, 5, "A",
+         "Male", 45],
+    ], columns=COLUMNS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--legacy-rows", type=int, default=20_000)
+    args = parser.parse_args()
+    real_df = seed_frame()
+
+    start = time.perf_counter()
+    legacy_generate_fake_rows(args.legacy_rows, real_df, Faker())
+    legacy_rate = args.legacy_rows / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    fake_text_pool()
+    pool_t = time.perf_counter() - start
+    start = time.perf_counter()
+    df = generate_fake_rows(args.rows, real_df, np.random.default_rng(0))
+    batched_t = time.perf_counter() - start
+
+    exited = df["status"].eq("Exited")
+    assert df["exit_date"][~exited].isna().all()
+    with_exit = df[exited & df["exit_date"].notna()]
+    assert (with_exit["exit_date"] >= with_exit["joining_date"] + pd.Timedelta(days=400)).all()
+    assert df["review_id"].is_unique
+
+    print(f"text pool build: {pool_t:.2f}s (once per process)")
+    print(f"{'path':>8} {'rows':>10} {'rows/s':>12}")
+    print(f"{'loop':>8} {args.legacy_rows:>10,} {legacy_rate:>12,.0f}")
+    print(f"{'batched':>8} {args.rows:>10,} {args.rows / batched_t:>12,.0f}   ({args.rows / batched_t / legacy_rate:.0f}x)")
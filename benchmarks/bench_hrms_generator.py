@@ -0,0 +1,72 @@
+"""
+Rows/sec of the vectorised HRMS generator vs. the original per-employee loop.
+
+    PYTHONPATH=. python benchmarks/bench_hrms_generator.py --rows 1000000
+"""
+import argparse
+import datetime
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from etl.internal_hrms_data_generator import (
+    ATTRITION_REASONS, DEPARTMENTS, DESIGNATIONS, INDIAN_NAMES, LOCATIONS, SALARY_BANDS, generate_hrms_rows,
+)
+
+
+def legacy_generate(first_emp_id, count):
+    """The original random.choice / timedelta loop (kept for comparison)."""
+    start_date = datetime.date(2018, 1, 1)
+    end_date = datetime.date(2025, 1, 1)
+    data = []
+    for emp_id in range(first_emp_id, first_emp_id + count):
+        joining = start_date + datetime.timedelta(days=random.randint(0, 2000))
+        is_exited = random.choice([True, False])
+        exit_date = joining + datetime.timedelta(days=random.randint(200, 2000)) if is_exited else None
+        if exit_date and exit_date > end_date:
+            exit_date = None
+            is_exited = False
+        data.append({
+            "employee_id": f"EMP{emp_id:04d}",
+            "name": random.choice(INDIAN_NAMES) + " " + random.choice(['Sharma', 'Reddy', 'Patel', 'Iyer', 'Nair', 'Singh']),
+            "department": random.choice(DEPARTMENTS),
+            "location": random.choice(LOCATIONS),
+            "designation": random.choice(DESIGNATIONS),
+            "joining_date": joining,
+            "exit_date": exit_date,
+            "status": "Exited" if is_exited else "Active",
+            "attrition_reason": random.choice(ATTRITION_REASONS) if is_exited else "",
+            "engagement_score": round(random.uniform(4, 9), 1),
+            "performance_rating": random.randint(1, 5),
+            "salary_band": random.choice(SALARY_BANDS),
+            "gender": random.choice(['Male', 'Female']),
+            "age": random.randint(22, 50)
+        })
+    return pd.DataFrame(data)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    df = fn(*args)
+    return df, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    legacy_df, legacy_t = timed(legacy_generate, 1, args.rows)
+    fast_df, fast_t = timed(lambda n: generate_hrms_rows(1, n, np.random.default_rng(42)), args.rows)
+
+    assert list(legacy_df.columns) == list(fast_df.columns)
+    for name, df in (("loop", legacy_df), ("numpy", fast_df)):
+        exited = df["status"].eq("Exited")
+        print(f"{name:>6}: exited {exited.mean():.3f}, mean engagement {df['engagement_score'].mean():.2f}, "
+              f"mean age {df['age'].mean():.1f}")
+
+    print(f"\n{'path':>6} {'seconds':>8} {'rows/s':>12}")
+    print(f"{'loop':>6} {legacy_t:>8.2f} {args.rows / legacy_t:>12,.0f}")
+    print(f"{'numpy':>6} {fast_t:>8.2f} {args.rows / fast_t:>12,.0f}   ({legacy_t / fast_t:.0f}x)")
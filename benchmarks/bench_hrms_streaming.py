@@ -0,0 +1,44 @@
+"""
+Peak RSS of in-memory vs. streamed HRMS generation as the employee count grows.
+
+    PYTHONPATH=. python benchmarks/bench_hrms_streaming.py --rows 500000 1000000 2000000
+
+Each run happens in a fresh subprocess so ru_maxrss reflects only that run.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+CHILD = """
+import json, resource, sys, time
+import numpy as np
+from pathlib import Path
+from etl.internal_hrms_data_generator import generate_hrms_rows, stream_hrms_dummy_data
+mode, rows, out_dir, fmt = sys.argv[1], int(sys.argv[2]), sys.argv[3], sys.argv[4]
+start = time.perf_counter()
+if mode == "memory":
+    generate_hrms_rows(1, rows, np.random.default_rng(0)).to_csv(Path(out_dir) / "hrms_latest.csv", index=False)
+else:
+    stream_hrms_dummy_data(rows, output_format=fmt, seed=0, data_dir=out_dir, backup=False)
+print(json.dumps({"seconds": time.perf_counter() - start,
+                  "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[250_000, 1_000_000, 2_000_000])
+    parser.add_argument("--format", default="csv", choices=["csv", "parquet"])
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    print(f"{'rows':>10} {'mode':>8} {'seconds':>8} {'peak MB':>8}")
+    for rows in args.rows:
+        for mode in ("memory", "stream"):
+            with tempfile.TemporaryDirectory() as out_dir:
+                out = subprocess.run([sys.executable, "-c", CHILD, mode, str(rows), out_dir, args.format],
+                                     capture_output=True, text=True, env=env, check=True)
+                result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{rows:>10} {mode:>8} {result['seconds']:>8.2f} {result['peak_mb']:>8.0f}")
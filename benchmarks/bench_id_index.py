@@ -0,0 +1,72 @@
+"""
+Freshness checks against the persistent IdIndex vs. re-reading reviews_enriched_latest.csv.
+
+    PYTHONPATH=. python benchmarks/bench_id_index.py --existing 1000000 --fresh 5000
+
+Writes a synthetic enriched CSV with --existing rows to a temp dir, then times the
+original check (parse the CSV with dates, build a set, isin) against loading the
+.npy index and looking up the same candidate ids.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from etl.id_index import IdIndex
+
+
+def enriched_frame(n, rng):
+    dates = np.datetime64("2020-01-01") + rng.integers(0, 1500, n).astype("timedelta64[D]")
+    return pd.DataFrame({
+        "review_id": np.char.add("review-", np.arange(10_000_000, 10_000_000 + n).astype(str)),
+        "company": "Nineleaps Technology Solutions",
+        "department": "Engineering",
+        "review_date": dates,
+        "overall_rating": rng.integers(1, 6, n),
+        "pros": "Good learning curve and supportive team",
+        "cons": "Long hours near releases",
+        "joining_date": dates - 400,
+        "exit_date": dates + 30,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--existing", type=int, default=1_000_000)
+    parser.add_argument("--fresh", type=int, default=5_000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        existing = enriched_frame(args.existing, rng)
+        existing.to_csv(tmp / "reviews_enriched_latest.csv", index=False)
+        IdIndex(tmp / "merged_ids.npy").add(existing["review_id"])
+        # Half already merged, half new
+        candidates = pd.Series(np.concatenate([
+            rng.choice(existing["review_id"].values, args.fresh),
+            np.char.add("review-", np.arange(90_000_000, 90_000_000 + args.fresh).astype(str)),
+        ]))
+
+        start = time.perf_counter()
+        df = pd.read_csv(tmp / "reviews_enriched_latest.csv", parse_dates=["review_date", "joining_date", "exit_date"])
+        csv_hit = candidates.isin(set(df["review_id"])).values
+        csv_t = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = IdIndex(tmp / "merged_ids.npy")
+        load_t = time.perf_counter() - start
+        start = time.perf_counter()
+        index_hit = index.contains(candidates)
+        lookup_t = time.perf_counter() - start
+
+    assert (csv_hit == index_hit).all()
+    assert index_hit.sum() == args.fresh
+
+    print(f"{'path':>10} {'seconds':>9} {'us/id':>8}")
+    print(f"{'csv+set':>10} {csv_t:>9.3f} {csv_t / len(candidates) * 1e6:>8.2f}")
+    print(f"{'index':>10} {load_t + lookup_t:>9.3f} {lookup_t / len(candidates) * 1e6:>8.2f}"
+          f"   (load {load_t:.3f}s, {csv_t / (load_t + lookup_t):.0f}x)")
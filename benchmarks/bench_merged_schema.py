@@ -0,0 +1,114 @@
+"""
+Reporting queries against merged_data in three shapes: the original TEXT-dated,
+unindexed table; the same table after etl/migrate_schema.py; and after
+`migrate_schema.py --partition`.
+
+    PYTHONPATH=. python benchmarks/bench_merged_schema.py --url postgresql+psycopg2://postgres@localhost/bench
+
+Each shape is built in its own schema (bench_text, bench_typed,
+bench_partitioned), which is dropped and recreated on every run. The same
+fake rows are loaded into all three. The migrated tables are then re-checked
+with an upsert of already-present and new rows.
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from benchmarks.bench_fake_rows import seed_frame
+from etl.data_merger import generate_fake_rows
+from etl.db_loader import load_dataframe, upsert_dataframe
+from etl.migrate_schema import migrate
+
+LEGACY_SCHEMA = """
+CREATE TABLE merged_data (
+    review_id TEXT PRIMARY KEY, company TEXT, job_title TEXT, department TEXT, location TEXT,
+    review_date TEXT, overall_rating REAL, pros TEXT, cons TEXT, employee_id TEXT, name TEXT,
+    status TEXT, joining_date TEXT, exit_date TEXT, engagement_score REAL, performance_rating INTEGER,
+    salary_band TEXT, gender TEXT, age INTEGER
+)
+"""
+
+# (name, query on the TEXT table, query on the typed table)
+QUERIES = [
+    ("attrition by department",
+     "SELECT department, COUNT(*) FILTER (WHERE status = 'Exited'), COUNT(*) FROM merged_data GROUP BY department",
+     None),
+    ("exits in one department",
+     "SELECT COUNT(*) FROM merged_data WHERE department = :department AND status = 'Exited'",
+     None),
+    ("reviews per month, last 90 days",
+     "SELECT date_trunc('month', review_date::date), COUNT(*) FROM merged_data "
+     "WHERE review_date::date >= CURRENT_DATE - 90 GROUP BY 1",
+     "SELECT date_trunc('month', review_date), COUNT(*) FROM merged_data "
+     "WHERE review_date >= CURRENT_DATE - 90 GROUP BY 1"),
+    ("exits per month, last year",
+     "SELECT date_trunc('month', exit_date::date), COUNT(*) FROM merged_data "
+     "WHERE exit_date <> '' AND exit_date::date >= CURRENT_DATE - 365 GROUP BY 1",
+     "SELECT date_trunc('month', exit_date), COUNT(*) FROM merged_data "
+     "WHERE exit_date >= CURRENT_DATE - 365 GROUP BY 1"),
+    ("employee lookup",
+     "SELECT * FROM merged_data WHERE employee_id = :employee_id",
+     None),
+]
+
+
+def build(url, schema, df, partition=None):
+    """Engine bound to a fresh `schema` holding the rows of `df`, migrated unless partition is None."""
+    engine = create_engine(url, connect_args={"options": f"-csearch_path={schema}"})
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+        conn.execute(text(LEGACY_SCHEMA))
+    load_dataframe(df, "merged_data", engine)
+    elapsed = None
+    if partition is not None:
+        start = time.perf_counter()
+        migrate(engine, partition=partition)
+        elapsed = time.perf_counter() - start
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE merged_data"))
+    return engine, elapsed
+
+
+def run_queries(engine, typed, params, repeat):
+    timings = {}
+    with engine.connect() as conn:
+        for name, legacy_sql, typed_sql in QUERIES:
+            sql = (typed_sql or legacy_sql) if typed else legacy_sql
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                samples.append(time.perf_counter() - start)
+            timings[name] = statistics.median(samples) * 1000
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", required=True, help="disposable PostgreSQL database")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    df = generate_fake_rows(args.rows, seed_frame(), rng)
+    params = {"department": df["department"].iloc[0], "employee_id": df["employee_id"].iloc[0]}
+
+    shapes = {}
+    for schema, partition in (("bench_text", None), ("bench_typed", False), ("bench_partitioned", True)):
+        engine, migration = build(args.url, schema, df, partition)
+        shapes[schema] = run_queries(engine, partition is not None, params, args.repeat)
+        if migration is not None:
+            print(f"{schema}: migration took {migration:.1f}s")
+            batch = pd.concat([generate_fake_rows(1000, seed_frame(), rng), df.iloc[:1000]])
+            result = upsert_dataframe(batch, "merged_data", engine)
+            assert (result["inserted"], result["skipped"]) == (1000, 1000), result
+
+    print(f"\n{args.rows:,} rows, median of {args.repeat} runs (ms)")
+    print(f"{'query':34}" + "".join(f"{schema:>20}" for schema in shapes))
+    for name, _, _ in QUERIES:
+        print(f"{name:34}" + "".join(f"{timings[name]:>20.1f}" for timings in shapes.values()))
@@ -0,0 +1,72 @@
+"""
+Review -> employee matching: group index vs. the original per-review filter + sample.
+
+    PYTHONPATH=. python benchmarks/bench_merger_matching.py --reviews 100000 --employees 1000000
+
+The original loop is O(reviews x employees), so it is timed on --legacy-sample reviews
+and extrapolated to the full review count.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from etl.data_merger import HRMSGroupIndex
+from etl.internal_hrms_data_generator import DEPARTMENTS, LOCATIONS, generate_hrms_rows
+
+
+def legacy_match(df_reviews, df_hrms):
+    mapped = []
+    for _, review in df_reviews.iterrows():
+        dept_loc_employees = df_hrms[
+            (df_hrms['department'].str.lower() == review['Department'].lower()) &
+            (df_hrms['location'].str.lower() == str(review['Location']).lower())
+        ]
+        if not dept_loc_employees.empty:
+            mapped_emp = dept_loc_employees.sample(1).iloc[0]
+        else:
+            dept_employees = df_hrms[df_hrms['department'].str.lower() == review['Department'].lower()]
+            mapped_emp = dept_employees.sample(1).iloc[0] if not dept_employees.empty else df_hrms.sample(1).iloc[0]
+        mapped.append(mapped_emp['employee_id'])
+    return mapped
+
+
+def make_reviews(n, rng):
+    # Mostly matching keys, plus unknown locations/departments to exercise both fallbacks
+    departments = np.array(DEPARTMENTS + ["Unknown Department"], dtype=object)
+    locations = np.array(LOCATIONS + ["Remote"], dtype=object)
+    return pd.DataFrame({
+        "Department": departments[rng.integers(0, len(departments), n)],
+        "Location": locations[rng.integers(0, len(locations), n)],
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument("--employees", type=int, default=1_000_000)
+    parser.add_argument("--legacy-sample", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df_hrms = generate_hrms_rows(1, args.employees, rng)
+    df_reviews = make_reviews(args.reviews, rng)
+
+    start = time.perf_counter()
+    index = HRMSGroupIndex(df_hrms)
+    build_t = time.perf_counter() - start
+    start = time.perf_counter()
+    positions = index.draw(df_reviews["Department"], df_reviews["Location"], rng)
+    draw_t = time.perf_counter() - start
+    assert len(positions) == args.reviews
+
+    sample = df_reviews.head(args.legacy_sample)
+    start = time.perf_counter()
+    legacy_match(sample, df_hrms)
+    legacy_per_review = (time.perf_counter() - start) / len(sample)
+
+    print(f"{args.reviews:,} reviews x {args.employees:,} employees")
+    print(f"  group index: build {build_t:.2f}s + draw {draw_t:.2f}s = {build_t + draw_t:.2f}s")
+    print(f"  legacy loop: {legacy_per_review * 1000:.0f} ms/review -> ~{legacy_per_review * args.reviews / 3600:.1f} h "
+          f"(extrapolated from {len(sample)} reviews)")
@@ -0,0 +1,41 @@
+"""
+Scaling of sharded review enrichment over 1, 2, 4 and 8 worker processes.
+
+    PYTHONPATH=. python benchmarks/bench_merger_sharded.py --reviews 1000000 --employees 1000000
+
+Also checks that every worker count yields exactly the same matches for one seed.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_merger_matching import make_reviews
+from etl.data_merger import HRMSGroupIndex, match_reviews_sharded
+from etl.internal_hrms_data_generator import generate_hrms_rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=1_000_000)
+    parser.add_argument("--employees", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df_hrms = generate_hrms_rows(1, args.employees, rng)
+    df_reviews = make_reviews(args.reviews, rng)
+    index = HRMSGroupIndex(df_hrms)
+    u = np.random.default_rng(42).random(args.reviews)
+
+    start = time.perf_counter()
+    reference = index.positions(df_reviews["Department"], df_reviews["Location"], u)
+    inline_t = time.perf_counter() - start
+    print(f"{args.reviews:,} reviews x {args.employees:,} employees")
+    print(f"{'workers':>8} {'seconds':>8} {'speedup':>8}")
+    print(f"{'inline':>8} {inline_t:>8.2f} {1:>7.1f}x")
+    for workers in args.workers:
+        start = time.perf_counter()
+        positions = match_reviews_sharded(index, df_reviews["Department"], df_reviews["Location"], u, workers)
+        elapsed = time.perf_counter() - start
+        assert np.array_equal(positions, reference), f"{workers} workers diverged from the inline result"
+        print(f"{workers:>8} {elapsed:>8.2f} {inline_t / elapsed:>7.1f}x")
@@ -0,0 +1,41 @@
+"""
+Parity check and pages/sec for each review parser backend.
+
+    PYTHONPATH=. python benchmarks/bench_parsers.py [--pages-dir saved_pages/]
+
+Every page is parsed by every backend and the records must be identical before
+any timing is reported.
+"""
+import argparse
+import time
+
+from benchmarks.ambitionbox_standin import EMPTY_PAGE, load_pages
+from etl.review_parsers import PARSER_BACKENDS, lxml_html, parse_reviews_page
+
+
+def check_parity(pages):
+    backends = [b for b in PARSER_BACKENDS if b != "lxml" or lxml_html is not None]
+    for i, page in enumerate(pages + [EMPTY_PAGE, b""]):
+        results = {b: parse_reviews_page(page, b) for b in backends}
+        reference = results[backends[0]]
+        for backend, records in results.items():
+            assert records == reference, f"page {i + 1}: {backend} differs from {backends[0]}"
+    return backends
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages-dir", help="directory of saved page_<N>.html files")
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages_dir, args.pages)
+    backends = check_parity(pages)
+    print(f"Parity OK on {len(pages)} pages for backends: {', '.join(backends)}\n")
+
+    print(f"{'backend':>8} {'pages/s':>9} {'reviews/s':>10}")
+    for backend in backends:
+        start = time.perf_counter()
+        reviews = sum(len(parse_reviews_page(page, backend) or []) for page in pages)
+        elapsed = time.perf_counter() - start
+        print(f"{backend:>8} {len(pages) / elapsed:>9.1f} {reviews / elapsed:>10.0f}")
@@ -0,0 +1,86 @@
+"""
+Push wall time with the database and Sheets sinks run one after the other vs.
+concurrently through etl/sinks.run_sinks.
+
+    PYTHONPATH=. python benchmarks/bench_push_fanout.py --url postgresql+psycopg2://postgres@localhost/bench
+
+The database sink is push.push_to_database against --url, which needs to be a
+disposable database because merged_data is emptied before each run. The Sheets
+sink is push.push_to_sheets against the in-process stand-in
+(benchmarks/sheets_standin.py) with --latency seconds per API call. The last
+run also hangs the Sheets stand-in to check that a timed-out sink is reported
+without holding up the database write.
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from benchmarks.bench_fake_rows import seed_frame
+from benchmarks.sheets_standin import FakeSheetsService
+from etl import push
+from etl.data_merger import generate_fake_rows
+from etl.db_loader import ensure_schema
+from etl.id_index import IdIndex
+from etl.sinks import run_sinks
+
+
+def fresh_sinks(engine, df, tmp, latency):
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM merged_data"))
+    for name in ("pushed_ids.npy", "sheets_ids.npy", "sheets_progress.json"):
+        (tmp / name).unlink(missing_ok=True)
+    service = FakeSheetsService(latency=latency)
+    push.get_sheets_service = lambda: service
+    push.SHEETS_PROGRESS_PATH = tmp / "sheets_progress.json"
+    pushed_ids, sheets_ids = IdIndex(tmp / "pushed_ids.npy"), IdIndex(tmp / "sheets_ids.npy")
+    return service, {"postgres": lambda: push.push_to_database(engine, df, pushed_ids),
+                     "sheets": lambda: push.push_to_sheets(df, sheets_ids)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=os.getenv("BENCH_DATABASE_URL", "sqlite:///bench_push_fanout.db"))
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per Sheets API call")
+    args = parser.parse_args()
+    engine = create_engine(args.url)
+    ensure_schema(engine)
+    df = generate_fake_rows(args.rows, seed_frame(), np.random.default_rng(0))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        _, sinks = fresh_sinks(engine, df, tmp, args.latency)
+        timings = {}
+        start = time.perf_counter()
+        for name, sink in sinks.items():
+            sink_start = time.perf_counter()
+            sink()
+            timings[name] = time.perf_counter() - sink_start
+        sequential = time.perf_counter() - start
+
+        service, sinks = fresh_sinks(engine, df, tmp, args.latency)
+        start = time.perf_counter()
+        results = run_sinks(sinks)
+        concurrent = time.perf_counter() - start
+        assert all(r["status"] == "ok" for r in results.values()), results
+        assert len(service.rows("Master Data")) == len(df) + 1
+
+        service, sinks = fresh_sinks(engine, df, tmp, latency=60)
+        start = time.perf_counter()
+        hung = run_sinks(sinks, timeouts={"sheets": 2})
+        hung_elapsed = time.perf_counter() - start
+        with engine.connect() as conn:
+            count = conn.execute(text("SELECT COUNT(*) FROM merged_data")).scalar()
+
+    sequential_sinks = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+    concurrent_sinks = ", ".join(f"{name} {result['seconds']:.2f}s" for name, result in results.items())
+    print(f"\n{args.rows:,} rows, Sheets latency {args.latency}s per call")
+    print(f"sequential: {sequential:.2f}s ({sequential_sinks})")
+    print(f"concurrent: {concurrent:.2f}s ({concurrent_sinks})")
+    print(f"hung Sheets: {hung_elapsed:.2f}s, postgres {hung['postgres']['status']} ({count:,} rows), "
+          f"sheets {hung['sheets']['status']} ({hung['sheets']['error']})")
@@ -0,0 +1,44 @@
+"""
+Offline re-parse of the raw page cache across a process pool.
+
+    PYTHONPATH=. python benchmarks/bench_replay.py --pages 500
+
+Fills a scratch cache with rendered pages (or copies nothing and uses --cache-dir
+with a real data/page_cache) and times replay_reviews at several worker counts.
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.ambitionbox_standin import sample_pages
+from etl.page_cache import PageCache
+from etl.reviews_scraper import replay_reviews
+
+SLUG = "standin-company"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--data-dir", help="data dir holding an existing page_cache/")
+    parser.add_argument("--slug", default=SLUG)
+    parser.add_argument("--parser", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        data_dir = args.data_dir or scratch
+        if not args.data_dir:
+            cache = PageCache(Path(data_dir) / "page_cache")
+            for page, content in enumerate(sample_pages(args.pages), start=1):
+                cache.put(args.slug, page, content)
+            print(f"Cache: {args.pages} pages, {cache.size() / 1024:.0f} KB compressed")
+
+        worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+        print(f"\n{'workers':>7} {'reviews':>8} {'seconds':>8} {'pages/s':>8}")
+        for workers in worker_counts:
+            start = time.perf_counter()
+            df = replay_reviews(args.slug, data_dir=data_dir, parser=args.parser, workers=workers)
+            elapsed = time.perf_counter() - start
+            pages = len(PageCache(Path(data_dir) / "page_cache").pages(args.slug))
+            print(f"{workers:>7} {len(df):>8} {elapsed:>8.2f} {pages / elapsed:>8.1f}")
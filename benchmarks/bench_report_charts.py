@@ -0,0 +1,147 @@
+"""
+Report chart rendering: the original sequential pyplot code vs. the chart specs
+of etl/report_charts.py, rendered serially and on a process pool.
+
+    PYTHONPATH=. python benchmarks/bench_report_charts.py --rows 100000 --workers 4 --repeat 3
+
+Every path is checked to produce images identical, pixel for pixel, to the
+original renderer's. The pool is started (and its workers warmed up) before
+timing, as it is in a long-lived report worker. The pool can only beat the
+serial path when it has more than one CPU to run on.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import matplotlib.ticker as ticker
+import numpy as np
+import pandas as pd
+from PIL import Image, ImageChops
+
+from benchmarks.bench_fake_rows import seed_frame
+from etl.data_merger import generate_fake_rows
+from etl.Email_Report import department_summary
+from etl.report_charts import chart_specs, render_spec, render_specs, write_charts
+from etl.report_sources import prepare_report_frame
+from etl.storage import with_categoricals
+
+
+def legacy_trend(dt_series, title, filename, color, charts_dir):
+    s = pd.to_datetime(dt_series, errors="coerce").dropna().dt.to_period("M").value_counts().sort_index()
+    if s.empty:
+        return
+    labels = [d.strftime("%b %Y") for d in s.index.to_timestamp()]
+    plt.figure(figsize=(12, 5))
+    plt.plot(range(len(s)), s.values, marker="o", color=color)
+    plt.title(title)
+    plt.xlabel("Month")
+    plt.ylabel("Count")
+    plt.xticks(range(len(labels)), labels, rotation=45, ha="right")
+    plt.gca().xaxis.set_major_locator(ticker.MultipleLocator(3))
+    plt.tight_layout()
+    plt.savefig(os.path.join(charts_dir, filename))
+    plt.close()
+
+
+def legacy_charts(df, dept_summary, charts_dir):
+    """The original Email_Report.render_charts: seven charts, one after another, through pyplot."""
+    os.makedirs(charts_dir, exist_ok=True)
+    df.groupby(["department", "status"]).size().unstack(fill_value=0).plot(kind="bar", stacked=True, figsize=(8, 5))
+    plt.title("Employee Count by Department (Active vs Exited)")
+    plt.xticks(rotation=45, ha="right")
+    plt.tight_layout()
+    plt.savefig(os.path.join(charts_dir, "dept_headcount.png"))
+    plt.close()
+
+    plt.figure(figsize=(8, 5))
+    x = range(len(dept_summary))
+    plt.bar([i - 0.2 for i in x], dept_summary["avg_performance"], width=0.4, label="Performance")
+    plt.bar([i + 0.2 for i in x], dept_summary["avg_engagement"], width=0.4, label="Engagement")
+    plt.xticks(x, dept_summary["department"], rotation=45, ha="right")
+    plt.title("Average Performance & Engagement by Department")
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(os.path.join(charts_dir, "dept_perf.png"))
+    plt.close()
+
+    for column, title, filename in [("salary_band", "Employee Distribution by Salary Band", "salary_band.png"),
+                                    ("gender", "Gender Distribution", "gender_dist.png")]:
+        df[column].value_counts().plot(kind="pie", autopct="%1.1f%%", figsize=(6, 6))
+        plt.title(title)
+        plt.ylabel("")
+        plt.tight_layout()
+        plt.savefig(os.path.join(charts_dir, filename))
+        plt.close()
+
+    df["perf_bucket"] = pd.cut(df["performance_rating"], bins=[1, 2, 3, 4, 5], labels=["1–2", "2–3", "3–4", "4–5"],
+                               include_lowest=True)
+    df["perf_bucket"].value_counts().sort_index().plot(kind="bar", figsize=(7, 5))
+    plt.title("Performance Rating Distribution")
+    plt.tight_layout()
+    plt.savefig(os.path.join(charts_dir, "perf_dist.png"))
+    plt.close()
+
+    legacy_trend(df["joining_date"], "Monthly Hirings", "monthly_hirings.png", "blue", charts_dir)
+    legacy_trend(df["exit_date"], "Monthly Exits", "monthly_exits.png", "red", charts_dir)
+
+
+def identical(expected_dir, actual_dir):
+    names = sorted(p.name for p in Path(expected_dir).glob("*.png"))
+    assert names == sorted(p.name for p in Path(actual_dir).glob("*.png")), "different chart sets"
+    for name in names:
+        a = Image.open(Path(expected_dir) / name).convert("RGBA")
+        b = Image.open(Path(actual_dir) / name).convert("RGBA")
+        assert a.size == b.size and ImageChops.difference(a, b).getbbox() is None, f"{name} differs"
+    return len(names)
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    df = prepare_report_frame(with_categoricals(generate_fake_rows(args.rows, seed_frame(), np.random.default_rng(0))))
+    summary = department_summary(df)
+    specs = chart_specs(df, summary)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        per_chart = {}
+        for spec in specs:
+            start = time.perf_counter()
+            render_spec(spec)
+            per_chart[spec["name"]] = time.perf_counter() - start
+
+        legacy = timed(lambda: legacy_charts(df.copy(), summary, tmp / "legacy"), args.repeat)
+        serial = timed(lambda: write_charts(render_specs(chart_specs(df, summary), workers=1), tmp / "serial"),
+                       args.repeat)
+        render_specs(specs, workers=args.workers)  # start and warm up the pool
+        pooled = timed(lambda: write_charts(render_specs(chart_specs(df, summary), workers=args.workers),
+                                            tmp / "pooled"), args.repeat)
+        charts = identical(tmp / "legacy", tmp / "serial")
+        identical(tmp / "legacy", tmp / "pooled")
+
+    print(f"\n{args.rows:,} rows, {charts} charts, {os.cpu_count()} CPU(s), median of {args.repeat}")
+    for name, seconds in per_chart.items():
+        print(f"  {name:22}{seconds:>7.2f}s")
+    print(f"slowest chart {max(per_chart.values()):.2f}s, sum of charts {sum(per_chart.values()):.2f}s")
+    for label, seconds in [("pyplot, sequential", legacy), ("specs, serial", serial),
+                           (f"specs, pool of {args.workers}", pooled)]:
+        print(f"{label + ':':31}{seconds:.2f}s")
+    print("all images pixel-identical to the pyplot output")
@@ -0,0 +1,86 @@
+"""
+Per-report latency: `python etl/Email_Report.py` in a fresh subprocess (what
+dashboard.py used to do) vs. repeated Email_Report.build_report() calls in one
+warm process, and on the long-lived report worker the dashboard now uses
+(etl/report_worker.py).
+
+    PYTHONPATH=. python benchmarks/bench_report_engine.py --rows 100000 --reports 5
+
+All paths build the charts and the PDF from the same local Parquet table
+(REPORT_SOURCE=local) and skip the email. The in-process and worker paths are
+warmed up with one report first, as a long-lived dashboard would be.
+"""
+import argparse
+import functools
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.bench_fake_rows import seed_frame
+from etl.data_merger import generate_fake_rows
+from etl.storage import table_path, with_categoricals, write_table
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def subprocess_report(data_dir, output_dir):
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT), REPORT_SOURCE="local", REPORT_DATA_DIR=str(data_dir),
+               SKIP_EMAIL="true")
+    start = time.perf_counter()
+    subprocess.run([sys.executable, str(PROJECT_ROOT / "etl" / "Email_Report.py")], cwd=output_dir, env=env,
+                   check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def in_process_report(build_report, load, output_dir):
+    start = time.perf_counter()
+    build_report(load, outputs=("charts", "pdf"), output_dir=str(output_dir))
+    return time.perf_counter() - start
+
+
+def worker_report(run_report, load, output_dir):
+    start = time.perf_counter()
+    success, _, error = run_report(data_source=load, outputs=("charts", "pdf"), output_dir=str(output_dir))
+    assert success, error
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--reports", type=int, default=5)
+    args = parser.parse_args()
+    df = generate_fake_rows(args.rows, seed_frame(), np.random.default_rng(0))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        write_table(with_categoricals(df), table_path(tmp, "reviews_enriched_latest", "parquet"))
+        (tmp / "subprocess").mkdir()
+        (tmp / "in_process").mkdir()
+        (tmp / "worker").mkdir()
+
+        cold = [subprocess_report(tmp, tmp / "subprocess") for _ in range(args.reports)]
+
+        from etl.Email_Report import build_report
+        from etl.report_sources import load_from_local
+        from etl.report_worker import run_report
+        load = functools.partial(load_from_local, tmp)
+        in_process_report(build_report, load, tmp / "in_process")  # warm-up
+        warm = [in_process_report(build_report, load, tmp / "in_process") for _ in range(args.reports)]
+        worker_report(run_report, load, tmp / "worker")  # starts the worker
+        worker = [worker_report(run_report, load, tmp / "worker") for _ in range(args.reports)]
+
+        same_pdf_size = abs((tmp / "subprocess" / "HR_Analytics_Report.pdf").stat().st_size
+                            - (tmp / "in_process" / "HR_Analytics_Report.pdf").stat().st_size) < 1024
+
+    print(f"\n{args.rows:,} rows, {args.reports} reports each (charts + PDF, no email)")
+    print(f"subprocess per report:  median {statistics.median(cold):.2f}s  (min {min(cold):.2f}s)")
+    print(f"in-process per report:  median {statistics.median(warm):.2f}s  (min {min(warm):.2f}s)")
+    print(f"worker per report:      median {statistics.median(worker):.2f}s  (min {min(worker):.2f}s)")
+    print(f"speed-up: {statistics.median(cold) / statistics.median(warm):.1f}x; PDFs comparable in size: {same_pdf_size}")
@@ -0,0 +1,119 @@
+"""
+Time to the report's input frame and to its charts, per report data source
+(etl/report_sources.py), against the original full-sheet read.
+
+    PYTHONPATH=. python benchmarks/bench_report_sources.py --url postgresql+psycopg2://postgres@localhost/bench
+
+--rows fake rows go to PostgreSQL (scratch schema bench_report, dropped and
+recreated) and to a local Parquet table. --sheet-rows of them go to the
+in-process Sheets stand-in (benchmarks/sheets_standin.py), because a million
+rows of Python strings does not fit comfortably in its memory. The original
+path is timed on the same stand-in: a values().get of A:Z, rows padded in a
+`while` loop, then string-to-number casts.
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from benchmarks.bench_fake_rows import seed_frame
+from benchmarks.sheets_standin import FakeSheetsService
+from etl import report_sources
+from etl.data_merger import generate_fake_rows
+from etl.db_loader import ensure_schema, load_dataframe
+from etl.Email_Report import compute_kpis, department_summary, render_charts
+from etl.storage import table_path, with_categoricals, write_table
+
+
+def legacy_sheet_frame(service):
+    """The original Email_Report fetch: the whole A:Z range, padded row by row."""
+    rows = service.spreadsheets().values().get(spreadsheetId="bench", range="SupabaseData!A:Z").execute()["values"]
+    max_len = max(len(rows[0]), max(len(r) for r in rows[1:]))
+    for r in rows:
+        while len(r) < max_len:
+            r.append("")
+    df = pd.DataFrame(rows[1:], columns=rows[0])
+    df.columns = df.columns.str.strip().str.lower()
+    for col in ["performance_rating", "engagement_score", "age", "tenure_years"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    df["status"] = df["status"].astype(str).str.strip().str.lower()
+    df["tenure_years"] = (pd.to_datetime(df["exit_date"], errors="coerce")
+                          - pd.to_datetime(df["joining_date"], errors="coerce")).dt.days / 365.25
+    return df
+
+
+def sheet_service(df):
+    service = FakeSheetsService(sheets=("SupabaseData", "Master Data"))
+    values = df.astype(str).replace({"NaT": "", "nan": ""}).values.tolist()
+    service.grids["SupabaseData"] = [df.columns.tolist()] + [row[:max(i + 1 for i, v in enumerate(row) if v)]
+                                                              for row in values]
+    service.row_counts["SupabaseData"] = len(values) + 1
+    return service
+
+
+def timed_report(load, charts_dir, service):
+    """(seconds to the report frame, seconds to all charts, KPIs), minus time spent inside the Sheets stand-in."""
+    emulated = service.server_seconds
+    start = time.perf_counter()
+    df = load()
+    loaded = time.perf_counter() - start
+    kpis = compute_kpis(df)
+    render_charts(df, department_summary(df), charts_dir=charts_dir)
+    emulated = service.server_seconds - emulated
+    return loaded - emulated, time.perf_counter() - start - emulated, kpis
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", required=True, help="disposable PostgreSQL database")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--sheet-rows", type=int, default=100_000)
+    args = parser.parse_args()
+    df = generate_fake_rows(args.rows, seed_frame(), np.random.default_rng(0))
+
+    engine = create_engine(args.url, connect_args={"options": "-csearch_path=bench_report"})
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA IF EXISTS bench_report CASCADE"))
+        conn.execute(text("CREATE SCHEMA bench_report"))
+    ensure_schema(engine)
+    load_dataframe(df, "merged_data", engine)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        write_table(with_categoricals(df), table_path(tmp, "reviews_enriched_latest", "parquet"))
+        service = sheet_service(df.head(args.sheet_rows))
+        report_sources.get_sheets_service = lambda: service
+
+        sources = {
+            f"postgres ({args.rows:,})": lambda: report_sources.prepare_report_frame(
+                report_sources.load_from_postgres(engine)),
+            f"local parquet ({args.rows:,})": lambda: report_sources.prepare_report_frame(
+                report_sources.load_from_local(tmp)),
+            f"sheets, needed columns ({args.sheet_rows:,})": lambda: report_sources.prepare_report_frame(
+                report_sources.load_from_sheets()),
+            f"sheets, original A:Z read ({args.sheet_rows:,})": lambda: legacy_sheet_frame(service),
+        }
+        for name, load in sources.items():
+            results[name] = timed_report(load, tmp / "charts", service)
+
+        legacy_bytes = len(json.dumps(service.spreadsheets().values().get(
+            spreadsheetId="bench", range="SupabaseData!A:Z").execute()))
+        wanted = [c for c in report_sources.REPORT_COLUMNS if c in df.columns]
+        needed_bytes = len(json.dumps(report_sources._read_sheet_columns(service, "SupabaseData", wanted)
+                                      .values.tolist()))
+
+    names = list(results)
+    assert results[names[0]][2] == results[names[1]][2], "postgres and local KPIs differ"
+    assert results[names[2]][2] == results[names[3]][2], "sheet KPIs differ from the original path"
+    print(f"\n{'source':42}{'frame ready':>14}{'charts done':>14}")
+    for name, (loaded, charted, _) in results.items():
+        print(f"{name:42}{loaded:>13.2f}s{charted:>13.2f}s")
+    print(f"Sheets response: {needed_bytes / 1e6:.1f} MB for the needed columns vs {legacy_bytes / 1e6:.1f} MB for A:Z "
+          f"(sheet timings exclude the stand-in's own work and any network time)")
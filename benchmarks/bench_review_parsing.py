@@ -0,0 +1,89 @@
+"""
+Per-page parse time of the original per-review search vs. the one-pass page index.
+
+    PYTHONPATH=. python benchmarks/bench_review_parsing.py [--pages-dir saved_pages/]
+
+Without --pages-dir, pages with a growing number of reviews are rendered from the
+review backup so the quadratic term is visible.
+"""
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks.ambitionbox_standin import load_pages, sample_pages
+from etl.review_parsers import parse_reviews_page
+
+REVIEW_ATTRS = {"itemscope": True, "itemtype": "https://schema.org/Review"}
+
+
+def legacy_parse_review_block(review_meta, soup):
+    """parse_review_block as it was before the page index (kept for comparison)."""
+    review_id = review_meta.get('id')
+    if not review_id:
+        return None
+    company = review_meta.select_one('meta[itemprop="name"]')['content'] if review_meta.select_one('meta[itemprop="name"]') else ""
+    author_span = review_meta.find('span', itemprop="author")
+    job_title = author_span.select_one('meta[itemprop="jobTitle"]')['content'] if author_span and author_span.select_one('meta[itemprop="jobTitle"]') else ""
+    location = author_span.select_one('meta[itemprop="workLocation"]')['content'] if author_span and author_span.select_one('meta[itemprop="workLocation"]') else ""
+    review_date = review_meta.select_one('meta[itemprop="datePublished"]')['content'] if review_meta.select_one('meta[itemprop="datePublished"]') else ""
+    rating = review_meta.select_one('meta[itemprop="ratingValue"]')['content'] if review_meta.select_one('meta[itemprop="ratingValue"]') else ""
+
+    pros, cons = "", ""
+    review_body_span = review_meta.find('span', itemprop='reviewBody')
+    if review_body_span:
+        full_text = review_body_span.text.replace('\xa0', ' ').strip()
+        if "Dislikes:" in full_text:
+            parts = full_text.split("Dislikes:")
+            pros = parts[0].replace("Likes:", "").strip()
+            cons = parts[1].strip()
+        else:
+            pros = full_text.replace("Likes:", "").strip()
+
+    department = ""
+    visible_review_div = soup.find('div', id=review_id)
+    if visible_review_div:
+        info_container = visible_review_div.find('div', class_="flex mt-1")
+        if info_container:
+            p_tags = info_container.find_all('p')
+            if p_tags:
+                department_text = p_tags[-1].text.strip()
+                if "Department" in department_text:
+                    department = department_text
+
+    return {"ReviewID": review_id, "Company": company, "JobTitle": job_title, "Department": department,
+            "Location": location, "ReviewDate": review_date, "OverallRating": rating, "Pros": pros, "Cons": cons}
+
+
+def legacy_parse_page(content):
+    soup = BeautifulSoup(content, "html.parser")
+    tags = soup.find_all("span", attrs=REVIEW_ATTRS)
+    return [r for r in (legacy_parse_review_block(t, soup) for t in tags) if r]
+
+
+def best_of(fn, content, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(content)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages-dir", help="directory of saved page_<N>.html files")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.pages_dir:
+        cases = [(f"page {i + 1}", page) for i, page in enumerate(load_pages(args.pages_dir))]
+    else:
+        cases = [(f"{n} reviews", sample_pages(1, per_page=n)[0]) for n in (10, 50, 200, 500)]
+
+    print(f"{'page':>12} {'legacy ms':>10} {'indexed ms':>11} {'speedup':>8}")
+    for label, content in cases:
+        legacy_t, legacy = best_of(legacy_parse_page, content, args.repeat)
+        indexed_t, indexed = best_of(lambda c: parse_reviews_page(c, "bs4"), content, args.repeat)
+        assert legacy == (indexed or []), f"parse mismatch on {label}"
+        print(f"{label:>12} {legacy_t * 1000:>10.1f} {indexed_t * 1000:>11.1f} {legacy_t / indexed_t:>7.1f}x")
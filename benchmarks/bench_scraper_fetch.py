@@ -0,0 +1,45 @@
+"""
+Sequential vs. async page fetching against the local AmbitionBox stand-in.
+
+    PYTHONPATH=. python benchmarks/bench_scraper_fetch.py --pages 40 --latency 0.3
+"""
+import argparse
+import tempfile
+import time
+
+from benchmarks.ambitionbox_standin import load_pages, serve
+from etl.reviews_scraper import scrape_reviews
+
+SLUG = "standin-company"
+
+
+def run(pages, concurrency, delay, base_url):
+    with tempfile.TemporaryDirectory() as data_dir:
+        start = time.perf_counter()
+        df = scrape_reviews(SLUG, num_pages=pages, delay=delay, save_csv=False,
+                            concurrency=concurrency, base_url=base_url, data_dir=data_dir)
+        elapsed = time.perf_counter() - start
+    return len(df), elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated server latency (s)")
+    parser.add_argument("--delay", type=float, default=0.1, help="politeness delay / 1 / rate (s)")
+    parser.add_argument("--pages-dir", help="directory of saved page_<N>.html files")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages_dir, args.pages)
+    server, root = serve(pages, latency=args.latency)
+    base_url = f"{root}/reviews/{SLUG}-reviews"
+
+    results = []
+    for concurrency in (1, 4, 8):
+        rows, elapsed = run(len(pages), concurrency, args.delay, base_url)
+        results.append((concurrency, rows, elapsed))
+    server.shutdown()
+
+    print(f"\n{'concurrency':>11} {'reviews':>8} {'seconds':>8} {'pages/s':>8}")
+    for concurrency, rows, elapsed in results:
+        print(f"{concurrency:>11} {rows:>8} {elapsed:>8.2f} {len(pages) / elapsed:>8.1f}")
@@ -0,0 +1,46 @@
+"""
+Bandwidth and time saved by conditional GETs when unchanged pages are re-scraped.
+
+    PYTHONPATH=. python benchmarks/bench_scraper_incremental.py --pages 30 --fail-every 7
+
+Runs a cold scrape, resets the page checkpoint and scrapes the same pages again;
+the second run should be answered almost entirely with 304s.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.ambitionbox_standin import load_pages, serve
+from etl.http_session import ScraperSession
+from etl.reviews_scraper import scrape_reviews
+
+SLUG = "standin-company"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--fail-every", type=int, default=7, help="503 the first hit of every Nth page")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--pages-dir", help="directory of saved page_<N>.html files")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages_dir, args.pages)
+    server, root = serve(pages, latency=args.latency, fail_every=args.fail_every)
+    base_url = f"{root}/reviews/{SLUG}-reviews"
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        report = []
+        for label in ("cold", "re-scrape"):
+            (Path(data_dir) / f"{SLUG}_last_page.txt").unlink(missing_ok=True)
+            session = ScraperSession(validators_path=Path(data_dir) / "http_validators.json", backoff=0.05)
+            start = time.perf_counter()
+            df = scrape_reviews(SLUG, num_pages=len(pages), delay=0, save_csv=False, concurrency=args.concurrency,
+                                base_url=base_url, data_dir=data_dir, session=session)
+            report.append((label, len(df), time.perf_counter() - start, session.summary()))
+    server.shutdown()
+
+    print()
+    for label, rows, elapsed, summary in report:
+        print(f"{label:>10}: {rows} new reviews in {elapsed:.2f}s | {summary}")
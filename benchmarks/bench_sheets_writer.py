@@ -0,0 +1,87 @@
+"""
+Google Sheets push: the old single values().append vs. etl/sheets_writer against
+the in-process stand-in (benchmarks/sheets_standin.py).
+
+    PYTHONPATH=. python benchmarks/bench_sheets_writer.py --rows 100000 --latency 0.2
+
+Checks, for the batched writer: a push larger than one request's payload limit,
+rate-limit retries (--fail-every), and an interrupted push (--crash-after calls)
+that is resumed without duplicating or losing rows.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.bench_fake_rows import seed_frame
+from benchmarks.sheets_standin import FakeSheetsService
+from etl.data_merger import generate_fake_rows
+from etl import sheets_writer
+from etl.id_index import IdIndex
+from etl.sheets_writer import write_rows_resumable
+
+SHEET = "Master Data"
+
+
+def legacy_append(service, df):
+    """The original append_to_sheets_fresh_only request."""
+    result = service.spreadsheets().values().get(spreadsheetId="bench", range=f"{SHEET}!A1:A1").execute()
+    values = df.astype(str).values.tolist()
+    if "values" not in result:
+        values = [df.columns.tolist()] + values
+    service.spreadsheets().values().append(spreadsheetId="bench", range=f"{SHEET}!A:Z",
+                                           valueInputOption="USER_ENTERED", body={"values": values}).execute()
+
+
+def check_sheet(service, df):
+    rows = service.rows(SHEET)
+    assert rows[0] == df.columns.tolist()
+    assert [r[0] for r in rows[1:]] == df["review_id"].tolist(), "rows missing, duplicated or out of order"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per API call")
+    parser.add_argument("--payload-mb", type=float, default=10.0, help="stand-in request size limit")
+    parser.add_argument("--fail-every", type=int, default=7)
+    parser.add_argument("--crash-after", type=int, default=6)
+    args = parser.parse_args()
+    df = generate_fake_rows(args.rows, seed_frame(), np.random.default_rng(0))
+    limit = int(args.payload_mb * 1024 * 1024)
+    sheets_writer.SHEETS_BACKOFF = 0.01
+
+    service = FakeSheetsService(latency=args.latency, max_payload_bytes=limit)
+    start = time.perf_counter()
+    try:
+        legacy_append(service, df)
+        check_sheet(service, df)
+        print(f"legacy append: {time.perf_counter() - start:.2f}s, {service.calls} calls")
+    except Exception as e:
+        print(f"legacy append: failed after {time.perf_counter() - start:.2f}s ({e})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        progress_path = Path(tmp) / "sheets_progress.json"
+        sheets_ids = IdIndex(Path(tmp) / "sheets_ids.npy")
+        service = FakeSheetsService(latency=args.latency, max_payload_bytes=limit, fail_every=args.fail_every)
+        start = time.perf_counter()
+        write_rows_resumable(service, "bench", SHEET, df, sheets_ids, progress_path)
+        check_sheet(service, df)
+        print(f"batched writer: {time.perf_counter() - start:.2f}s, {service.calls} calls "
+              f"({service.rate_limited} rate-limited and retried)")
+        assert write_rows_resumable(service, "bench", SHEET, df, sheets_ids, progress_path) == 0
+
+        sheets_ids = IdIndex(Path(tmp) / "resumed_ids.npy")
+        service = FakeSheetsService(latency=0, max_payload_bytes=limit, crash_after=args.crash_after)
+        try:
+            write_rows_resumable(service, "bench", SHEET, df, sheets_ids, progress_path,
+                                 batch_rows=max(len(df) // 20, 1))
+        except ConnectionError:
+            print(f"interrupted after {len(service.rows(SHEET)) - 1:,} of {len(df):,} rows")
+        service.crash_after = None
+        resumed = write_rows_resumable(service, "bench", SHEET, df, sheets_ids, progress_path,
+                                       batch_rows=max(len(df) // 20, 1))
+        check_sheet(service, df)
+        print(f"resumed: wrote the remaining {resumed:,} rows, no duplicates")
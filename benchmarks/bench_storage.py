@@ -0,0 +1,52 @@
+"""
+File size and load time of the merged dataset as CSV vs. typed Parquet (etl/storage.py).
+
+    PYTHONPATH=. python benchmarks/bench_storage.py --rows 1000000
+
+Times a full load (CSV with parse_dates, as the stages used to read it), a
+single-column projection and a department filter for each format.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.bench_fake_rows import seed_frame
+from etl.data_merger import generate_fake_rows
+from etl.storage import read_table, write_table
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    df = generate_fake_rows(args.rows, seed_frame(), np.random.default_rng(0))
+    department = df["department"].iloc[0]
+
+    print(f"{'format':>8} {'MB':>8} {'write s':>8} {'full s':>8} {'1 col s':>8} {'filter s':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for data_format in ("csv", "parquet"):
+            path = Path(tmp) / f"reviews_enriched_latest.{data_format}"
+            _, write_t = timed(lambda: write_table(df, path))
+            full, full_t = timed(lambda: read_table(path))
+            _, column_t = timed(lambda: read_table(path, columns=["review_id"]))
+            subset, filter_t = timed(lambda: read_table(path, filters=[("department", "==", department)]))
+            results[data_format] = (full, subset)
+            print(f"{data_format:>8} {path.stat().st_size / 1e6:>8.1f} {write_t:>8.2f} {full_t:>8.2f} "
+                  f"{column_t:>8.2f} {filter_t:>9.2f}")
+
+    csv_full, csv_subset = results["csv"]
+    parquet_full, parquet_subset = results["parquet"]
+    assert len(csv_full) == len(parquet_full) == args.rows
+    assert len(csv_subset) == len(parquet_subset)
+    assert (csv_full["review_id"] == parquet_full["review_id"]).all()
+    assert (csv_full["joining_date"] == parquet_full["joining_date"]).all()
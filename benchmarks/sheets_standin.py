@@ -0,0 +1,188 @@
+"""
+In-process stand-in for the Google Sheets v4 client used by push.py and Email_Report.py.
+
+`FakeSheetsService` mimics the chained googleapiclient calls the pipeline makes
+(`spreadsheets().get / batchUpdate` and `spreadsheets().values().get / batchGet /
+append / batchUpdate`, each finished with `.execute()`) on an in-memory grid. It enforces
+the grid size (rows must be added with appendDimension before writing past
+them) and a per-request payload limit like the real API. It can also inject
+latency, 429 rate-limit errors (`fail_every=N`) and a hard failure after
+`crash_after` calls to simulate an interrupted push.
+"""
+import json
+import re
+import threading
+import time
+
+DEFAULT_ROW_COUNT = 1000
+MAX_PAYLOAD_BYTES = 10 * 1024 * 1024
+
+
+class _Resp(dict):
+    def __init__(self, status):
+        super().__init__(status=str(status))
+        self.status = status
+
+
+class FakeHttpError(Exception):
+    """Shaped like googleapiclient.errors.HttpError: the status is on `.resp.status`."""
+
+    def __init__(self, status, message):
+        super().__init__(f"<HttpError {status}: {message}>")
+        self.resp = _Resp(status)
+
+
+def _column_index(letters):
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - ord("A") + 1)
+    return index - 1
+
+
+def parse_a1(a1_range):
+    """'Sheet!A5' / 'Sheet!A:Z' / 'Sheet!A1:B2' -> (sheet, first_row, first_col, last_row, last_col), 0-based, None = open."""
+    sheet, _, cells = a1_range.partition("!")
+    sheet = sheet.strip("'")
+    bounds = []
+    for ref in (cells.split(":") if cells else []):
+        col, row = re.fullmatch(r"([A-Z]*)(\d*)", ref).groups()
+        bounds.append((int(row) - 1 if row else None, _column_index(col) if col else None))
+    start = bounds[0] if bounds else (None, None)
+    end = bounds[1] if len(bounds) > 1 else (start if bounds and start[0] is not None else (None, None))
+    return sheet, start[0] or 0, start[1] or 0, end[0], end[1]
+
+
+class _Request:
+    def __init__(self, service, fn, payload=None):
+        self.service, self.fn, self.payload = service, fn, payload
+
+    def execute(self):
+        return self.service._call(self.fn, self.payload)
+
+
+class _Values:
+    def __init__(self, service):
+        self.service = service
+
+    def get(self, spreadsheetId, range, majorDimension="ROWS"):
+        return _Request(self.service, lambda: self.service._get(range, majorDimension))
+
+    def batchGet(self, spreadsheetId, ranges, majorDimension="ROWS"):
+        return _Request(self.service, lambda: {"valueRanges": [self.service._get(r, majorDimension) for r in ranges]})
+
+    def append(self, spreadsheetId, range, valueInputOption, body):
+        return _Request(self.service, lambda: self.service._append(range, body["values"]), body)
+
+    def batchUpdate(self, spreadsheetId, body):
+        return _Request(self.service, lambda: self.service._batch_update_values(body["data"]), body)
+
+
+class _Spreadsheets:
+    def __init__(self, service):
+        self.service = service
+
+    def values(self):
+        return _Values(self.service)
+
+    def get(self, spreadsheetId, fields=None):
+        return _Request(self.service, self.service._properties)
+
+    def batchUpdate(self, spreadsheetId, body):
+        return _Request(self.service, lambda: self.service._batch_update(body["requests"]), body)
+
+
+class FakeSheetsService:
+    def __init__(self, sheets=("Master Data",), latency=0.0, fail_every=0, crash_after=None,
+                 max_payload_bytes=MAX_PAYLOAD_BYTES):
+        self.grids = {name: [] for name in sheets}
+        self.row_counts = {name: DEFAULT_ROW_COUNT for name in sheets}
+        self.latency, self.fail_every, self.crash_after = latency, fail_every, crash_after
+        self.max_payload_bytes = max_payload_bytes
+        self.calls = 0
+        self.rate_limited = 0
+        self.bytes_received = 0
+        self.server_seconds = 0.0  # time spent emulating the API itself
+        self._lock = threading.Lock()
+
+    def spreadsheets(self):
+        return _Spreadsheets(self)
+
+    def rows(self, sheet):
+        """Non-empty rows of a sheet, as the API would return them."""
+        grid = self.grids[sheet]
+        while grid and not any(grid[-1]):
+            grid.pop()
+        return grid
+
+    def _call(self, fn, payload):
+        with self._lock:
+            self.calls += 1
+            calls = self.calls
+        time.sleep(self.latency)
+        if self.crash_after is not None and calls > self.crash_after:
+            raise ConnectionError("stand-in: connection lost")
+        if self.fail_every and calls % self.fail_every == 0:
+            self.rate_limited += 1
+            raise FakeHttpError(429, "Quota exceeded for quota metric 'Write requests'")
+        if payload is not None:
+            size = len(json.dumps(payload))
+            if size > self.max_payload_bytes:
+                raise FakeHttpError(400, f"Request payload size exceeds the limit: {self.max_payload_bytes} bytes")
+            self.bytes_received += size
+        with self._lock:
+            start = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                self.server_seconds += time.perf_counter() - start
+
+    def _properties(self):
+        return {"sheets": [{"properties": {"sheetId": i, "title": name,
+                                           "gridProperties": {"rowCount": self.row_counts[name], "columnCount": 26}}}
+                           for i, name in enumerate(self.grids)]}
+
+    def _get(self, a1_range, major_dimension):
+        sheet, first_row, first_col, last_row, last_col = parse_a1(a1_range)
+        rows = self.rows(sheet)[first_row:None if last_row is None else last_row + 1]
+        values = [r[first_col:None if last_col is None else last_col + 1] for r in rows]
+        if major_dimension == "COLUMNS":
+            width = max((len(r) for r in values), default=0)
+            values = [[r[c] if c < len(r) else "" for r in values] for c in range(width)]
+            for col in values:
+                while col and not col[-1]:
+                    col.pop()
+        return {"range": a1_range, "values": values} if any(values) else {"range": a1_range}
+
+    def _write(self, sheet, row, col, values):
+        if row + len(values) > self.row_counts[sheet]:
+            raise FakeHttpError(400, f"Range ({sheet}!A{row + 1}) exceeds grid limits. "
+                                     f"Max rows: {self.row_counts[sheet]}")
+        grid = self.grids[sheet]
+        while len(grid) < row + len(values):
+            grid.append([])
+        for i, values_row in enumerate(values):
+            target = grid[row + i]
+            target.extend([""] * max(0, col + len(values_row) - len(target)))
+            target[col:col + len(values_row)] = [str(v) for v in values_row]
+
+    def _append(self, a1_range, values):
+        sheet = parse_a1(a1_range)[0]
+        row = len(self.rows(sheet))
+        self.row_counts[sheet] = max(self.row_counts[sheet], row + len(values))  # append grows the grid
+        self._write(sheet, row, 0, values)
+        return {"updates": {"updatedRange": f"{sheet}!A{row + 1}:Z{row + len(values)}",
+                            "updatedRows": len(values)}}
+
+    def _batch_update_values(self, data):
+        for item in data:
+            sheet, row, col, _, _ = parse_a1(item["range"])
+            self._write(sheet, row, col, item["values"])
+        return {"totalUpdatedRows": sum(len(item["values"]) for item in data)}
+
+    def _batch_update(self, requests):
+        names = list(self.grids)
+        for request in requests:
+            if "appendDimension" in request:
+                dimension = request["appendDimension"]
+                self.row_counts[names[dimension["sheetId"]]] += dimension["length"]
+        return {"replies": [{} for _ in requests]}
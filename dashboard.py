@@ -324,48 +324,28 @@ def run_script_with_progress(script_path, script_name):
         log_execution(script_name, False, duration, None, str(e))
         return False, "", str(e), duration
 
+def build_report_in_process(report_type, recipients=None, send_email=False):
+    """Build a report on the long-lived report worker (etl/report_worker.py); returns (success, output, error)."""
+    from etl.report_worker import run_report
+
+    project_root = Path(__file__).resolve().parent
+    return run_report(
+        report_type=report_type,
+        outputs=("charts", "pdf", "email") if send_email else ("charts", "pdf"),
+        output_dir=str(project_root),
+        recipients=recipients,
+    )
+
 def run_report_generation(send_email=False, custom_recipients=None, report_type="Full"):
     """Run report generation with optional email sending and report type selection"""
     start_time = time.time()
-    try:
-        project_root = Path(__file__).resolve().parent
-        env = dict(os.environ)
-        env['PYTHONPATH'] = str(project_root)
-
-        report_script = project_root / "etl" / "Email_Report.py"
-
-        if not report_script.exists():
-            return False, "", "Email_Report.py not found", 0
-
-        # If we don't want to send email, we'll modify the environment to skip email
-        if not send_email:
-            env['SKIP_EMAIL'] = 'true'
-        elif custom_recipients:
-            env['CUSTOM_EMAIL_RECIPIENTS'] = ','.join(custom_recipients)
-
-        # Set report type
-        env['REPORT_TYPE'] = report_type
-
-        result = subprocess.run(
-            [sys.executable, str(report_script)],
-            capture_output=True,
-            text=True,
-            timeout=300,
-            env=env,
-            cwd=str(project_root)
-        )
-
-        duration = time.time() - start_time
-        success = result.returncode == 0
-        script_name = f"{report_type} Report" + (" + Email" if send_email else "")
-        log_execution(script_name, success, duration, result.stdout, result.stderr)
-        return success, result.stdout, result.stderr, duration
-
-    except Exception as e:
-        duration = time.time() - start_time
-        script_name = f"{report_type} Report" + (" + Email" if send_email else "")
-        log_execution(script_name, False, duration, None, str(e))
-        return False, "", str(e), duration
+    # The report worker stays up between runs, so only the first report pays for pandas/matplotlib/reportlab
+    success, stdout, stderr = build_report_in_process(
+        report_type, recipients=custom_recipients or None, send_email=send_email)
+    duration = time.time() - start_time
+    script_name = f"{report_type} Report" + (" + Email" if send_email else "")
+    log_execution(script_name, success, duration, stdout, stderr or None)
+    return success, stdout, stderr, duration
 
 def create_scheduled_report_job(recipients_list, schedule_config_path):
     """Create a scheduled report job that can run independently"""
@@ -382,33 +362,19 @@ def create_scheduled_report_job(recipients_list, schedule_config_path):
 
             # Run report generation
             project_root = Path(__file__).resolve().parent
-            env = dict(os.environ)
-            env['PYTHONPATH'] = str(project_root)
-            env['CUSTOM_EMAIL_RECIPIENTS'] = ','.join(recipients_list)
-            env['REPORT_TYPE'] = config.get('report_type', 'Summary')
-
-            report_script = project_root / "etl" / "Email_Report.py"
-
-            result = subprocess.run(
-                [sys.executable, str(report_script)],
-                capture_output=True,
-                text=True,
-                timeout=300,
-                env=env,
-                cwd=str(project_root)
-            )
+            success, stdout, stderr = build_report_in_process(
+                config.get('report_type', 'Summary'), recipients=recipients_list, send_email=True)
 
-            success = result.returncode == 0
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
             # Save execution log to file for later retrieval
             log_file = project_root / "scheduled_reports.log"
             with open(log_file, 'a') as f:
                 f.write(f"{timestamp} | {'SUCCESS' if success else 'FAILED'} | Recipients: {len(recipients_list)}\n")
-                if result.stdout:
-                    f.write(f"OUTPUT: {result.stdout}\n")
-                if result.stderr:
-                    f.write(f"ERROR: {result.stderr}\n")
+                if stdout:
+                    f.write(f"OUTPUT: {stdout}\n")
+                if stderr:
+                    f.write(f"ERROR: {stderr}\n")
                 f.write("-" * 80 + "\n")
 
             print(f"[{datetime.now()}] Scheduled report {'completed successfully' if success else 'failed'}")
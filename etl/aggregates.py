@@ -0,0 +1,292 @@
+"""
+Pre-aggregated HR KPIs, maintained incrementally by push.py.
+
+`hr_kpi_monthly` (created from sql/schema.sql) holds one row per department,
+review month ("YYYY-MM") and status. Each row stores only additive
+quantities: the number of employees, and a sum and a count for performance
+rating, engagement score, age and tenure in years. Tenure is the time from
+joining_date to exit_date, so only exited employees have it. Missing keys are
+stored as ''.
+
+Because every measure is a sum or a count, each pushed batch is applied as a
+delta in the same transaction as the rows themselves:
+
+- existing rows get `row = row + delta` through an ON CONFLICT upsert.
+- overwritten rows contribute their new values minus the old ones.
+
+`hr_kpi_counts` holds the report's distributions as employee counts per
+(dimension, value): salary_band, gender, perf_bucket (the performance rating
+bucket of the chart) and hire_month / exit_month ("YYYY-MM" of joining_date
+and exit_date). It is kept with the same deltas.
+
+The headline KPIs, the department summary and every report chart are then
+derived from O(departments x months) aggregate rows instead of the full table.
+
+Backfilling a table for rows pushed before it existed is an explicit step
+(`rebuild` below, which recomputes both). Until it has run, push.py warns and
+leaves that table empty rather than adding deltas to an incomplete total.
+
+    python etl/aggregates.py rebuild    # recompute from merged_data
+    python etl/aggregates.py show       # print the KPIs and department summary
+"""
+import os
+import sys
+
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+from etl.db_loader import with_date_columns
+
+AGG_TABLE = "hr_kpi_monthly"
+KEYS = ["department", "month", "status"]
+# measure -> merged_data column (tenure is derived from the dates)
+MEASURES = {
+    "performance": "performance_rating",
+    "engagement": "engagement_score",
+    "age": "age",
+    "tenure": None,
+}
+VALUE_COLUMNS = ["employees"] + [f"{m}_{part}" for m in MEASURES for part in ("sum", "count")]
+SOURCE_COLUMNS = ["review_id", "department", "review_date", "status", "performance_rating",
+                  "engagement_score", "age", "salary_band", "gender", "joining_date", "exit_date"]
+COUNTS_TABLE = "hr_kpi_counts"
+COUNT_KEYS = ["dimension", "value"]
+COUNT_VALUES = ["employees"]
+PERF_BINS = [1, 2, 3, 4, 5]
+PERF_LABELS = ["1–2", "2–3", "3–4", "4–5"]
+AGG_READ_CHUNK_ROWS = int(os.getenv("AGG_READ_CHUNK_ROWS", "200000"))
+
+
+def tenure_years(df):
+    """Years from joining_date to exit_date (NaN unless both are set, i.e. for exited employees)."""
+    return (df["exit_date"] - df["joining_date"]).dt.days / 365.25
+
+
+def aggregate_rows(df):
+    """merged_data rows -> one row per (department, month, status) with employee count, sums and counts."""
+    if df.empty:
+        return pd.DataFrame(columns=KEYS + VALUE_COLUMNS)
+    df = with_date_columns(df)
+    frame = pd.DataFrame({
+        "department": df["department"].astype("string").fillna(""),
+        "month": df["review_date"].dt.strftime("%Y-%m").astype("string").fillna(""),
+        "status": df["status"].astype("string").fillna(""),
+        "tenure": tenure_years(df),
+    })
+    for measure, column in MEASURES.items():
+        if column:
+            frame[measure] = pd.to_numeric(df[column], errors="coerce")
+
+    grouped = frame.groupby(KEYS)
+    agg = grouped.size().rename("employees").to_frame()
+    for measure in MEASURES:
+        agg[f"{measure}_sum"] = grouped[measure].sum()
+        agg[f"{measure}_count"] = grouped[measure].count()
+    return agg.reset_index()
+
+
+def performance_buckets(ratings):
+    """The performance rating buckets of the report's distribution chart (1–2 includes 1)."""
+    return pd.cut(ratings, bins=PERF_BINS, labels=PERF_LABELS, include_lowest=True).rename("perf_bucket")
+
+
+def count_rows(df):
+    """merged_data rows -> employees per (dimension, value) for hr_kpi_counts."""
+    if df.empty:
+        return pd.DataFrame(columns=COUNT_KEYS + COUNT_VALUES)
+    df = with_date_columns(df)
+    dimensions = {
+        "salary_band": df["salary_band"].astype("string"),
+        "gender": df["gender"].astype("string"),
+        "perf_bucket": performance_buckets(pd.to_numeric(df["performance_rating"], errors="coerce")).astype("string"),
+        "hire_month": df["joining_date"].dt.strftime("%Y-%m").astype("string"),
+        "exit_month": df["exit_date"].dt.strftime("%Y-%m").astype("string"),
+    }
+    parts = [values.fillna("").value_counts().rename_axis("value").rename("employees").reset_index()
+             .assign(dimension=dimension) for dimension, values in dimensions.items()]
+    return pd.concat(parts, ignore_index=True)[COUNT_KEYS + COUNT_VALUES]
+
+
+def combine(*parts, keys=KEYS, values=VALUE_COLUMNS):
+    """Sum aggregate frames key by key (negate a part first to subtract it)."""
+    parts = [p for p in parts if p is not None and not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=keys + values)
+    return pd.concat(parts).groupby(keys, as_index=False)[values].sum()
+
+
+def negate(agg, values=VALUE_COLUMNS):
+    agg = agg.copy()
+    agg[values] = -agg[values]
+    return agg
+
+
+def apply_delta(conn, delta, table=AGG_TABLE, keys=KEYS, values=VALUE_COLUMNS):
+    """Add `delta` (an aggregate frame) to `table`, inserting keys it has not seen yet."""
+    if delta.empty:
+        return 0
+    columns = keys + values
+    assignments = ", ".join(f"{c} = {table}.{c} + excluded.{c}" for c in values)
+    statement = text(
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join(':' + c for c in columns)}) "
+        f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {assignments}"
+    )
+    records = delta[columns].astype(object).to_dict("records")
+    for record in records:
+        for column in values:
+            record[column] = float(record[column]) if column.endswith("_sum") else int(record[column])
+    conn.execute(statement, records)
+    conn.execute(text(f"DELETE FROM {table} WHERE employees = 0"))
+    return len(records)
+
+
+def rows_for_ids(conn, review_ids, table="merged_data"):
+    """The aggregated columns of the `table` rows with these review_ids (the ones that exist)."""
+    ids = pd.Series(review_ids, dtype=object).dropna().unique().tolist()
+    parts = [
+        pd.read_sql(text(f"SELECT {', '.join(SOURCE_COLUMNS)} FROM {table} WHERE review_id IN :ids")
+                    .bindparams(bindparam("ids", expanding=True)), conn, params={"ids": ids[start:start + 10000]})
+        for start in range(0, len(ids), 10000)
+    ]
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=SOURCE_COLUMNS)
+
+
+def update_aggregates(conn, written, previous=None, tables=(AGG_TABLE, COUNTS_TABLE)):
+    """Apply a pushed batch to `tables`: + the rows just written, - the previous versions of overwritten rows."""
+    overwritten = previous is not None and not previous.empty
+    applied = 0
+    if AGG_TABLE in tables:
+        delta = aggregate_rows(written)
+        if overwritten:
+            delta = combine(delta, negate(aggregate_rows(previous)))
+        applied += apply_delta(conn, delta)
+    if COUNTS_TABLE in tables:
+        delta = count_rows(written)
+        if overwritten:
+            delta = combine(delta, negate(count_rows(previous), values=COUNT_VALUES), keys=COUNT_KEYS,
+                            values=COUNT_VALUES)
+        applied += apply_delta(conn, delta, COUNTS_TABLE, COUNT_KEYS, COUNT_VALUES)
+    return applied
+
+
+def rebuild_aggregates(conn, table="merged_data", chunk_rows=AGG_READ_CHUNK_ROWS):
+    """
+    Recompute hr_kpi_monthly and hr_kpi_counts from `table`, reading it in chunks.
+    Returns the number of aggregate rows written to both.
+    """
+    aggs, counts = [], []
+    for chunk in pd.read_sql(text(f"SELECT {', '.join(SOURCE_COLUMNS)} FROM {table}"), conn, chunksize=chunk_rows):
+        aggs.append(aggregate_rows(chunk))
+        counts.append(count_rows(chunk))
+    conn.execute(text(f"DELETE FROM {AGG_TABLE}"))
+    conn.execute(text(f"DELETE FROM {COUNTS_TABLE}"))
+    return (apply_delta(conn, combine(*aggs))
+            + apply_delta(conn, combine(*counts, keys=COUNT_KEYS, values=COUNT_VALUES), COUNTS_TABLE, COUNT_KEYS,
+                          COUNT_VALUES))
+
+
+def unbuilt_aggregates(conn, table="merged_data"):
+    """The aggregate tables that are empty while `table` already has rows (first run after upgrading)."""
+    if conn.execute(text(f"SELECT 1 FROM {table} LIMIT 1")).first() is None:
+        return []
+    return [agg_table for agg_table in (AGG_TABLE, COUNTS_TABLE)
+            if conn.execute(text(f"SELECT 1 FROM {agg_table} LIMIT 1")).first() is None]
+
+
+def read_aggregates(conn, since_month=None):
+    """hr_kpi_monthly as a DataFrame, optionally only months >= `since_month` ("YYYY-MM")."""
+    sql = f"SELECT {', '.join(KEYS + VALUE_COLUMNS)} FROM {AGG_TABLE}"
+    if since_month:
+        return pd.read_sql(text(sql + " WHERE month >= :since"), conn, params={"since": since_month})
+    return pd.read_sql(text(sql), conn)
+
+
+def read_counts(conn):
+    """hr_kpi_counts as a DataFrame."""
+    return pd.read_sql(text(f"SELECT {', '.join(COUNT_KEYS + COUNT_VALUES)} FROM {COUNTS_TABLE}"), conn)
+
+
+def _mean(agg, measure):
+    count = agg[f"{measure}_count"].sum()
+    return agg[f"{measure}_sum"].sum() / count if count else float("nan")
+
+
+def _is_exited(agg):
+    return agg["status"].str.strip().str.lower().eq("exited")
+
+
+def kpis_from_aggregates(agg):
+    """The report's headline KPIs (same keys and rounding as Email_Report.compute_kpis)."""
+    total_employees = int(agg["employees"].sum())
+    exited = _is_exited(agg)
+    exited_employees = int(agg.loc[exited, "employees"].sum())
+    active_employees = int(agg.loc[agg["status"].str.strip().str.lower().eq("active"), "employees"].sum())
+    return {
+        "total_employees": total_employees,
+        "active_employees": active_employees,
+        "exited_employees": exited_employees,
+        "attrition_rate": round((exited_employees / total_employees) * 100, 1) if total_employees else 0.0,
+        "avg_tenure": round(_mean(agg[exited], "tenure"), 1),
+        "avg_perf": round(_mean(agg, "performance"), 2),
+        "avg_eng": round(_mean(agg, "engagement"), 2),
+        "avg_age": round(_mean(agg, "age"), 1),
+    }
+
+
+def department_summary_from_aggregates(agg):
+    """The report's department table (same columns as Email_Report.department_summary)."""
+    agg = agg[agg["department"] != ""].assign(
+        exited=lambda a: a["employees"].where(_is_exited(a), 0),
+        tenure_sum=lambda a: a["tenure_sum"].where(_is_exited(a), 0),
+        tenure_count=lambda a: a["tenure_count"].where(_is_exited(a), 0),
+    )
+    sums = agg.groupby("department")[VALUE_COLUMNS + ["exited"]].sum()
+    summary = pd.DataFrame({
+        "headcount": sums["employees"],
+        "avg_performance": sums["performance_sum"] / sums["performance_count"].where(sums["performance_count"] > 0),
+        "avg_engagement": sums["engagement_sum"] / sums["engagement_count"].where(sums["engagement_count"] > 0),
+        "exited": sums["exited"],
+        "avg_tenure": sums["tenure_sum"] / sums["tenure_count"].where(sums["tenure_count"] > 0),
+    }).reset_index()
+    summary["attrition_pct"] = ((summary["exited"] / summary["headcount"]) * 100).round(1)
+    summary["avg_performance"] = summary["avg_performance"].round(2)
+    summary["avg_engagement"] = summary["avg_engagement"].round(2)
+    summary["avg_tenure"] = summary["avg_tenure"].round(1)
+    return summary
+
+
+def chart_data_from_aggregates(agg, counts):
+    """The data of the report charts (same as report_charts.chart_data) from hr_kpi_monthly and hr_kpi_counts."""
+    agg = agg[agg["department"] != ""].assign(status=lambda a: a["status"].str.strip().str.lower())
+    data = {"dept_counts": agg.groupby(["department", "status"])["employees"].sum().unstack(fill_value=0)}
+    counts = counts[counts["value"] != ""]
+    for dimension in ("salary_band", "gender", "perf_bucket", "hire_month", "exit_month"):
+        values = counts.loc[counts["dimension"] == dimension].set_index("value")["employees"].astype("int64")
+        values = values.rename("count").rename_axis(dimension).sort_index()
+        if dimension == "perf_bucket":
+            values = values.reindex(pd.Index(PERF_LABELS, name=dimension), fill_value=0)
+        elif dimension in ("salary_band", "gender"):
+            values = values.sort_values(ascending=False, kind="stable")  # largest share first, ties by value
+        data[dimension] = values
+    return data
+
+
+if __name__ == "__main__":
+    from etl.connections import get_engine
+    from etl.db_loader import ensure_schema
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "show"
+    engine = get_engine()
+    ensure_schema(engine)
+    if command == "rebuild":
+        with engine.begin() as conn:
+            count = rebuild_aggregates(conn)
+        print(f"✅ Rebuilt {AGG_TABLE}: {count} rows")
+    elif command == "show":
+        with engine.connect() as conn:
+            agg = read_aggregates(conn)
+        print(kpis_from_aggregates(agg))
+        print(department_summary_from_aggregates(agg).to_string(index=False))
+    else:
+        sys.exit("usage: python etl/aggregates.py [rebuild|show]")
@@ -0,0 +1,206 @@
+"""
+Content-addressed, deduplicated snapshots for `save_with_backup`.
+
+A snapshot splits the frame into fixed blocks of `BACKUP_CHUNK_ROWS` rows.
+Each block is identified by a SHA-256 of its column names, dtypes and
+per-row hashes (`pd.util.hash_pandas_object`). Only blocks that are not
+stored yet are serialised and compressed (Parquet, or gzip CSV without
+pyarrow), under `chunks/<id[:2]>/<id>`. The datasets mostly grow by
+appending, so a new snapshot usually writes just its last block or two. A
+JSON manifest per snapshot in `manifests/` lists its blocks and dtypes.
+`snapshot_table` reads a table from disk block by block instead, for datasets
+that are written in chunks and never held in memory whole.
+
+`prune` keeps the newest snapshot of each of the last `BACKUP_KEEP_DAILY`
+days and `BACKUP_KEEP_WEEKLY` ISO weeks per prefix, then deletes chunks that
+no manifest references any more.
+
+    python etl/backup_store.py list Backup/merged
+    python etl/backup_store.py restore Backup/merged reviews_enriched data/restored.parquet
+"""
+import gzip
+import hashlib
+import io
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from etl.storage import HAS_PYARROW, iter_table_blocks, write_table
+
+BACKUP_CHUNK_ROWS = int(os.getenv("BACKUP_CHUNK_ROWS", "50000"))
+BACKUP_KEEP_DAILY = int(os.getenv("BACKUP_KEEP_DAILY", "7"))
+BACKUP_KEEP_WEEKLY = int(os.getenv("BACKUP_KEEP_WEEKLY", "4"))
+
+
+def _atomic_write(path, data):
+    os.makedirs(path.parent, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _chunk_id(block):
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in block.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(block, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+class BackupStore:
+    def __init__(self, root):
+        self.root = Path(root)
+        self.chunk_dir = self.root / "chunks"
+        self.manifest_dir = self.root / "manifests"
+
+    def _chunk_path(self, chunk_id):
+        suffix = ".parquet" if HAS_PYARROW else ".csv.gz"
+        existing = list((self.chunk_dir / chunk_id[:2]).glob(f"{chunk_id}.*"))
+        return existing[0] if existing else self.chunk_dir / chunk_id[:2] / f"{chunk_id}{suffix}"
+
+    def _write_chunk(self, block, path):
+        if path.suffix == ".parquet":
+            buffer = io.BytesIO()
+            block.to_parquet(buffer, index=False, compression="zstd")
+            data = buffer.getvalue()
+        else:
+            data = gzip.compress(block.to_csv(index=False).encode("utf-8"), mtime=0)
+        _atomic_write(path, data)
+        return len(data)
+
+    def snapshot(self, df, prefix="backup"):
+        """Store `df` as a new snapshot, writing only blocks not stored before. Returns the manifest path."""
+        blocks = (df.iloc[start:start + BACKUP_CHUNK_ROWS] for start in range(0, max(len(df), 1), BACKUP_CHUNK_ROWS))
+        return self._snapshot_blocks(blocks, prefix)
+
+    def snapshot_table(self, path, prefix="backup"):
+        """
+        Store the table at `path` (a CSV, Parquet file or Parquet part directory) as a new
+        snapshot, reading it one block at a time. Returns the manifest path.
+        """
+        return self._snapshot_blocks(iter_table_blocks(path, BACKUP_CHUNK_ROWS), prefix)
+
+    def _snapshot_blocks(self, blocks, prefix):
+        chunks, written_bytes, rows, first = [], 0, 0, None
+        for block in blocks:
+            first = block if first is None else first
+            chunk_id = _chunk_id(block)
+            path = self._chunk_path(chunk_id)
+            if not path.exists():
+                written_bytes += self._write_chunk(block, path)
+            chunks.append({"id": chunk_id, "file": path.name, "rows": len(block)})
+            rows += len(block)
+        first = pd.DataFrame() if first is None else first
+
+        created = datetime.now()
+        manifest = {
+            "prefix": prefix,
+            "created": created.isoformat(timespec="seconds"),
+            "rows": rows,
+            "columns": [str(c) for c in first.columns],
+            "dtypes": {str(c): str(t) for c, t in first.dtypes.items()},
+            "chunks": chunks,
+        }
+        name = f"{prefix}_{created.strftime('%Y%m%d_%H%M%S')}"
+        manifest_path = self.manifest_dir / f"{name}.json"
+        n = 1
+        while manifest_path.exists():
+            manifest_path = self.manifest_dir / f"{name}_{n}.json"
+            n += 1
+        _atomic_write(manifest_path, json.dumps(manifest, indent=1).encode())
+        print(f" Backup snapshot {manifest_path.name}: {len(chunks)} chunks, {written_bytes / 1e6:.2f} MB written")
+        return manifest_path
+
+    def snapshots(self, prefix=None):
+        """(manifest path, manifest) pairs, newest first, optionally only for one prefix."""
+        found = []
+        for path in self.manifest_dir.glob("*.json") if self.manifest_dir.exists() else []:
+            with open(path, "r") as f:
+                manifest = json.load(f)
+            if prefix is None or manifest["prefix"] == prefix:
+                found.append((path, manifest))
+        return sorted(found, key=lambda item: (item[1]["created"], item[0].name), reverse=True)
+
+    def restore(self, snapshot):
+        """Rebuild the DataFrame of a snapshot, given its manifest path or name, or a prefix (latest snapshot)."""
+        manifest_path = self.manifest_dir / f"{Path(str(snapshot)).stem}.json"
+        if manifest_path.exists():
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+        else:
+            matches = self.snapshots(str(snapshot))
+            if not matches:
+                raise FileNotFoundError(f"No backup snapshot {snapshot} in {self.root}")
+            manifest = matches[0][1]
+
+        frames = []
+        for chunk in manifest["chunks"]:
+            path = self.chunk_dir / chunk["id"][:2] / chunk["file"]
+            if path.suffix == ".parquet":
+                frames.append(pd.read_parquet(path))
+            else:
+                frames.append(pd.read_csv(path, compression="gzip"))
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        df = df.reindex(columns=manifest["columns"])
+        for col, dtype in manifest["dtypes"].items():
+            if dtype.startswith("datetime64"):
+                df[col] = pd.to_datetime(df[col]).astype(dtype)
+            elif dtype == "category":
+                df[col] = df[col].astype("category")
+        return df
+
+    def prune(self, prefix, keep_daily=BACKUP_KEEP_DAILY, keep_weekly=BACKUP_KEEP_WEEKLY):
+        """Apply the daily/weekly retention policy to one prefix, then drop unreferenced chunks."""
+        days, weeks, removed = [], [], 0
+        for path, manifest in self.snapshots(prefix):
+            created = datetime.fromisoformat(manifest["created"])
+            day, week = created.date(), created.isocalendar()[:2]
+            keep = False
+            if day not in days and len(days) < keep_daily:
+                days.append(day)
+                keep = True
+            if week not in weeks and len(weeks) < keep_weekly:
+                weeks.append(week)
+                keep = True
+            if not keep:
+                path.unlink()
+                removed += 1
+        if removed:
+            self.collect_garbage()
+        return removed
+
+    def collect_garbage(self):
+        """Delete chunks no manifest refers to. Returns the number of bytes freed."""
+        referenced = {chunk["id"] for _, manifest in self.snapshots() for chunk in manifest["chunks"]}
+        freed = 0
+        for path in self.chunk_dir.glob("*/*") if self.chunk_dir.exists() else []:
+            if path.name.split(".")[0] not in referenced and not path.name.startswith("."):
+                freed += path.stat().st_size
+                path.unlink()
+        return freed
+
+    def size(self):
+        return sum(p.stat().st_size for p in self.root.rglob("*") if p.is_file())
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "list" and len(sys.argv) == 3:
+        for path, manifest in BackupStore(sys.argv[2]).snapshots():
+            print(f"{path.stem:45} {manifest['created']}  {manifest['rows']:>10} rows  {len(manifest['chunks'])} chunks")
+    elif command == "restore" and len(sys.argv) == 5:
+        df = BackupStore(sys.argv[2]).restore(sys.argv[3])
+        write_table(df, sys.argv[4])
+        print(f"✅ Restored {len(df)} rows to {sys.argv[4]}")
+    elif command == "prune" and len(sys.argv) == 4:
+        print(f"✅ Removed {BackupStore(sys.argv[2]).prune(sys.argv[3])} snapshots")
+    else:
+        print("Usage: python etl/backup_store.py list <backup_dir>\n"
+              "       python etl/backup_store.py restore <backup_dir> <snapshot|prefix> <output.parquet|.csv>\n"
+              "       python etl/backup_store.py prune <backup_dir> <prefix>")
+        sys.exit(1)
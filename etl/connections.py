@@ -0,0 +1,68 @@
+"""
+Shared, lazily created connections for the ETL scripts.
+
+Nothing connects or reads credentials at import time. `get_engine()` builds one
+pooled SQLAlchemy engine per database URL on first use, with pre-ping so
+connections dropped by the Supabase pooler are replaced transparently.
+`get_sheets_service()` builds one Google Sheets client per process. Stages that
+run in the same process share both.
+
+The database URL comes from `DATABASE_URL` if set, else from the `SUPABASE_*`
+variables. Pool sizing uses `DB_POOL_SIZE`, `DB_MAX_OVERFLOW` and
+`DB_POOL_RECYCLE` (seconds).
+"""
+import os
+from functools import lru_cache
+from urllib.parse import quote_plus
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+SHEETS_SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+
+def database_url():
+    """SQLAlchemy URL for the merged_data database."""
+    if os.getenv("DATABASE_URL"):
+        return os.getenv("DATABASE_URL")
+    user = os.getenv("SUPABASE_USER")
+    password = os.getenv("SUPABASE_PASSWORD")
+    if not user or not password:
+        raise RuntimeError("Set DATABASE_URL, or SUPABASE_USER and SUPABASE_PASSWORD, to connect to the database")
+    host = os.getenv("SUPABASE_HOST", "aws-1-ap-south-1.pooler.supabase.com")
+    port = os.getenv("SUPABASE_PORT", "5432")
+    db = os.getenv("SUPABASE_DB", "postgres")
+    return f"postgresql+psycopg2://{user}:{quote_plus(password)}@{host}:{port}/{db}?sslmode=require"
+
+
+@lru_cache(maxsize=None)
+def get_engine(url=None):
+    """Pooled engine for `url` (default: database_url()), created once per process."""
+    from sqlalchemy import create_engine
+
+    url = url or database_url()
+    if url.startswith("sqlite"):
+        return create_engine(url)
+    return create_engine(url, pool_pre_ping=True, pool_size=DB_POOL_SIZE,
+                         max_overflow=DB_MAX_OVERFLOW, pool_recycle=DB_POOL_RECYCLE)
+
+
+@lru_cache(maxsize=None)
+def get_sheets_service():
+    """Google Sheets v4 client authorised with the service account in GOOGLE_CREDS_PATH."""
+    import httplib2
+    from google.oauth2.service_account import Credentials
+    from google_auth_httplib2 import AuthorizedHttp
+    from googleapiclient.discovery import build
+
+    creds_path = os.getenv("GOOGLE_CREDS_PATH")
+    if not creds_path:
+        raise RuntimeError("Set GOOGLE_CREDS_PATH to a service account JSON file to use Google Sheets")
+    creds = Credentials.from_service_account_file(creds_path, scopes=SHEETS_SCOPES)
+    authorized_http = AuthorizedHttp(creds, http=httplib2.Http(disable_ssl_certificate_validation=True))
+    return build("sheets", "v4", http=authorized_http)
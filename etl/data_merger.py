@@ -1,177 +1,288 @@
+import json
+import numpy as np
 import pandas as pd
 import os
-import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from faker import Faker
-from datetime import timedelta, date
+from datetime import date
 from etl.utils import save_with_backup
+from etl.review_store import load_reviews
+from etl.id_index import merged_id_index
+from etl.storage import find_table, read_table, table_path
 
 fake = Faker()
 
-import uuid
-
-def generate_fake_rows(n, real_df):
-    """Generate n fake rows following the schema of merged_data."""
-    job_titles = real_df["job_title"].dropna().unique().tolist()
-    departments = real_df["department"].dropna().unique().tolist()
-    locations = real_df["location"].dropna().unique().tolist()
-    salary_bands = real_df["salary_band"].dropna().unique().tolist()
-    genders = ["Male", "Female"]
-
-    today = date.today()
-    fake_rows = []
-
-    for _ in range(n):
-        # Always unique because UUID4
-        review_id = f"reviews-{uuid.uuid4().hex}"
-
-        company = "Nineleaps Technology Solutions"
-        job_title = random.choice(job_titles)
-        department = random.choice(departments)
-        location = random.choice(locations)
-
-        joining_date = fake.date_between(start_date="-10y", end_date="-1y")
-        status = random.choices(["Active", "Exited"], weights=[0.6, 0.4])[0]
-        if status == "Exited":
-            min_exit_date = joining_date + timedelta(days=400)
-            exit_date = (
-                fake.date_between(start_date=min_exit_date, end_date=today)
-                if min_exit_date < today
-                else pd.NaT
-            )
-        else:
-            exit_date = pd.NaT
-
-        review_date = fake.date_between(start_date=joining_date, end_date="today")
-
-        overall_rating = random.choices([1, 2, 3, 4, 5], weights=[5, 10, 25, 35, 25])[0]
-        engagement_score = round(random.uniform(4, 9), 1)
-        performance_rating = random.choice([1, 2, 3, 4, 5])
-
-        salary_band = (
-            random.choice(salary_bands) if salary_bands else random.choice(["A", "B", "C"])
+FAKE_TEXT_POOL_SIZE = int(os.getenv("FAKE_TEXT_POOL_SIZE", "2000"))
+_fake_text_pool = {}
+
+def fake_text_pool(size=FAKE_TEXT_POOL_SIZE):
+    """Faker names and 5-word sentences, generated once per process and reused by every batch."""
+    if size not in _fake_text_pool:
+        _fake_text_pool[size] = (
+            np.array([fake.name() for _ in range(size)], dtype=object),
+            np.array([fake.sentence(nb_words=5) for _ in range(size)], dtype=object),
         )
-        gender = random.choice(genders)
-        age = random.randint(22, 55)
-
-        employee_id = f"FAKE{random.randint(10000,99999)}"
-        name = fake.name()
-
-        pros = fake.sentence(nb_words=5)
-        cons = fake.sentence(nb_words=5)
-
-        fake_rows.append([
-            review_id,
-            company,
-            job_title,
-            department,
-            location,
-            review_date,
-            overall_rating,
-            pros,
-            cons,
-            employee_id,
-            name,
-            status,
-            joining_date,
-            exit_date,
-            engagement_score,
-            performance_rating,
-            salary_band,
-            gender,
-            age,
-        ])
-
-    fake_df = pd.DataFrame(fake_rows, columns=real_df.columns)
+    return _fake_text_pool[size]
+
+def _uniform_dates(rng, low, high):
+    """Uniform random dates in [low, high] (datetime64[D] arrays, inclusive)."""
+    span = (high - low).astype(np.int64)
+    return low + np.floor(rng.random(len(low)) * (span + 1)).astype("timedelta64[D]")
+
+def generate_fake_rows(n, real_df, rng=None):
+    """
+    Generate n fake rows following the schema of merged_data.
+    Categoricals and dates are drawn as arrays; names and pros/cons come from a reusable
+    pool of Faker text. review_ids use OS randomness so they stay unique even when `rng`
+    is seeded.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    job_titles = real_df["job_title"].dropna().unique()
+    departments = real_df["department"].dropna().unique()
+    locations = real_df["location"].dropna().unique()
+    salary_bands = real_df["salary_band"].dropna().unique()
+    if len(salary_bands) == 0:
+        salary_bands = np.array(["A", "B", "C"], dtype=object)
+    names, sentences = fake_text_pool()
+
+    def pick(options):
+        return np.asarray(options, dtype=object)[rng.integers(0, len(options), n)]
+
+    today = np.datetime64(date.today(), "D")
+    # Faker's "-10y" / "-1y" are 365.24-day years
+    joining_date = _uniform_dates(rng, np.full(n, today - 3652), np.full(n, today - 365))
+    is_exited = rng.random(n) < 0.4
+    min_exit_date = joining_date + 400
+    has_exit = is_exited & (min_exit_date < today)
+    exit_date = np.full(n, np.datetime64("NaT"), dtype="datetime64[D]")
+    exit_date[has_exit] = _uniform_dates(rng, min_exit_date[has_exit], np.full(has_exit.sum(), today))
+    review_date = _uniform_dates(rng, joining_date, np.full(n, today))
+
+    review_ids = np.frombuffer(os.urandom(16 * n).hex().encode(), dtype="S32").astype(str)
+
+    columns = [
+        np.char.add("reviews-", review_ids),
+        np.full(n, "Nineleaps Technology Solutions", dtype=object),
+        pick(job_titles),
+        pick(departments),
+        pick(locations),
+        review_date,
+        rng.choice([1, 2, 3, 4, 5], size=n, p=[0.05, 0.10, 0.25, 0.35, 0.25]),
+        sentences[rng.integers(0, len(sentences), n)],
+        sentences[rng.integers(0, len(sentences), n)],
+        np.char.add("FAKE", rng.integers(10000, 100000, n).astype(str)),
+        names[rng.integers(0, len(names), n)],
+        np.where(is_exited, "Exited", "Active").astype(object),
+        joining_date,
+        exit_date,
+        np.round(rng.uniform(4, 9, n), 1),
+        rng.integers(1, 6, n),
+        pick(salary_bands),
+        pick(["Male", "Female"]),
+        rng.integers(22, 56, n),
+    ]
+    # Positional, like the original list-of-rows construction
+    fake_df = pd.DataFrame(dict(zip(real_df.columns, columns)))
     return fake_df
 
 
 
-def merge_with_faker(fake_count=20):
-    """Merge HRMS + Reviews, then add fake rows."""
+class HRMSGroupIndex:
+    """
+    Row positions of HRMS employees grouped by normalised (department, location) and by
+    department alone, built once so each review is matched with array lookups instead of
+    rescanning the whole HRMS frame.
+    """
+
+    def __init__(self, df_hrms):
+        departments = df_hrms['department'].str.lower()
+        locations = df_hrms['location'].str.lower()
+        self.size = len(df_hrms)
+        self.pair_keys, self.pair_order, self.pair_starts, self.pair_counts = self._group(departments + "\x1f" + locations)
+        self.dept_keys, self.dept_order, self.dept_starts, self.dept_counts = self._group(departments)
+
+    @staticmethod
+    def _group(keys):
+        codes, uniques = pd.factorize(keys)  # missing keys get -1 and never match
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        order = order[len(codes) - counts.sum():]  # drop the -1 rows sorted first
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        return pd.Index(uniques), order, starts, counts
+
+    def draw(self, departments, locations, rng):
+        """One uniformly random HRMS row position per review, with department-only and global fallbacks."""
+        return self.positions(departments, locations, rng.random(len(departments)))
+
+    def positions(self, departments, locations, u):
+        """HRMS row positions for reviews given one uniform variate in [0, 1) per review."""
+        departments = pd.Series(departments).str.lower()
+        locations = pd.Series(locations).astype(str).str.lower()
+
+        positions = np.floor(u * self.size).astype(np.int64)
+        dept_codes = self.dept_keys.get_indexer(departments)
+        pair_codes = self.pair_keys.get_indexer(departments + "\x1f" + locations)
+        for codes, order, starts, counts in (
+            (dept_codes, self.dept_order, self.dept_starts, self.dept_counts),
+            (pair_codes, self.pair_order, self.pair_starts, self.pair_counts),
+        ):
+            hit = codes >= 0
+            g = codes[hit]
+            positions[hit] = order[starts[g] + np.floor(u[hit] * counts[g]).astype(np.int64)]
+        return positions
+
+    def save(self, directory):
+        """Write the index as .npy arrays (plus the key lists) so worker processes can memory-map it."""
+        directory = Path(directory)
+        for name in ("pair", "dept"):
+            for part in ("order", "starts", "counts"):
+                np.save(directory / f"{name}_{part}.npy", getattr(self, f"{name}_{part}"))
+        with open(directory / "keys.json", "w") as f:
+            json.dump({"size": self.size, "pair": self.pair_keys.tolist(), "dept": self.dept_keys.tolist()}, f)
+
+    @classmethod
+    def load(cls, directory):
+        """Open an index written by `save`, memory-mapping the position arrays read-only."""
+        directory = Path(directory)
+        index = cls.__new__(cls)
+        with open(directory / "keys.json", "r") as f:
+            keys = json.load(f)
+        index.size = keys["size"]
+        for name in ("pair", "dept"):
+            setattr(index, f"{name}_keys", pd.Index(keys[name], dtype=object))
+            for part in ("order", "starts", "counts"):
+                setattr(index, f"{name}_{part}", np.load(directory / f"{name}_{part}.npy", mmap_mode="r"))
+        return index
+
+
+_worker_group_index = None
+
+def _init_match_worker(index_dir):
+    global _worker_group_index
+    _worker_group_index = HRMSGroupIndex.load(index_dir)
+
+def _match_shard(shard):
+    departments, locations, u = shard
+    return _worker_group_index.positions(departments, locations, u)
+
+def match_reviews_sharded(group_index, departments, locations, u, workers):
+    """
+    Match reviews to HRMS rows in a process pool, one shard per (normalised) department.
+    Workers memory-map the saved group index instead of receiving a pickled copy, and
+    each review's draw comes from its own pre-drawn variate in `u`, so the result does
+    not depend on the number of workers.
+    """
+    departments = pd.Series(departments).reset_index(drop=True)
+    locations = pd.Series(locations).reset_index(drop=True)
+    shard_codes, _ = pd.factorize(departments.str.lower(), use_na_sentinel=False)
+    shards = [np.flatnonzero(shard_codes == code) for code in np.unique(shard_codes)]
+
+    positions = np.empty(len(departments), dtype=np.int64)
+    with tempfile.TemporaryDirectory() as index_dir:
+        group_index.save(index_dir)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_match_worker,
+                                 initargs=(index_dir,)) as pool:
+            shard_args = [(departments.iloc[idx].values, locations.iloc[idx].values, u[idx]) for idx in shards]
+            for idx, shard_positions in zip(shards, pool.map(_match_shard, shard_args)):
+                positions[idx] = shard_positions
+    return positions
+
+
+def merge_with_faker(fake_count=20, companies=None, seed=None, workers=None, data_dir=None, backup_dir=None):
+    """
+    Merge HRMS + Reviews, then add fake rows.
+    `companies` selects which review-store partitions to read (default: Nineleaps only).
+    With `workers` > 1 the fresh reviews are enriched in department shards on a process
+    pool; for a given `seed` the output is the same for any worker count.
+    Fresh reviews are found through the persistent merged-ID index (data/merged_ids.npy).
+    Returns the whole enriched table; when there are no fresh reviews it is returned as
+    stored (empty if there is none yet), and HRMS and the enrichment are skipped.
+    """
     project_root = Path(__file__).resolve().parent.parent
-    data_dir = project_root / "data"
-    backup_dir = project_root / "Backup" / "merged"
+    data_dir = Path(data_dir) if data_dir else project_root / "data"
+    backup_dir = Path(backup_dir) if backup_dir else project_root / "Backup" / "merged"
     os.makedirs(data_dir, exist_ok=True)
     os.makedirs(backup_dir, exist_ok=True)
 
     # Load datasets
-    hrms_path = data_dir / "hrms_latest.csv"
-    reviews_path = data_dir / "nineleaps-technology-solutions_reviews.csv"
-    enriched_path = data_dir / "reviews_enriched_latest.csv"
+    hrms_path = find_table(data_dir, "hrms_latest")
+    enriched_path = find_table(data_dir, "reviews_enriched_latest")
+
+    companies = companies or ["nineleaps-technology-solutions"]
+    df_reviews = pd.concat([load_reviews(slug, data_dir) for slug in companies], ignore_index=True)
+    df_reviews["ReviewDate"] = pd.to_datetime(df_reviews["ReviewDate"], errors="coerce")
 
-    df_hrms = pd.read_csv(hrms_path, parse_dates=["joining_date", "exit_date"])
-    df_reviews = pd.read_csv(reviews_path, parse_dates=["ReviewDate"])
+    # Filter only fresh (unmerged) reviews
+    merged_ids = merged_id_index(data_dir)
+    df_reviews = df_reviews[~merged_ids.contains(df_reviews['ReviewID'])]
 
     # Load existing enriched reviews if present
-    if enriched_path.exists():
-        existing_enriched_df = pd.read_csv(enriched_path, parse_dates=["review_date"])
-        already_merged_ids = set(existing_enriched_df['review_id'])
+    if enriched_path is not None:
+        existing_enriched_df = read_table(enriched_path)
     else:
         existing_enriched_df = pd.DataFrame()
-        already_merged_ids = set()
-
-    # Filter only fresh (unmerged) reviews
-    df_reviews = df_reviews[~df_reviews['ReviewID'].isin(already_merged_ids)]
 
     if df_reviews.empty:
         print("No new reviews to process.")
         return existing_enriched_df
 
+    df_hrms = read_table(hrms_path)
+
     # Clean department fields
     df_hrms['department'] = df_hrms['department'].str.strip()
     df_reviews['Department'] = df_reviews['Department'].str.replace('Department', '', regex=False).str.strip()
 
-    # Enrich fresh reviews
-    enriched_reviews = []
-    for _, review in df_reviews.iterrows():
-        dept_loc_employees = df_hrms[
-            (df_hrms['department'].str.lower() == review['Department'].lower()) &
-            (df_hrms['location'].str.lower() == str(review['Location']).lower())
-        ]
-        if not dept_loc_employees.empty:
-            mapped_emp = dept_loc_employees.sample(1).iloc[0]
-        else:
-            dept_employees = df_hrms[df_hrms['department'].str.lower() == review['Department'].lower()]
-            mapped_emp = dept_employees.sample(1).iloc[0] if not dept_employees.empty else df_hrms.sample(1).iloc[0]
-
-        enriched_reviews.append({
-            "review_id": review['ReviewID'],
-            "company": review['Company'],
-            "job_title": review['JobTitle'],
-            "department": review['Department'],
-            "location": review['Location'],
-            "review_date": review['ReviewDate'],
-            "overall_rating": review['OverallRating'],
-            "pros": review['Pros'],
-            "cons": review['Cons'],
-            "employee_id": mapped_emp['employee_id'],
-            "name": mapped_emp['name'],
-            "status": mapped_emp['status'],
-            "joining_date": mapped_emp['joining_date'],
-            "exit_date": mapped_emp['exit_date'],
-            "engagement_score": mapped_emp['engagement_score'],
-            "performance_rating": mapped_emp['performance_rating'],
-            "salary_band": mapped_emp['salary_band'],
-            "gender": mapped_emp['gender'],
-            "age": mapped_emp['age']
-        })
-
-    new_enriched_df = pd.DataFrame(enriched_reviews)
+    # Enrich fresh reviews: pick a random employee from the same department + location,
+    # else the same department, else anyone
+    group_index = HRMSGroupIndex(df_hrms)
+    rng = np.random.default_rng(seed)
+    u = rng.random(len(df_reviews))
+    if workers and workers > 1:
+        positions = match_reviews_sharded(group_index, df_reviews['Department'], df_reviews['Location'], u, workers)
+    else:
+        positions = group_index.positions(df_reviews['Department'], df_reviews['Location'], u)
+    mapped = df_hrms.iloc[positions]
+
+    new_enriched_df = pd.DataFrame({
+        "review_id": df_reviews['ReviewID'].values,
+        "company": df_reviews['Company'].values,
+        "job_title": df_reviews['JobTitle'].values,
+        "department": df_reviews['Department'].values,
+        "location": df_reviews['Location'].values,
+        "review_date": df_reviews['ReviewDate'].values,
+        "overall_rating": pd.to_numeric(df_reviews['OverallRating'], errors="coerce").values,
+        "pros": df_reviews['Pros'].values,
+        "cons": df_reviews['Cons'].values,
+        "employee_id": mapped['employee_id'].values,
+        "name": mapped['name'].values,
+        "status": mapped['status'].values,
+        "joining_date": mapped['joining_date'].values,
+        "exit_date": mapped['exit_date'].values,
+        "engagement_score": mapped['engagement_score'].values,
+        "performance_rating": mapped['performance_rating'].values,
+        "salary_band": mapped['salary_band'].values,
+        "gender": mapped['gender'].values,
+        "age": mapped['age'].values
+    })
 
     # Merge with old
     full_enriched_df = pd.concat([existing_enriched_df, new_enriched_df], ignore_index=True)
 
     # Add fake rows
-    fake_df = generate_fake_rows(fake_count, full_enriched_df)
+    fake_df = generate_fake_rows(fake_count, full_enriched_df, rng)
     final_df = pd.concat([full_enriched_df, fake_df], ignore_index=True)
 
     # Save with backup
-    save_with_backup(final_df, enriched_path, backup_dir, prefix="reviews_enriched")
+    save_with_backup(final_df, table_path(data_dir, "reviews_enriched_latest"), backup_dir, prefix="reviews_enriched")
+
+    # Only record the ids once the enriched file holding them is written
+    merged_ids.add(pd.concat([new_enriched_df['review_id'], fake_df['review_id']]))
 
     return final_df
 
 
 if __name__ == "__main__":
-    df = merge_with_faker()
+    df = merge_with_faker(workers=int(os.getenv("MERGER_WORKERS", "1")))
     print(df.tail(10))
@@ -0,0 +1,259 @@
+"""
+Bulk loading of DataFrames into the merged_data table.
+
+On PostgreSQL, rows are streamed with `COPY ... FROM STDIN` from an in-memory
+CSV buffer, `LOAD_BATCH_ROWS` rows per batch, instead of the one INSERT per row
+that `DataFrame.to_sql` sends. Other dialects, such as SQLite in local runs, fall
+back to SQLAlchemy multi-row `executemany` inserts in batches of the same size.
+
+`upsert_dataframe` makes the load idempotent on the table's primary key: on
+PostgreSQL the rows are copied into a temporary staging table and merged with
+`INSERT ... ON CONFLICT (review_id) DO NOTHING` (or `DO UPDATE`) in one
+transaction, so re-runs and concurrent pipeline runs cannot create duplicates
+and only the new rows cross the network. A merged_data partitioned by
+review_date has the primary key (review_id, review_date), and PostgreSQL cannot
+enforce a unique review_id across partitions. Rows are then still matched on
+review_id alone, under a lock that serialises concurrent upserts. A row whose
+review_date changed is deleted from its old partition before it is written
+again.
+
+Date columns are parsed to datetimes before loading, so they fill the DATE
+columns of merged_data, and strings that are not dates load as NULL instead of
+failing the whole COPY.
+"""
+import io
+import os
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import MetaData, Table, inspect, select, text
+
+from etl.storage import DATE_COLUMNS
+
+LOAD_BATCH_ROWS = int(os.getenv("LOAD_BATCH_ROWS", "50000"))
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / "sql" / "schema.sql"
+
+
+def ensure_schema(engine, schema_path=SCHEMA_PATH, connection=None):
+    """Create merged_data and its indexes (everything in sql/schema.sql) if they do not exist yet."""
+    with open(schema_path, "r") as f:
+        statements = [s.strip() for s in f.read().split(";") if s.strip()]
+    if connection is not None:
+        for statement in statements:
+            connection.execute(text(statement))
+        return
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+
+
+def _batches(df, batch_rows):
+    for start in range(0, len(df), batch_rows):
+        yield df.iloc[start:start + batch_rows]
+
+
+def _copy_batch(cursor, table, columns, batch):
+    buffer = io.StringIO()
+    batch.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    if hasattr(cursor, "copy_expert"):  # psycopg2
+        cursor.copy_expert(sql, buffer)
+    else:  # psycopg 3
+        with cursor.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+def copy_dataframe(df, table, engine, batch_rows=LOAD_BATCH_ROWS, connection=None):
+    """
+    Append the rows of `df` to `table` with COPY FROM STDIN (PostgreSQL only), in one
+    transaction. Pass an open SQLAlchemy `connection` to load inside its transaction
+    instead (e.g. into a temp table). Returns the number of rows loaded.
+    """
+    columns = [str(c) for c in df.columns]
+
+    def load(dbapi_connection):
+        cursor = dbapi_connection.cursor()
+        try:
+            for batch in _batches(df, batch_rows):
+                _copy_batch(cursor, table, columns, batch)
+        finally:
+            cursor.close()
+
+    if connection is not None:
+        load(connection.connection.dbapi_connection)
+        return len(df)
+
+    raw = engine.raw_connection()
+    try:
+        load(raw)
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+    return len(df)
+
+
+def with_date_columns(df):
+    """
+    review_date / joining_date / exit_date as datetimes for the DATE columns of merged_data.
+    Strings are read as ISO dates (a time or offset suffix is dropped); anything else becomes NaT.
+    """
+    columns = [c for c in DATE_COLUMNS if c in df.columns and not pd.api.types.is_datetime64_any_dtype(df[c])]
+    if not columns:
+        return df
+    df = df.copy()
+    for col in columns:
+        df[col] = pd.to_datetime(df[col].astype("string").str.slice(0, 10), format="%Y-%m-%d", errors="coerce")
+    return df
+
+
+def _records(batch):
+    """Rows as dicts with None for missing values, dates as datetime.date and plain Python scalars."""
+    batch = batch.copy()
+    for col in batch.columns:
+        if pd.api.types.is_datetime64_any_dtype(batch[col]):
+            batch[col] = batch[col].dt.date
+    batch = batch.astype(object).where(batch.notna(), None)
+    return batch.to_dict("records")
+
+
+def executemany_dataframe(df, table, engine, batch_rows=LOAD_BATCH_ROWS, connection=None):
+    """Append `df` to `table` with batched multi-row INSERTs (any dialect). Returns the number of rows."""
+    def load(conn):
+        target = Table(table, MetaData(), autoload_with=conn)
+        for batch in _batches(df, batch_rows):
+            conn.execute(target.insert(), _records(batch))
+
+    if connection is not None:
+        load(connection)
+    else:
+        with engine.begin() as conn:
+            load(conn)
+    return len(df)
+
+
+def load_dataframe(df, table, engine, batch_rows=LOAD_BATCH_ROWS):
+    """Bulk-append `df` to an existing `table`: COPY on PostgreSQL, executemany elsewhere."""
+    if df.empty:
+        return 0
+    df = with_date_columns(df)
+    if engine.dialect.name == "postgresql":
+        return copy_dataframe(df, table, engine, batch_rows)
+    return executemany_dataframe(df, table, engine, batch_rows)
+
+
+def _conflict_columns(conn, table, key):
+    """
+    The primary key of `table` when `key` is part of it, else just `key`. A merged_data
+    partitioned by review_date has the key (review_id, review_date), and ON CONFLICT needs all of it.
+    """
+    primary_key = inspect(conn).get_pk_constraint(table)["constrained_columns"]
+    return primary_key if key in primary_key else [key]
+
+
+def _stage_and_merge(df, table, conn, key, conflict, mode, batch_rows):
+    """PostgreSQL: COPY into a temp table, then INSERT ... ON CONFLICT into `table`. Returns (inserted ids, updated ids)."""
+    columns = [str(c) for c in df.columns]
+    column_list = ", ".join(columns)
+    stage = f"{table}_stage"
+    conn.execute(text(f"CREATE TEMP TABLE {stage} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"))
+    copy_dataframe(df, stage, None, batch_rows, connection=conn)
+    wide_key = conflict != [key]
+    if wide_key:
+        # No unique index can cover `key` alone, so check it here, one upsert at a time
+        conn.execute(text(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE"))
+    where = ""
+    if mode == "update":
+        assignments = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c not in conflict)
+        action = f"DO UPDATE SET {assignments}"
+        # xmax cannot be read back from a partitioned table, so look the existing keys up first
+        existing = set(conn.execute(text(
+            f"SELECT s.{key} FROM {stage} s JOIN {table} t USING ({key})"
+        )).scalars())
+        if wide_key:
+            # A changed partition column moves the row: drop the old version, then insert the new one
+            moved = " OR ".join(f"t.{c} IS DISTINCT FROM s.{c}" for c in conflict if c != key)
+            conn.execute(text(f"DELETE FROM {table} t USING {stage} s WHERE t.{key} = s.{key} AND ({moved})"))
+    else:
+        action = "DO NOTHING"  # only inserted rows are returned
+        existing = set()
+        if wide_key:
+            where = f" WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE t.{key} = s.{key})"
+    returned = conn.execute(text(
+        f"INSERT INTO {table} ({column_list}) "
+        f"SELECT DISTINCT ON ({key}) {column_list} FROM {stage} s{where} ORDER BY {key} "
+        f"ON CONFLICT ({', '.join(conflict)}) {action} "
+        f"RETURNING {key}"
+    )).scalars().all()
+    inserted_ids = [k for k in returned if k not in existing]
+    return inserted_ids, [k for k in returned if k in existing]
+
+
+def _upsert_rows(df, table, conn, key, conflict, mode, batch_rows):
+    """Other dialects with ON CONFLICT support (e.g. SQLite): batched executemany upserts."""
+    import importlib
+    dialect_insert = importlib.import_module(f"sqlalchemy.dialects.{conn.dialect.name}").insert
+    target = Table(table, MetaData(), autoload_with=conn)
+    existing = set()
+    for batch in _batches(df[key], 10000):
+        existing.update(conn.execute(select(target.c[key]).where(target.c[key].in_(batch.tolist()))).scalars())
+    for batch in _batches(df, batch_rows):
+        statement = dialect_insert(target)
+        if mode == "update":
+            statement = statement.on_conflict_do_update(
+                index_elements=conflict, set_={c: statement.excluded[c] for c in batch.columns if c not in conflict})
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=conflict)
+        conn.execute(statement, _records(batch))
+    inserted_ids = [k for k in df[key] if k not in existing]
+    updated_ids = [k for k in df[key] if k in existing] if mode == "update" else []
+    return inserted_ids, updated_ids
+
+
+def upsert_dataframe(df, table, engine, key="review_id", mode="ignore", batch_rows=LOAD_BATCH_ROWS,
+                     connection=None):
+    """
+    Idempotently load `df` into `table`, keyed on its primary key `key`. mode="ignore" leaves
+    existing rows untouched, mode="update" overwrites them. Pass an open `connection` to run
+    inside its transaction. Returns a dict with the counts of inserted / updated / skipped rows
+    (already present) and rejected rows (missing part of the primary key, e.g. the review_date
+    of a partitioned merged_data), and the lists of `inserted_ids`, `updated_ids` and `rejected_ids`.
+    """
+    if mode not in ("ignore", "update"):
+        raise ValueError(f"Unsupported upsert mode: {mode}")
+    df = with_date_columns(df.drop_duplicates(subset=key))
+    total = len(df)
+    if df.empty:
+        return {"inserted": 0, "updated": 0, "skipped": 0, "rejected": 0,
+                "inserted_ids": [], "updated_ids": [], "rejected_ids": []}
+
+    def load(conn):
+        conflict = _conflict_columns(conn, table, key)
+        keyed = df[conflict].notna().all(axis=1)
+        rejected_ids = df.loc[~keyed, key].tolist()
+        if rejected_ids:
+            print(f"⚠️ Rejecting {len(rejected_ids)} rows with no {' / '.join(conflict)}")
+        rows = df[keyed]
+        if rows.empty:
+            return [], [], rejected_ids
+        if conn.dialect.name == "postgresql":
+            return (*_stage_and_merge(rows, table, conn, key, conflict, mode, batch_rows), rejected_ids)
+        return (*_upsert_rows(rows, table, conn, key, conflict, mode, batch_rows), rejected_ids)
+
+    if connection is not None:
+        inserted_ids, updated_ids, rejected_ids = load(connection)
+    else:
+        with engine.begin() as conn:
+            inserted_ids, updated_ids, rejected_ids = load(conn)
+    return {
+        "inserted": len(inserted_ids),
+        "updated": len(updated_ids),
+        "skipped": total - len(inserted_ids) - len(updated_ids) - len(rejected_ids),
+        "rejected": len(rejected_ids),
+        "inserted_ids": inserted_ids,
+        "updated_ids": updated_ids,
+        "rejected_ids": rejected_ids,
+    }
@@ -0,0 +1,135 @@
+"""
+Shared HTTP layer for the scraper.
+
+One pooled keep-alive `requests.Session` reused across pages (and threads), with
+exponential-backoff retries on 429/5xx and connection errors, and ETag /
+Last-Modified conditional requests so unchanged pages come back as a bodiless
+304. Validators are persisted between runs; counters in `stats` show how much
+bandwidth and back-off time each run spent or saved.
+"""
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ScraperSession:
+    def __init__(self, validators_path=None, pool_size=10, max_retries=4, backoff=1.0, timeout=30, verify=False):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.verify = verify
+
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.validators_path = Path(validators_path) if validators_path else None
+        self.validators = {}
+        if self.validators_path and self.validators_path.exists():
+            try:
+                with open(self.validators_path, "r") as f:
+                    self.validators = json.load(f)
+            except (OSError, ValueError):
+                self.validators = {}
+
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "not_modified": 0,
+            "retries": 0,
+            "bytes_downloaded": 0,
+            "bytes_saved": 0,
+            "request_seconds": 0.0,
+            "retry_wait_seconds": 0.0,
+        }
+
+    def _count(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def _backoff(self, attempt, retry_after=None):
+        wait = self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+        if retry_after:
+            try:
+                wait = max(wait, float(retry_after))
+            except ValueError:
+                pass
+        self._count(retries=1, retry_wait_seconds=wait)
+        time.sleep(wait)
+
+    def fetch(self, url, headers=None):
+        """
+        GET `url` and return the body bytes, or None when the server answers
+        304 Not Modified for a page we have already seen.
+        Raises requests.exceptions.RequestException once retries are exhausted.
+        """
+        request_headers = dict(headers or {})
+        cached = self.validators.get(url)
+        if cached:
+            if cached.get("etag"):
+                request_headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                request_headers["If-Modified-Since"] = cached["last_modified"]
+
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                res = self.session.get(url, headers=request_headers, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                self._backoff(attempt)
+                continue
+            finally:
+                self._count(request_seconds=time.perf_counter() - start)
+
+            self._count(requests=1)
+            if res.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self._backoff(attempt, res.headers.get("Retry-After"))
+                continue
+            break
+
+        if res.status_code == 304 and cached:
+            self._count(not_modified=1, bytes_saved=cached.get("length", 0))
+            return None
+        res.raise_for_status()
+
+        etag = res.headers.get("ETag")
+        last_modified = res.headers.get("Last-Modified")
+        with self._lock:
+            if etag or last_modified:
+                self.validators[url] = {"etag": etag, "last_modified": last_modified, "length": len(res.content)}
+            else:
+                self.validators.pop(url, None)
+        self._count(bytes_downloaded=len(res.content))
+        return res.content
+
+    def save(self):
+        """Persist ETag/Last-Modified validators for the next run."""
+        if not self.validators_path:
+            return
+        os.makedirs(self.validators_path.parent, exist_ok=True)
+        tmp_path = self.validators_path.with_suffix(".tmp")
+        with self._lock:
+            with open(tmp_path, "w") as f:
+                json.dump(self.validators, f)
+        os.replace(tmp_path, self.validators_path)
+
+    def summary(self):
+        s = self.stats
+        return (f"{s['requests']} requests, {s['not_modified']} not modified "
+                f"({s['bytes_saved'] / 1024:.1f} KB saved), {s['bytes_downloaded'] / 1024:.1f} KB downloaded, "
+                f"{s['retries']} retries ({s['retry_wait_seconds']:.1f}s backing off), "
+                f"{s['request_seconds']:.1f}s in requests")
+
+    def close(self):
+        self.session.close()
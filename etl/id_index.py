@@ -0,0 +1,96 @@
+"""
+Persistent, exact index of review_ids.
+
+The ids are kept as one sorted fixed-width byte array in a `.npy` file, so a
+freshness check is a vectorised binary search (`np.searchsorted`) instead of a
+full read of the `reviews_enriched_latest` table or a `SELECT review_id` over the
+whole table. Updates merge the new ids in and atomically replace the file
+(write to a temp file, then `os.replace`), so a crash never leaves a partial
+index behind; callers add ids only after the data they describe is safely
+written.
+
+Three indexes live in `data/`: `merged_ids.npy` (rows written by the merger),
+`pushed_ids.npy` (rows committed to PostgreSQL by push.py) and `sheets_ids.npy`
+(rows appended to Google Sheets by push.py).
+"""
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from etl.storage import find_table, read_table
+
+
+def _encode(ids):
+    """review_ids as a numpy bytes array comparable with the stored index."""
+    encoded = pd.Series(ids, dtype=object).dropna().astype(str).str.encode("utf-8")
+    return np.array(encoded.tolist(), dtype="S") if len(encoded) else np.array([], dtype="S1")
+
+
+class IdIndex:
+    def __init__(self, path):
+        self.path = Path(path)
+        self._ids = np.load(self.path) if self.path.exists() else np.array([], dtype="S1")
+
+    def exists(self):
+        return self.path.exists()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, review_id):
+        return bool(self.contains([review_id])[0])
+
+    def contains(self, ids):
+        """Boolean array: which of `ids` are already in the index (NaN ids never are)."""
+        ids = pd.Series(ids, dtype=object)
+        hit = np.zeros(len(ids), dtype=bool)
+        present = ids.notna().values
+        keys = _encode(ids[present])
+        if len(self._ids) and len(keys):
+            positions = np.searchsorted(self._ids, keys).clip(max=len(self._ids) - 1)
+            hit[present] = self._ids[positions] == keys
+        return hit
+
+    def add(self, ids):
+        """Merge `ids` into the index and persist it atomically. Returns the number of new ids."""
+        before = len(self._ids)
+        self._ids = np.union1d(self._ids, _encode(ids))
+        self.save()
+        return len(self._ids) - before
+
+    def difference(self, other):
+        """review_ids in this index but not in `other`, as a list of str."""
+        missing = np.setdiff1d(self._ids, other._ids, assume_unique=True)
+        return [review_id.decode("utf-8") for review_id in missing]
+
+    def save(self):
+        os.makedirs(self.path.parent, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".npy.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, self._ids)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def merged_id_index(data_dir):
+    """
+    The merger's index of enriched review_ids. Built once from the review_id column of
+    an existing reviews_enriched_latest table when the index file does not exist yet, and
+    treated as empty when the enriched table itself is gone.
+    """
+    data_dir = Path(data_dir)
+    index = IdIndex(data_dir / "merged_ids.npy")
+    enriched_path = find_table(data_dir, "reviews_enriched_latest")
+    if enriched_path is None:
+        index._ids = np.array([], dtype="S1")
+    elif not index.exists():
+        index.add(read_table(enriched_path, columns=["review_id"])["review_id"])
+        print(f"✅ Built merged-ID index with {len(index)} ids from {enriched_path.name}")
+    return index
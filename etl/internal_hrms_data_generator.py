@@ -1,25 +1,98 @@
+import numpy as np
 import pandas as pd
-import random
-import datetime
-from pathlib import Path
 import os
-from datetime import datetime as dt
-
-def generate_hrms_dummy_data(save_csv=True):
+from pathlib import Path
+from etl.backup_store import BackupStore
+from etl.storage import DATA_FORMAT, count_rows, find_table, read_table, table_path, with_categoricals
+
+# HRMS fields
+DEPARTMENTS = [
+    'IT Support Department', 'Software Development Department',
+    'HR Operations Department', 'DBA / Data warehousing Department',
+    'Data Science & Machine Learning Department', 'Business Intelligence & Analytics Department',
+    'UI / UX Department', 'Quality Assurance and Testing Department',
+    'Production & Manufacturing Department', 'Data Science & Analytics - Other Department',
+    'Engineering Department', 'Marketing Department', 'Data Department',
+    'Product Management - Technology Department', 'Technology / IT Department',
+    'Recruitment & Talent Acquisition Department', 'Operations Support Department'
+]
+LOCATIONS = ['Bangalore / Bengaluru', 'Hyderabad / Secunderabad', 'Nandigama']
+DESIGNATIONS = [
+    'Data Engineer', 'Lead Software Engineer', 'Software Development Engineer II', 'Front end Engineer',
+    'Associate', 'HR Executive', 'Software Development Engineer 1', 'Software Engineer', 'Data Analyst 1',
+    'Data Analyst', 'UI UX Developer', 'Software Development Engineer', 'Quality Engineer',
+    'Software Developer', 'Principal Engineer', 'Junior Engineer', 'Marketing Executive',
+    'Senior Quality Engineer', 'Sdet', 'SDE', 'Principal Software Engineer', 'Associate Project Manager',
+    'QA Engineer', 'Senior Talent Partner', 'Senior Software Engineer', 'Member Technical Staff 2',
+    'SDE-2', 'Technical Staff Member 3', 'Senior QA Engineer'
+]
+ATTRITION_REASONS = ['Better Opportunity', 'Work-Life Balance', 'Relocation', 'Compensation', 'Personal Reasons']
+SALARY_BANDS = ['A', 'B', 'C']
+INDIAN_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Diya', 'Ishaan', 'Ananya', 'Riya', 'Karthik', 'Sneha', 'Arjun',
+                'Priya', 'Rahul', 'Meera', 'Siddharth', 'Aisha', 'Vikram', 'Lakshmi', 'Rohan', 'Pooja', 'Krishna']
+
+SURNAMES = ['Sharma', 'Reddy', 'Patel', 'Iyer', 'Nair', 'Singh']
+GENDERS = ['Male', 'Female']
+
+HRMS_CHUNK_ROWS = int(os.getenv("HRMS_CHUNK_ROWS", "250000"))
+
+START_DATE = np.datetime64('2018-01-01', 'D')
+END_DATE = np.datetime64('2025-01-01', 'D')
+
+
+def generate_hrms_rows(first_emp_id, count, rng=None):
+    """
+    Generate `count` synthetic employees (EMP ids from `first_emp_id`) in one vectorised
+    pass. Same columns and distributions as the original per-row loop: joining within
+    2000 days of 2018-01-01, half exit 200-2000 days later, and exits after 2025-01-01
+    revert to Active. Pass a seeded `numpy.random.Generator` for reproducible output.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+
+    def pick(options):
+        return np.asarray(options, dtype=object)[rng.integers(0, len(options), count)]
+
+    joining = START_DATE + rng.integers(0, 2001, count).astype('timedelta64[D]')
+    is_exited = rng.random(count) < 0.5
+    exit_date = joining + rng.integers(200, 2001, count).astype('timedelta64[D]')
+    is_exited &= exit_date <= END_DATE
+    exit_date[~is_exited] = np.datetime64('NaT')
+
+    full_names = np.array([f"{first} {last}" for first in INDIAN_NAMES for last in SURNAMES], dtype=object)
+    emp_ids = np.arange(first_emp_id, first_emp_id + count)
+
+    return pd.DataFrame({
+        "employee_id": np.char.add("EMP", np.char.zfill(emp_ids.astype(str), 4)),
+        "name": full_names[rng.integers(0, len(full_names), count)],
+        "department": pick(DEPARTMENTS),
+        "location": pick(LOCATIONS),
+        "designation": pick(DESIGNATIONS),
+        "joining_date": joining,
+        "exit_date": exit_date,
+        "status": np.where(is_exited, "Exited", "Active").astype(object),
+        "attrition_reason": np.where(is_exited, pick(ATTRITION_REASONS), ""),
+        "engagement_score": np.round(rng.uniform(4, 9, count), 1),
+        "performance_rating": rng.integers(1, 6, count),
+        "salary_band": pick(SALARY_BANDS),
+        "gender": pick(GENDERS),
+        "age": rng.integers(22, 51, count),
+    })
+
+
+def generate_hrms_dummy_data(save_csv=True, seed=None):
     project_root = Path(__file__).resolve().parent.parent
     data_dir = project_root / "data"
     backup_dir = project_root / "Backup" / "hrms"
 
-    reviews_path = data_dir / "nineleaps-technology-solutions_reviews.csv"
-    hrms_path = data_dir / "hrms_latest.csv"
+    hrms_path = find_table(data_dir, "hrms_latest")
 
-    # Load existing reviews
-    reviews_df = pd.read_csv(reviews_path)
-    total_reviews = len(reviews_df)
+    # Count existing reviews (from the review store's id index)
+    from etl.review_store import count_reviews
+    total_reviews = count_reviews("nineleaps-technology-solutions", data_dir)
 
     # Load existing HRMS if it exists
-    if hrms_path.exists():
-        existing_hrms_df = pd.read_csv(hrms_path)
+    if hrms_path is not None:
+        existing_hrms_df = read_table(hrms_path)
         existing_count = len(existing_hrms_df)
     else:
         existing_hrms_df = pd.DataFrame()
@@ -34,73 +107,95 @@ def generate_hrms_dummy_data(save_csv=True):
 
     print(f" Generating HRMS data for {new_count} new reviews...")
 
-    # HRMS fields
-    departments = [
-        'IT Support Department', 'Software Development Department',
-        'HR Operations Department', 'DBA / Data warehousing Department',
-        'Data Science & Machine Learning Department', 'Business Intelligence & Analytics Department',
-        'UI / UX Department', 'Quality Assurance and Testing Department',
-        'Production & Manufacturing Department', 'Data Science & Analytics - Other Department',
-        'Engineering Department', 'Marketing Department', 'Data Department',
-        'Product Management - Technology Department', 'Technology / IT Department',
-        'Recruitment & Talent Acquisition Department', 'Operations Support Department'
-    ]
-    locations = ['Bangalore / Bengaluru', 'Hyderabad / Secunderabad', 'Nandigama']
-    designations = [
-        'Data Engineer', 'Lead Software Engineer', 'Software Development Engineer II', 'Front end Engineer',
-        'Associate', 'HR Executive', 'Software Development Engineer 1', 'Software Engineer', 'Data Analyst 1',
-        'Data Analyst', 'UI UX Developer', 'Software Development Engineer', 'Quality Engineer',
-        'Software Developer', 'Principal Engineer', 'Junior Engineer', 'Marketing Executive',
-        'Senior Quality Engineer', 'Sdet', 'SDE', 'Principal Software Engineer', 'Associate Project Manager',
-        'QA Engineer', 'Senior Talent Partner', 'Senior Software Engineer', 'Member Technical Staff 2',
-        'SDE-2', 'Technical Staff Member 3', 'Senior QA Engineer'
-    ]
-    attrition_reasons = ['Better Opportunity', 'Work-Life Balance', 'Relocation', 'Compensation', 'Personal Reasons']
-    salary_bands = ['A', 'B', 'C']
-    indian_names = ['Aarav', 'Vivaan', 'Aditya', 'Diya', 'Ishaan', 'Ananya', 'Riya', 'Karthik', 'Sneha', 'Arjun',
-                    'Priya', 'Rahul', 'Meera', 'Siddharth', 'Aisha', 'Vikram', 'Lakshmi', 'Rohan', 'Pooja', 'Krishna']
-
-    start_date = datetime.date(2018, 1, 1)
-    end_date = datetime.date(2025, 1, 1)
-
-    data = []
-    for emp_id in range(existing_count + 1, total_reviews + 1):
-        joining = start_date + datetime.timedelta(days=random.randint(0, 2000))
-        is_exited = random.choice([True, False])
-        exit_date = joining + datetime.timedelta(days=random.randint(200, 2000)) if is_exited else None
-        if exit_date and exit_date > end_date:
-            exit_date = None
-            is_exited = False
-
-        data.append({
-            "employee_id": f"EMP{emp_id:04d}",
-            "name": random.choice(indian_names) + " " + random.choice(['Sharma', 'Reddy', 'Patel', 'Iyer', 'Nair', 'Singh']),
-            "department": random.choice(departments),
-            "location": random.choice(locations),
-            "designation": random.choice(designations),
-            "joining_date": joining,
-            "exit_date": exit_date,
-            "status": "Exited" if is_exited else "Active",
-            "attrition_reason": random.choice(attrition_reasons) if is_exited else "",
-            "engagement_score": round(random.uniform(4, 9), 1),
-            "performance_rating": random.randint(1, 5),
-            "salary_band": random.choice(salary_bands),
-            "gender": random.choice(['Male', 'Female']),
-            "age": random.randint(22, 50)
-        })
-
-    new_df = pd.DataFrame(data)
+    new_df = generate_hrms_rows(existing_count + 1, new_count, np.random.default_rng(seed))
     combined_df = pd.concat([existing_hrms_df, new_df], ignore_index=True)
 
     # Save with backup
     if save_csv:
         from etl.utils import save_with_backup
-        save_with_backup(combined_df, hrms_path, backup_dir, prefix="hrms_data")
+        save_with_backup(combined_df, table_path(data_dir, "hrms_latest"), backup_dir, prefix="hrms_data")
 
     print(f"HRMS updated. Total records: {len(combined_df)}")
 
     return combined_df
 
+def count_existing_rows(path):
+    """
+    Row count of an HRMS CSV (newlines minus the header, read in 1 MB blocks) or of a
+    Parquet file / part directory (from the file footers) without loading any data.
+    """
+    path = Path(path)
+    return count_rows(path) if path.exists() else 0
+
+
+def stream_hrms_dummy_data(target_count=None, chunk_rows=HRMS_CHUNK_ROWS, output_format=DATA_FORMAT, seed=None,
+                           data_dir=None, backup=True, backup_dir=None):
+    """
+    Grow the HRMS dataset to `target_count` employees (default: the number of scraped
+    reviews) by generating and writing `chunk_rows` at a time, so peak memory depends on
+    the chunk size rather than the dataset size. "csv" appends to hrms_latest.csv;
+    "parquet" adds part files to the hrms_latest.parquet/ directory (a single-file
+    hrms_latest.parquet written by save_with_backup becomes its first part). The result is
+    then snapshotted into the deduplicated backup store, block by block. Raises ValueError
+    if hrms_latest exists only in the other format. Returns the number of rows written.
+    """
+    project_root = Path(__file__).resolve().parent.parent
+    data_dir = Path(data_dir) if data_dir else project_root / "data"
+    backup_dir = Path(backup_dir) if backup_dir else project_root / "Backup" / "hrms"
+    os.makedirs(data_dir, exist_ok=True)
+
+    if output_format == "csv":
+        hrms_path = data_dir / "hrms_latest.csv"
+    elif output_format == "parquet":
+        hrms_path = data_dir / "hrms_latest.parquet"
+    else:
+        raise ValueError(f"Unsupported HRMS output format: {output_format}")
+    existing_path = find_table(data_dir, "hrms_latest")
+    if existing_path is not None and not hrms_path.exists():
+        # Counting it as empty would restart the employee ids at EMP0001
+        raise ValueError(f"HRMS data already exists as {existing_path.name}; stream it with "
+                         f"output_format={existing_path.suffix[1:]!r} or convert it first")
+
+    if target_count is None:
+        from etl.review_store import count_reviews
+        target_count = count_reviews("nineleaps-technology-solutions", data_dir)
+
+    existing_count = count_existing_rows(hrms_path)
+    new_count = target_count - existing_count
+    if new_count <= 0:
+        print(" No new reviews found. HRMS data is up to date.")
+        return 0
+
+    print(f" Streaming {new_count} HRMS rows to {hrms_path} in chunks of {chunk_rows}...")
+    if output_format == "parquet" and hrms_path.is_file():
+        first_part = hrms_path.with_name(f".{hrms_path.name}.part")
+        os.replace(hrms_path, first_part)
+        os.makedirs(hrms_path)
+        os.replace(first_part, hrms_path / "part-00000.parquet")
+    rng = np.random.default_rng(seed)
+    part_index = len(list(hrms_path.glob("part-*.parquet"))) if hrms_path.is_dir() else 0
+    for offset in range(0, new_count, chunk_rows):
+        chunk = generate_hrms_rows(existing_count + offset + 1, min(chunk_rows, new_count - offset), rng)
+        if output_format == "csv":
+            write_header = not hrms_path.exists() or hrms_path.stat().st_size == 0
+            chunk.to_csv(hrms_path, mode="a", header=write_header, index=False)
+        else:
+            os.makedirs(hrms_path, exist_ok=True)
+            with_categoricals(chunk).to_parquet(hrms_path / f"part-{part_index:05d}.parquet", index=False)
+            part_index += 1
+
+    if backup:
+        store = BackupStore(backup_dir)
+        store.snapshot_table(hrms_path, prefix="hrms_data")
+        store.prune("hrms_data")
+
+    print(f"HRMS updated. Total records: {existing_count + new_count}")
+    return new_count
+
 if __name__ == "__main__":
-    df_hrms = generate_hrms_dummy_data()
-    print(df_hrms.tail(3))
+    if os.getenv("HRMS_STREAM", "false").lower() == "true":
+        target_count = int(os.getenv("HRMS_TARGET_ROWS")) if os.getenv("HRMS_TARGET_ROWS") else None
+        stream_hrms_dummy_data(target_count, output_format=os.getenv("HRMS_OUTPUT_FORMAT", DATA_FORMAT))
+    else:
+        df_hrms = generate_hrms_dummy_data()
+        print(df_hrms.tail(3))
@@ -0,0 +1,180 @@
+"""
+Migrate an existing merged_data table to the typed, indexed schema in sql/schema.sql.
+
+Tables created before the schema was typed store review_date, joining_date and
+exit_date as TEXT and have no secondary indexes, so every date-range or
+per-department query scans the table and parses strings. On PostgreSQL this
+tool, in one transaction:
+
+1. converts the three date columns to DATE in a single table rewrite.
+   Values that are not ISO dates become NULL.
+2. adds the CHECK constraint on status.
+3. creates the indexes from sql/schema.sql: (department, status),
+   review_date and employee_id.
+4. with --partition, moves the rows into a copy of the table that is
+   range-partitioned by review_date. It has one partition per year plus a
+   DEFAULT partition, and its primary key becomes (review_id, review_date),
+   because a partitioned table's keys must include the partition column.
+   db_loader.upsert_dataframe still keeps review_id unique. The old table is
+   kept as merged_data_old until you drop it.
+
+Every step is skipped when it has already been applied, so re-running is safe.
+
+    python etl/migrate_schema.py                 # types, constraint, indexes
+    python etl/migrate_schema.py --partition     # ... and yearly partitions
+    python etl/migrate_schema.py --check         # list pending steps only
+"""
+import argparse
+from datetime import date
+
+from sqlalchemy import text
+
+from etl.db_loader import ensure_schema
+from etl.storage import DATE_COLUMNS
+
+TABLE = "merged_data"
+STATUS_CHECK = "merged_data_status_check"
+STATUS_VALUES = ("Active", "Exited")
+ISO_DATE = r"^\d{4}-\d{2}-\d{2}"
+
+
+def column_types(conn, table=TABLE):
+    """{column: data_type} of `table` in the current schema."""
+    rows = conn.execute(text(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table"
+    ), {"table": table}).fetchall()
+    return dict(rows)
+
+
+def is_partitioned(conn, table=TABLE):
+    return conn.execute(text(
+        "SELECT c.relkind = 'p' FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE n.nspname = current_schema() AND c.relname = :table"
+    ), {"table": table}).scalar() is True
+
+
+def _has_constraint(conn, name):
+    return conn.execute(text(
+        "SELECT 1 FROM pg_constraint c JOIN pg_namespace n ON n.oid = c.connamespace "
+        "WHERE n.nspname = current_schema() AND c.conname = :name"
+    ), {"name": name}).scalar() is not None
+
+
+def pending_steps(conn, partition=False):
+    """Names of the migration steps still to apply to merged_data ([] when up to date)."""
+    types = column_types(conn)
+    if not types:
+        return []
+    steps = []
+    if any(types.get(col) != "date" for col in DATE_COLUMNS):
+        steps.append("date columns")
+    if not _has_constraint(conn, STATUS_CHECK):
+        steps.append("status check")
+    indexes = set(conn.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table"
+    ), {"table": TABLE}).scalars())
+    if not {"merged_data_department_status_idx", "merged_data_review_date_idx",
+            "merged_data_employee_id_idx"} <= indexes:
+        steps.append("indexes")
+    if partition and not is_partitioned(conn):
+        steps.append("partitions")
+    return steps
+
+
+def convert_date_columns(conn):
+    """TEXT -> DATE for the date columns, in one ALTER TABLE (one table rewrite)."""
+    types = column_types(conn)
+    alters = [
+        f"ALTER COLUMN {col} TYPE DATE USING "
+        f"CASE WHEN {col} ~ '{ISO_DATE}' THEN substring({col} from 1 for 10)::date END"
+        for col in DATE_COLUMNS if types.get(col) != "date"
+    ]
+    if alters:
+        conn.execute(text(f"ALTER TABLE {TABLE} " + ", ".join(alters)))
+
+
+def _status_check():
+    values = ", ".join(f"'{value}'" for value in STATUS_VALUES)
+    return f"CONSTRAINT {STATUS_CHECK} CHECK (status IN ({values}))"
+
+
+def add_status_check(conn):
+    if not _has_constraint(conn, STATUS_CHECK):
+        conn.execute(text(f"ALTER TABLE {TABLE} ADD {_status_check()}"))
+
+
+def partition_by_review_date(conn):
+    """
+    Rebuild merged_data as a table range-partitioned by review_date, one partition per
+    year plus a DEFAULT partition. The old table is renamed to merged_data_old.
+    """
+    missing = conn.execute(text(f"SELECT COUNT(*) FROM {TABLE} WHERE review_date IS NULL")).scalar()
+    if missing:
+        raise RuntimeError(f"{missing} rows have no review_date; a table partitioned by "
+                           f"review_date cannot hold them. Fix or delete them first.")
+    first_year = conn.execute(text(f"SELECT EXTRACT(YEAR FROM MIN(review_date))::int FROM {TABLE}")).scalar()
+    first_year = first_year or date.today().year
+
+    # Free the old table's index and key names for the new table
+    for index in conn.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() "
+        "AND tablename = :table AND indexname <> :pkey"
+    ), {"table": TABLE, "pkey": f"{TABLE}_pkey"}).scalars():
+        conn.execute(text(f"ALTER INDEX {index} RENAME TO {index}_old"))
+    conn.execute(text(f"ALTER TABLE {TABLE} RENAME CONSTRAINT {TABLE}_pkey TO {TABLE}_old_pkey"))
+    conn.execute(text(f"ALTER TABLE {TABLE} RENAME CONSTRAINT {STATUS_CHECK} TO {STATUS_CHECK}_old"))
+    conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_old"))
+
+    conn.execute(text(
+        f"CREATE TABLE {TABLE} (LIKE {TABLE}_old INCLUDING DEFAULTS, {_status_check()}, "
+        f"CONSTRAINT {TABLE}_pkey PRIMARY KEY (review_id, review_date)) "
+        f"PARTITION BY RANGE (review_date)"
+    ))
+    for year in range(first_year, date.today().year + 2):
+        conn.execute(text(
+            f"CREATE TABLE {TABLE}_y{year} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        ))
+    conn.execute(text(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT"))
+    conn.execute(text(f"INSERT INTO {TABLE} SELECT * FROM {TABLE}_old"))
+
+
+def migrate(engine, partition=False):
+    """Apply the pending steps to merged_data in one transaction. Returns the steps applied."""
+    if engine.dialect.name != "postgresql":
+        raise RuntimeError("The merged_data migration needs PostgreSQL")
+    with engine.begin() as conn:
+        steps = pending_steps(conn, partition)
+        if "date columns" in steps:
+            convert_date_columns(conn)
+        if "status check" in steps:
+            add_status_check(conn)
+        if "partitions" in steps:
+            partition_by_review_date(conn)
+        ensure_schema(engine, connection=conn)  # creates the table when missing, and the indexes
+    if steps:
+        with engine.begin() as conn:
+            conn.execute(text(f"ANALYZE {TABLE}"))
+    return steps
+
+
+if __name__ == "__main__":
+    from etl.connections import get_engine
+
+    parser = argparse.ArgumentParser(description="Migrate merged_data to the typed, indexed schema")
+    parser.add_argument("--url", help="database URL (default: DATABASE_URL / SUPABASE_*)")
+    parser.add_argument("--partition", action="store_true", help="also range-partition by review_date")
+    parser.add_argument("--check", action="store_true", help="only list the pending steps")
+    args = parser.parse_args()
+    engine = get_engine(args.url)
+
+    if args.check:
+        with engine.connect() as conn:
+            steps = pending_steps(conn, args.partition)
+        print(f"⚠️ Pending: {', '.join(steps)}" if steps else "✅ merged_data is up to date.")
+    else:
+        steps = migrate(engine, args.partition)
+        print(f"✅ Applied: {', '.join(steps)}" if steps else "✅ merged_data is up to date.")
+        if "partitions" in steps:
+            print("✅ The previous table is kept as merged_data_old; drop it once you have checked the new one.")
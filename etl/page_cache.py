@@ -0,0 +1,103 @@
+"""
+On-disk cache of raw review pages.
+
+Page bodies are gzip-compressed and stored once per content hash under
+`objects/`; `refs/<slug>/<page>` records which blob a company page last
+resolved to. Writes are atomic renames, so several scrapes can share one cache
+directory. `evict()` trims the least recently written blobs once the cache
+grows past `max_bytes`.
+"""
+import gzip
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+
+def _atomic_write(path, data):
+    os.makedirs(path.parent, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class PageCache:
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def _blob_path(self, digest):
+        return self.root / "objects" / digest[:2] / f"{digest}.html.gz"
+
+    def _ref_path(self, company_slug, page):
+        return self.root / "refs" / company_slug / str(page)
+
+    def put(self, company_slug, page, content):
+        """Store a fetched page body; identical bodies share one blob. Returns the hash."""
+        digest = hashlib.sha256(content).hexdigest()
+        blob_path = self._blob_path(digest)
+        if blob_path.exists():
+            os.utime(blob_path)
+        else:
+            _atomic_write(blob_path, gzip.compress(content, compresslevel=6))
+        _atomic_write(self._ref_path(company_slug, page), digest.encode())
+        return digest
+
+    def blob_for(self, company_slug, page):
+        """Path of the cached blob for a page, or None if it is not (or no longer) cached."""
+        ref_path = self._ref_path(company_slug, page)
+        try:
+            digest = ref_path.read_text().strip()
+        except FileNotFoundError:
+            return None
+        blob_path = self._blob_path(digest)
+        return blob_path if blob_path.exists() else None
+
+    def get(self, company_slug, page):
+        blob_path = self.blob_for(company_slug, page)
+        return read_blob(blob_path) if blob_path else None
+
+    def pages(self, company_slug):
+        """Cached (page, blob_path) pairs for a company, in page order."""
+        ref_dir = self.root / "refs" / company_slug
+        if not ref_dir.exists():
+            return []
+        cached = []
+        for ref_path in ref_dir.iterdir():
+            if not ref_path.name.isdigit():
+                continue
+            blob_path = self.blob_for(company_slug, int(ref_path.name))
+            if blob_path:
+                cached.append((int(ref_path.name), blob_path))
+        return sorted(cached)
+
+    def companies(self):
+        ref_root = self.root / "refs"
+        return sorted(p.name for p in ref_root.iterdir() if p.is_dir()) if ref_root.exists() else []
+
+    def size(self):
+        return sum(p.stat().st_size for p in (self.root / "objects").glob("*/*.html.gz"))
+
+    def evict(self):
+        """Delete the oldest blobs (and refs pointing at them) until under max_bytes. Returns bytes freed."""
+        blobs = [(p.stat().st_mtime, p.stat().st_size, p) for p in (self.root / "objects").glob("*/*.html.gz")]
+        total = sum(size for _, size, _ in blobs)
+        freed = 0
+        for _, size, blob_path in sorted(blobs, key=lambda b: b[0]):
+            if total - freed <= self.max_bytes:
+                break
+            blob_path.unlink(missing_ok=True)
+            freed += size
+        if freed:
+            for ref_path in (self.root / "refs").glob("*/*"):
+                if not self._blob_path(ref_path.read_text().strip()).exists():
+                    ref_path.unlink(missing_ok=True)
+        return freed
+
+
+def read_blob(blob_path):
+    with gzip.open(blob_path, "rb") as f:
+        return f.read()
@@ -1,106 +1,168 @@
 import os
-from urllib.parse import quote_plus
-from data_merger import merge_with_faker
-from sqlalchemy import create_engine, text
-import httplib2
-from google_auth_httplib2 import AuthorizedHttp
-from googleapiclient.discovery import build
-from google.oauth2.service_account import Credentials
-from dotenv import load_dotenv
-import pandas as pd
-
-# Load environment variables
-load_dotenv()
-
-# --- PostgreSQL/Supabase Setup ---
-POSTGRES_USER = os.getenv("SUPABASE_USER")
-POSTGRES_PASSWORD = os.getenv("SUPABASE_PASSWORD")
-POSTGRES_HOST = os.getenv("SUPABASE_HOST", "aws-1-ap-south-1.pooler.supabase.com")
-POSTGRES_PORT = os.getenv("SUPABASE_PORT", "5432")
-POSTGRES_DB = os.getenv("SUPABASE_DB", "postgres")
-
-encoded_password = quote_plus(POSTGRES_PASSWORD)
-
-engine = create_engine(
-    f"postgresql+psycopg2://{POSTGRES_USER}:{encoded_password}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}?sslmode=require"
-)
-
-# --- Google Sheets Setup ---
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-GOOGLE_CREDS_PATH = os.getenv("GOOGLE_CREDS_PATH")
-CREDS = Credentials.from_service_account_file(GOOGLE_CREDS_PATH, scopes=SCOPES)
-unverified_http = httplib2.Http(disable_ssl_certificate_validation=True)
-authorized_http = AuthorizedHttp(CREDS, http=unverified_http)
-service = build("sheets", "v4", http=authorized_http)
-
+from pathlib import Path
+from sqlalchemy import inspect, text
+from etl.connections import get_engine, get_sheets_service
+from etl.id_index import IdIndex, merged_id_index
+from etl.storage import find_table, read_table
+from etl.aggregates import AGG_TABLE, COUNTS_TABLE, rows_for_ids, unbuilt_aggregates, update_aggregates
+from etl.db_loader import ensure_schema, upsert_dataframe
+from etl.migrate_schema import pending_steps
+from etl.sheets_writer import read_column, write_rows_resumable
+from etl.sinks import SINK_TIMEOUT, run_sinks
+
+# --- PostgreSQL/Supabase and Google Sheets ---
+# Connections are created on first use by etl/connections.py (SUPABASE_*, GOOGLE_CREDS_PATH)
 SPREADSHEET_ID = os.getenv("GOOGLE_SPREADSHEET_ID")
 SHEET_NAME = os.getenv("GOOGLE_SHEET_NAME", "Master Data")
+# First row of an unfinished Sheets push, so an interrupted push can be reconciled
+SHEETS_PROGRESS_PATH = Path(__file__).resolve().parent.parent / "data" / "sheets_progress.json"
+
+# "ignore" keeps rows already in merged_data, "update" overwrites them
+PUSH_UPSERT_MODE = os.getenv("PUSH_UPSERT_MODE", "ignore")
+
+# Per-sink timeouts (seconds); the sinks run concurrently
+PUSH_DB_TIMEOUT = float(os.getenv("PUSH_DB_TIMEOUT", str(SINK_TIMEOUT)))
+PUSH_SHEETS_TIMEOUT = float(os.getenv("PUSH_SHEETS_TIMEOUT", str(SINK_TIMEOUT)))
 
 
-def append_to_sheets_fresh_only(df):
+def append_to_sheets_fresh_only(df, sheets_ids):
     """
-    Appends a dataframe to Google Sheets, including the header only if the sheet is empty.
+    Appends the rows of a dataframe not yet in `sheets_ids` to Google Sheets, including the header
+    only if the sheet is empty. Rows go out in size-bounded, retried batches, and each confirmed
+    batch's review_ids are added to `sheets_ids`, so an interrupted push resumes without duplicates.
+    Returns the number of rows written.
     """
     if df.empty:
         print("✅ No fresh data to append to Google Sheets.")
-        return
+        return 0
 
-    # Check if the sheet is empty to decide whether to include the header
-    result = service.spreadsheets().values().get(
-        spreadsheetId=SPREADSHEET_ID,
-        range=f"{SHEET_NAME}!A1:A1"
-    ).execute()
+    written = write_rows_resumable(get_sheets_service(), SPREADSHEET_ID, SHEET_NAME, df, sheets_ids,
+                                   progress_path=SHEETS_PROGRESS_PATH)
+    print(f"✅ Appended {written} fresh rows to Google Sheets.")
+    return written
 
-    sheet_is_empty = 'values' not in result
 
-    if sheet_is_empty:
-        # Append with header
-        values_to_append = [df.columns.tolist()] + df.astype(str).values.tolist()
-    else:
-        # Append without header
-        values_to_append = df.astype(str).values.tolist()
-
-    body = {"values": values_to_append}
+def pending_push_rows(df_final, data_dir, pushed_ids):
+    """
+    Merged rows not yet committed to PostgreSQL: the difference between the merged-ID and
+    pushed-ID indexes. Rows missing from `df_final` (e.g. left over from a failed earlier
+    push) are read back from the reviews_enriched_latest table, filtered while reading.
+    """
+    pending_ids = merged_id_index(data_dir).difference(pushed_ids)
+    if not pending_ids:
+        return df_final.iloc[0:0]
+    fresh_df = df_final[df_final["review_id"].isin(pending_ids)] if not df_final.empty else df_final
+    if len(fresh_df) < len(pending_ids):
+        enriched_path = find_table(data_dir, "reviews_enriched_latest")
+        fresh_df = read_table(enriched_path, filters=[("review_id", "in", pending_ids)])
+    return fresh_df
+
+
+def push_to_database(engine, fresh_df, pushed_ids):
+    """Sink: upsert `fresh_df` into merged_data, update the KPI aggregates and record the committed ids."""
+    if fresh_df.empty:
+        return {"rows": 0}
+    ensure_schema(engine)
+    with engine.connect() as conn:
+        steps = pending_steps(conn) if engine.dialect.name == "postgresql" else []
+        unbuilt = unbuilt_aggregates(conn)
+    if steps:
+        print(f"⚠️ merged_data predates the typed schema ({', '.join(steps)}); run etl/migrate_schema.py")
+    if unbuilt:
+        print(f"⚠️ {', '.join(unbuilt)} not built for the rows already in merged_data; "
+              "run python etl/aggregates.py rebuild (not updated by this push)")
+    tables = [t for t in (AGG_TABLE, COUNTS_TABLE) if t not in unbuilt]
+    # The rows and the KPI aggregates they feed are committed together
+    with engine.begin() as conn:
+        track = bool(tables) and PUSH_UPSERT_MODE == "update"
+        previous = rows_for_ids(conn, fresh_df["review_id"]) if track else None
+        result = upsert_dataframe(fresh_df, "merged_data", engine, mode=PUSH_UPSERT_MODE, connection=conn)
+        written = fresh_df[fresh_df["review_id"].isin(result["inserted_ids"] + result["updated_ids"])]
+        written = written.drop_duplicates(subset="review_id")
+        if previous is not None:
+            previous = previous[previous["review_id"].isin(result["updated_ids"])]
+        if tables:
+            update_aggregates(conn, written, previous, tables=tables)
+    # Inserted, updated and already present rows are in merged_data; rejected ones stay pending
+    pushed_ids.add(fresh_df.loc[~fresh_df["review_id"].isin(result["rejected_ids"]), "review_id"])
+    print(f"✅ PostgreSQL: inserted {result['inserted']}, updated {result['updated']}, "
+          f"skipped {result['skipped']} rows already present.")
+    if result["rejected"]:
+        print(f"⚠️ PostgreSQL rejected {result['rejected']} rows missing part of the primary key "
+              f"(e.g. review_date on a partitioned merged_data); they are retried on the next push.")
+    return {"rows": len(fresh_df), "inserted": result["inserted"], "updated": result["updated"],
+            "skipped": result["skipped"], "rejected": result["rejected"]}
+
+
+def push_to_sheets(fresh_df, sheets_ids):
+    """Sink: append the rows Google Sheets has not received yet, recording their ids batch by batch."""
+    return {"rows": append_to_sheets_fresh_only(fresh_df, sheets_ids)}
+
+
+def pushed_id_index(data_dir, engine):
+    """
+    Index of review_ids committed to merged_data. Built once from merged_data itself when the
+    index file does not exist yet (e.g. on the first push after upgrading), so rows already in
+    the table are not sent again.
+    """
+    pushed_ids = IdIndex(Path(data_dir) / "pushed_ids.npy")
+    if not pushed_ids.exists():
+        with engine.connect() as conn:
+            present = inspect(conn).has_table("merged_data")
+            ids = conn.execute(text("SELECT review_id FROM merged_data")).scalars().all() if present else []
+        pushed_ids.add(ids)
+        print(f"✅ Built pushed-ID index with {len(pushed_ids)} ids from merged_data")
+    return pushed_ids
 
-    service.spreadsheets().values().append(
-        spreadsheetId=SPREADSHEET_ID,
-        range=f"{SHEET_NAME}!A:Z",
-        valueInputOption="USER_ENTERED",
-        body=body
-    ).execute()
 
-    print(f"✅ Appended {len(df)} fresh rows to Google Sheets.")
+def sheets_id_index(data_dir, pushed_ids):
+    """
+    Index of review_ids already appended to Google Sheets. Built once from the sheet's
+    review_id column when the index file does not exist yet. If the sheet cannot be read,
+    it is seeded from the pushed-ID index instead, since Sheets used to receive exactly the
+    rows committed to the database.
+    """
+    sheets_ids = IdIndex(Path(data_dir) / "sheets_ids.npy")
+    if not sheets_ids.exists():
+        try:
+            sheets_ids.add(read_column(get_sheets_service(), SPREADSHEET_ID, SHEET_NAME, "review_id"))
+            print(f"✅ Built Sheets-ID index with {len(sheets_ids)} ids from {SHEET_NAME}")
+        except Exception as e:
+            print(f"⚠️ Could not read review_ids from Google Sheets ({e}); assuming it has the rows in merged_data")
+            sheets_ids.add(pushed_ids.difference(sheets_ids))
+    return sheets_ids
 
 
 if __name__ == "__main__":
+    from data_merger import merge_with_faker
+
+    data_dir = Path(__file__).resolve().parent.parent / "data"
+    engine = get_engine()
+
     # Step 1: Generate fresh merged data
     df_final = merge_with_faker(fake_count=250)
 
-    # Step 2: Fetch existing review_ids from DB
-    try:
-        with engine.connect() as conn:
-            existing_ids = pd.read_sql("SELECT review_id FROM merged_data", conn)
-        existing_ids_set = set(existing_ids["review_id"].tolist())
-    except Exception as e:
-        print("⚠️ Table does not exist yet, inserting everything.")
-        existing_ids_set = set()
+    # Step 2: Load the local indexes of review_ids already pushed to each sink, built from the
+    # sinks themselves on first use. They only save uploading known rows; the upsert is what
+    # keeps merged_data free of duplicates.
+    pushed_ids = pushed_id_index(data_dir, engine)
+    sheets_ids = sheets_id_index(data_dir, pushed_ids)
 
-    # Step 3: Filter only fresh data
-    fresh_df = df_final[~df_final["review_id"].isin(existing_ids_set)]
+    # Step 3: Filter only fresh data, per sink, so a sink that failed last time catches up
+    db_df = pending_push_rows(df_final, data_dir, pushed_ids)
+    sheets_df = pending_push_rows(df_final, data_dir, sheets_ids)
 
-    if fresh_df.empty:
+    if db_df.empty and sheets_df.empty:
         print("✅ No new rows to insert.")
     else:
-        # Step 4: Insert fresh rows into PostgreSQL
-        try:
-            fresh_df.to_sql("merged_data", engine, if_exists="append", index=False)
-            print(f"✅ Inserted {len(fresh_df)} fresh rows into PostgreSQL.")
-        except Exception as e:
-            print(f"❌ PostgreSQL Error: {e}")
-
-        # Step 5: Push updated data to Google Sheets
-        try:
-            # Use the new function to append only the fresh data
-            append_to_sheets_fresh_only(fresh_df)
-        except Exception as e:
-            print(f"❌ Google Sheets Error: {e}")
\ No newline at end of file
+        # Step 4: Upsert into PostgreSQL and append to Google Sheets concurrently
+        results = run_sinks(
+            {"postgres": lambda: push_to_database(engine, db_df, pushed_ids),
+             "sheets": lambda: push_to_sheets(sheets_df, sheets_ids)},
+            timeouts={"postgres": PUSH_DB_TIMEOUT, "sheets": PUSH_SHEETS_TIMEOUT},
+        )
+        for result in results.values():
+            if result["status"] == "ok":
+                print(f"✅ {result['sink']}: {result['detail'].get('rows', 0)} rows in {result['seconds']:.1f}s")
+            else:
+                print(f"❌ {result['sink']} {result['status']}: {result['error']}")
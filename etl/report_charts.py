@@ -0,0 +1,202 @@
+"""
+Report charts as declarative specs, rendered in parallel.
+
+Each chart is a spec dict: `name` (the PNG file name), `figsize`, `data` (the
+small table it plots, computed up front) and `plot`, a module-level function
+drawing `data` onto a matplotlib Axes. The tables come from the report rows
+(chart_data) or, for the postgres source, from the KPI aggregates without
+reading any row (aggregates.chart_data_from_aggregates). Specs are rendered
+with the object-oriented Agg API (a Figure with its own FigureCanvasAgg, no
+pyplot), so they share no global state and can run in a process pool that
+returns PNG bytes. Report wall time then follows the slowest chart rather
+than the sum of all seven.
+
+There is one pool per process, of a fixed size: CHART_WORKERS (default one
+per chart, capped at the CPU count). With 1 the charts render one after
+another in the calling process. The pool is started with "forkserver", because
+the report engine is called from threads (Streamlit sessions, the scheduler)
+and forking a multi-threaded process can deadlock the children.
+"""
+import io
+import multiprocessing
+import multiprocessing.util
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import matplotlib.ticker as ticker
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from etl.aggregates import performance_buckets
+
+MAX_CHARTS = 7
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", "0")) or min(MAX_CHARTS, os.cpu_count() or 1)
+
+_pool_lock = threading.Lock()
+_pool = None
+_pool_workers = None
+
+
+# ------------------ Plot functions (Axes, data) ------------------
+def _rotate_xticklabels(ax):
+    for label in ax.get_xticklabels():
+        label.set(rotation=45, ha="right")
+
+
+def plot_dept_headcount(ax, dept_counts):
+    dept_counts.plot(kind="bar", stacked=True, ax=ax)
+    ax.set_title("Employee Count by Department (Active vs Exited)")
+    _rotate_xticklabels(ax)
+
+
+def plot_dept_perf(ax, dept_summary):
+    x = range(len(dept_summary))
+    ax.bar([i - 0.2 for i in x], dept_summary["avg_performance"], width=0.4, label="Performance")
+    ax.bar([i + 0.2 for i in x], dept_summary["avg_engagement"], width=0.4, label="Engagement")
+    ax.set_xticks(x)
+    ax.set_xticklabels(dept_summary["department"], rotation=45, ha="right")
+    ax.set_title("Average Performance & Engagement by Department")
+    ax.legend()
+
+
+def plot_share_pie(ax, data):
+    counts, title = data
+    counts.plot(kind="pie", autopct="%1.1f%%", ax=ax)
+    ax.set_title(title)
+    ax.set_ylabel("")
+
+
+def plot_perf_dist(ax, bucket_counts):
+    bucket_counts.plot(kind="bar", ax=ax)
+    ax.set_title("Performance Rating Distribution")
+
+
+def plot_trend(ax, data):
+    counts, labels, title, color = data
+    ax.plot(range(len(counts)), counts, marker="o", color=color)
+    ax.set_title(title)
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Count")
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels, rotation=45, ha="right")
+    # No overlapping labels: one every three months
+    ax.xaxis.set_major_locator(ticker.MultipleLocator(3))
+
+
+# ------------------ Specs ------------------
+def _trend_data(month_counts, title, color):
+    if month_counts.empty:
+        return None
+    labels = [d.strftime("%b %Y") for d in pd.to_datetime(month_counts.index, format="%Y-%m")]
+    return month_counts.values, labels, title, color
+
+
+def _month_counts(dt_series):
+    """Rows per "YYYY-MM", in month order."""
+    return pd.to_datetime(dt_series, errors="coerce").dropna().dt.strftime("%Y-%m").value_counts().sort_index()
+
+
+def chart_data(df):
+    """The small tables the charts plot, from report rows (aggregates.chart_data_from_aggregates has the same)."""
+    data = {
+        "dept_counts": df.groupby(["department", "status"]).size().unstack(fill_value=0),
+        "perf_bucket": performance_buckets(df["performance_rating"]).value_counts().sort_index(),
+    }
+    for column in ("salary_band", "gender"):
+        if column in df.columns:
+            data[column] = df[column].value_counts()
+    for column, key in [("joining_date", "hire_month"), ("exit_date", "exit_month")]:
+        if column in df.columns:
+            data[key] = _month_counts(df[column])
+    return data
+
+
+def chart_specs_from_data(data, dept_summary):
+    """The report's chart specs, in report order, for the tables `data` has (see chart_data)."""
+    specs = [
+        {"name": "dept_headcount.png", "figsize": (8, 5), "plot": plot_dept_headcount, "data": data["dept_counts"]},
+        {"name": "dept_perf.png", "figsize": (8, 5), "plot": plot_dept_perf,
+         "data": dept_summary[["department", "avg_performance", "avg_engagement"]]},
+    ]
+    if "salary_band" in data:
+        specs.append({"name": "salary_band.png", "figsize": (6, 6), "plot": plot_share_pie,
+                      "data": (data["salary_band"], "Employee Distribution by Salary Band")})
+    if "gender" in data:
+        specs.append({"name": "gender_dist.png", "figsize": (6, 6), "plot": plot_share_pie,
+                      "data": (data["gender"], "Gender Distribution")})
+    specs.append({"name": "perf_dist.png", "figsize": (7, 5), "plot": plot_perf_dist, "data": data["perf_bucket"]})
+    for key, title, name, color in [("hire_month", "Monthly Hirings", "monthly_hirings.png", "blue"),
+                                    ("exit_month", "Monthly Exits", "monthly_exits.png", "red")]:
+        trend = _trend_data(data[key], title, color) if key in data else None
+        if trend is not None:
+            specs.append({"name": name, "figsize": (12, 5), "plot": plot_trend, "data": trend})
+    return specs
+
+
+def chart_specs(df, dept_summary):
+    """The report's chart specs, in report order, for the columns `df` has."""
+    return chart_specs_from_data(chart_data(df), dept_summary)
+
+
+# ------------------ Rendering ------------------
+def render_spec(spec):
+    """Draw one spec on its own Agg figure; returns (name, PNG bytes)."""
+    fig = Figure(figsize=spec["figsize"])
+    FigureCanvasAgg(fig)
+    spec["plot"](fig.add_subplot(), spec["data"])
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return spec["name"], buffer.getvalue()
+
+
+def _chart_pool(workers):
+    """The process's chart pool, kept between reports; asking for another size replaces it."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None and _pool_workers != workers:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver"))
+            _pool_workers = workers
+            # Inside a multiprocessing worker (etl/report_worker.py) the children are joined at exit,
+            # before the executor's own exit hook runs: shut the pool down first, ahead of its call
+            # queue's finalizer (exitpriority 10), so the workers still get their stop sentinels
+            multiprocessing.util.Finalize(None, _pool.shutdown, exitpriority=20)
+        return _pool
+
+
+def _discard_chart_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def render_specs(specs, workers=CHART_WORKERS, log=None):
+    """{name: PNG bytes} for `specs`, rendered on a process pool of `workers` (serially when 1)."""
+    if workers <= 1 or len(specs) <= 1:
+        return dict(render_spec(spec) for spec in specs)
+    try:
+        return dict(_chart_pool(workers).map(render_spec, specs))
+    except BrokenProcessPool as e:
+        print(f"⚠️ Chart pool failed ({e}); rendering in this process", file=log)
+        _discard_chart_pool()
+        return dict(render_spec(spec) for spec in specs)
+
+
+def write_charts(charts, charts_dir):
+    """Write {name: PNG bytes} into `charts_dir`; returns the paths."""
+    os.makedirs(charts_dir, exist_ok=True)
+    paths = []
+    for name, png in charts.items():
+        path = os.path.join(charts_dir, name)
+        with open(path, "wb") as f:
+            f.write(png)
+        paths.append(path)
+    return paths
@@ -0,0 +1,157 @@
+"""
+Pluggable data sources for the HR report.
+
+Every source returns only the columns the report uses (REPORT_COLUMNS) with
+native types: numbers as numbers, dates as datetimes, status lower-cased and
+tenure_years derived from the dates when the source does not carry it.
+
+- "postgres" (default) streams `SELECT <columns> FROM merged_data` with
+  COPY TO STDOUT into `pd.read_csv`, which uses the pyarrow engine when it
+  is installed.
+- "local" reads the columns from the columnar reviews_enriched_latest table
+  in data/ (or REPORT_DATA_DIR).
+- "sheets" reads the columns from the SupabaseData sheet, falling back to
+  Master Data. It fetches the header row first, then the needed columns with
+  one values().batchGet request.
+
+Choose one with REPORT_SOURCE.
+"""
+import io
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from etl.aggregates import tenure_years
+from etl.connections import get_engine, get_sheets_service
+from etl.storage import HAS_PYARROW, find_table, read_table
+
+REPORT_SOURCE = os.getenv("REPORT_SOURCE", "postgres")
+SPREADSHEET_ID = os.getenv("GOOGLE_SPREADSHEET_ID")
+REPORT_SHEETS = ["SupabaseData", "Master Data"]
+DATA_DIR = Path(os.getenv("REPORT_DATA_DIR", Path(__file__).resolve().parent.parent / "data"))
+
+REPORT_COLUMNS = ["name", "department", "status", "performance_rating", "engagement_score", "age",
+                  "salary_band", "gender", "joining_date", "exit_date"]
+NUMERIC_COLUMNS = ["performance_rating", "engagement_score", "age", "tenure_years"]
+DATE_COLUMNS = ["joining_date", "exit_date"]
+
+
+def prepare_report_frame(df):
+    """Lower-case column names, numeric and date casts, lower-case status, tenure_years if missing."""
+    df = df.copy()
+    df.columns = df.columns.str.strip().str.lower()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    if "tenure_years" not in df.columns and set(DATE_COLUMNS) <= set(df.columns):
+        df["tenure_years"] = tenure_years(df)
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    df["status"] = df["status"].fillna("").astype(str).str.strip().str.lower()
+    return df
+
+
+def load_from_postgres(engine=None, columns=REPORT_COLUMNS, table="merged_data", log=None):
+    """The report columns of `table`, streamed with COPY (PostgreSQL) or read_sql (other databases)."""
+    engine = engine or get_engine()
+    query = f"SELECT {', '.join(columns)} FROM {table}"
+    if engine.dialect.name != "postgresql":
+        return pd.read_sql(query, engine)
+
+    buffer = io.BytesIO()
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        sql = f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)"
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                for data in copy:
+                    buffer.write(bytes(data))
+        cursor.close()
+    finally:
+        raw.close()
+    buffer.seek(0)
+    if HAS_PYARROW:
+        return pd.read_csv(buffer, engine="pyarrow")  # dates are parsed in prepare_report_frame
+    return pd.read_csv(buffer, parse_dates=[c for c in DATE_COLUMNS if c in columns])
+
+
+def load_from_local(data_dir=DATA_DIR, columns=REPORT_COLUMNS, log=None):
+    """The report columns of the local reviews_enriched_latest table (Parquet or CSV)."""
+    path = find_table(data_dir, "reviews_enriched_latest")
+    if path is None:
+        raise FileNotFoundError(f"No reviews_enriched_latest table in {data_dir}; run the merger first")
+    return read_table(path, columns=columns)
+
+
+def _column_letter(index):
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _read_sheet_columns(service, sheet, columns):
+    header = service.spreadsheets().values().get(
+        spreadsheetId=SPREADSHEET_ID, range=f"{sheet}!1:1").execute().get("values", [[]])
+    header = [h.strip().lower() for h in (header[0] if header else [])]
+    if not header:
+        raise ValueError("Sheet is empty")
+    wanted = [c for c in columns + ["tenure_years"] if c in header]
+    ranges = [f"{sheet}!{_column_letter(header.index(c))}2:{_column_letter(header.index(c))}" for c in wanted]
+    result = service.spreadsheets().values().batchGet(
+        spreadsheetId=SPREADSHEET_ID, ranges=ranges, majorDimension="COLUMNS").execute()
+    values = [(r.get("values") or [[]])[0] for r in result.get("valueRanges", [])]
+    length = max((len(v) for v in values), default=0)
+    # The API drops trailing empty cells, so shorter columns are padded
+    return pd.DataFrame({c: v + [""] * (length - len(v)) for c, v in zip(wanted, values)})
+
+
+def load_from_sheets(columns=REPORT_COLUMNS, log=None):
+    """The report columns of the SupabaseData sheet, falling back to Master Data."""
+    print(f"📊 Accessing Google Sheets: {SPREADSHEET_ID}", file=log)
+    service = get_sheets_service()
+    for sheet in REPORT_SHEETS:
+        try:
+            print(f"📋 Attempting to use sheet: {sheet}", file=log)
+            df = _read_sheet_columns(service, sheet, columns)
+            print(f"✅ Successfully loaded {len(df)} rows from {sheet} sheet", file=log)
+            return df
+        except Exception as e:
+            print(f"❌ Error accessing {sheet} sheet: {str(e)}", file=log)
+
+    print("🔍 Available sheets in the spreadsheet:", file=log)
+    try:
+        spreadsheet = service.spreadsheets().get(spreadsheetId=SPREADSHEET_ID).execute()
+        for sheet in spreadsheet.get("sheets", []):
+            print(f"   - {sheet.get('properties', {}).get('title', 'Unknown')}", file=log)
+        print(f"💡 Make sure one of {', '.join(REPORT_SHEETS)} exists and contains data", file=log)
+    except Exception:
+        print("   Could not retrieve sheet list", file=log)
+    raise Exception(f"None of the {', '.join(REPORT_SHEETS)} sheets are accessible")
+
+
+SOURCES = {
+    "postgres": load_from_postgres,
+    "local": load_from_local,
+    "sheets": load_from_sheets,
+}
+
+
+def load_report_data(source=None, log=None):
+    """Report-ready DataFrame from `source` (a SOURCES name, default REPORT_SOURCE); messages go to `log`."""
+    source = source or REPORT_SOURCE
+    if source not in SOURCES:
+        raise ValueError(f"Unknown report source {source!r}; choose one of {', '.join(SOURCES)}")
+    df = SOURCES[source](log=log)
+    print(f"✅ Loaded {len(df)} report rows from {source}", file=log)
+    return prepare_report_frame(df)
@@ -0,0 +1,76 @@
+"""
+A long-lived worker process for building reports from the dashboard.
+
+`run_report()` hands one `Email_Report.build_report` call to a single worker
+process. The worker is started with "forkserver", so it is never forked from
+the dashboard's threads, and it stays up between reports: pandas, matplotlib
+and reportlab are imported once, and the PDF styles stay cached. Reports run
+one at a time. Each report's progress messages go to its own buffer, and this
+buffer is returned to the caller, so concurrent callers (Streamlit sessions,
+the scheduler thread) never share a stream.
+
+A report that takes longer than REPORT_TIMEOUT seconds (default 300), or that
+crashes the worker, is reported as failed. The worker is then killed and
+replaced on the next call, so the dashboard itself is never blocked or taken
+down by a stuck SMTP login or database read.
+"""
+import io
+import multiprocessing
+import os
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+REPORT_TIMEOUT = float(os.getenv("REPORT_TIMEOUT", "300"))
+
+_lock = threading.Lock()
+_pool = None
+
+
+def _build_in_worker(kwargs):
+    """Runs in the worker process: build_report(**kwargs) -> (success, log text, error text)."""
+    from etl.Email_Report import build_report
+
+    log = io.StringIO()
+    try:
+        build_report(log=log, **kwargs)
+        return True, log.getvalue(), ""
+    except Exception:
+        return False, log.getvalue(), traceback.format_exc()
+
+
+def _worker_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("forkserver"))
+    return _pool
+
+
+def _discard_pool():
+    """Kill the worker (it may be stuck) and forget the pool; the next report starts a new one."""
+    global _pool
+    if _pool is None:
+        return
+    for process in list((_pool._processes or {}).values()):
+        process.kill()
+    _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+
+def run_report(timeout=REPORT_TIMEOUT, **kwargs):
+    """
+    Build a report on the worker process with `build_report(**kwargs)`. Waits for any
+    report already running, then at most `timeout` seconds for this one.
+    Returns (success, output, error).
+    """
+    with _lock:
+        try:
+            return _worker_pool().submit(_build_in_worker, kwargs).result(timeout=timeout)
+        except TimeoutError:
+            _discard_pool()
+            return False, "", f"Report did not finish within {timeout:g}s; the report worker was restarted"
+        except BrokenProcessPool as e:
+            _discard_pool()
+            return False, "", f"Report worker crashed: {e}"
+
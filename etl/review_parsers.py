@@ -0,0 +1,204 @@
+"""
+Review extraction backends for the AmbitionBox scraper.
+
+Both backends walk the schema.org `Review` spans on a page and return the same
+record dicts. `lxml` evaluates XPath directly on libxml2's tree and is several
+times faster; BeautifulSoup with the pure-Python html.parser is the fallback when
+lxml is not installed. Pick one with `parser=` or the SCRAPER_PARSER env var.
+"""
+import os
+from bs4 import BeautifulSoup, UnicodeDammit
+
+try:
+    import lxml.html as lxml_html
+    from lxml import etree
+except ImportError:  # optional speedup, see requirements.txt
+    lxml_html = None
+
+REVIEW_ITEMTYPE = "https://schema.org/Review"
+REVIEW_XPATH = f'//span[@itemscope and @itemtype="{REVIEW_ITEMTYPE}"]'
+INFO_CONTAINER_XPATH = './/div[normalize-space(@class)="flex mt-1"]'
+
+DEFAULT_PARSER = os.getenv("SCRAPER_PARSER", "lxml" if lxml_html else "bs4")
+
+
+def _split_review_body(full_text):
+    pros, cons = "", ""
+    full_text = full_text.replace('\xa0', ' ').strip()
+    if "Dislikes:" in full_text:
+        parts = full_text.split("Dislikes:")
+        pros = parts[0].replace("Likes:", "").strip()
+        cons = parts[1].strip()
+    else:
+        pros = full_text.replace("Likes:", "").strip()
+    return pros, cons
+
+def _department_from(p_texts):
+    if p_texts:
+        department_text = p_texts[-1].strip()
+        if "Department" in department_text:
+            return department_text
+    return ""
+
+def _review_record(review_id, company, job_title, department, location, review_date, rating, pros, cons):
+    return {
+        "ReviewID": review_id,
+        "Company": company,
+        "JobTitle": job_title,
+        "Department": department,
+        "Location": location,
+        "ReviewDate": review_date,
+        "OverallRating": rating,
+        "Pros": pros,
+        "Cons": cons
+    }
+
+
+# ------------------ BeautifulSoup backend ------------------
+def index_visible_divs(soup):
+    """Map each div id on the page to its first div, so reviews resolve in O(1)."""
+    visible_divs = {}
+    for div in soup.find_all('div', id=True):
+        visible_divs.setdefault(div['id'], div)
+    return visible_divs
+
+def _first_itemprops(tag, name):
+    """First `name` tag per itemprop inside `tag`, in document order (one traversal)."""
+    found = {}
+    for child in tag.find_all(name, itemprop=True):
+        found.setdefault(child['itemprop'], child)
+    return found
+
+def parse_review_block(review_meta, soup, visible_divs=None):
+    """
+    Parse one schema.org Review span. Pass `visible_divs` (from `index_visible_divs`)
+    when parsing a whole page; otherwise the visible review div is searched for in `soup`.
+    """
+    review_id = review_meta.get('id')
+    if not review_id:
+        return None
+
+    metas = _first_itemprops(review_meta, 'meta')
+    spans = _first_itemprops(review_meta, 'span')
+    author_span = spans.get('author')
+    author_metas = _first_itemprops(author_span, 'meta') if author_span else {}
+
+    company = metas['name']['content'] if 'name' in metas else ""
+    job_title = author_metas['jobTitle']['content'] if 'jobTitle' in author_metas else ""
+    location = author_metas['workLocation']['content'] if 'workLocation' in author_metas else ""
+    review_date = metas['datePublished']['content'] if 'datePublished' in metas else ""
+    rating = metas['ratingValue']['content'] if 'ratingValue' in metas else ""
+
+    review_body_span = spans.get('reviewBody')
+    pros, cons = _split_review_body(review_body_span.text) if review_body_span else ("", "")
+
+    department = ""
+    if visible_divs is not None:
+        visible_review_div = visible_divs.get(review_id)
+    else:
+        visible_review_div = soup.find('div', id=review_id)
+    if visible_review_div:
+        info_container = visible_review_div.find('div', class_="flex mt-1")
+        if info_container:
+            department = _department_from([p.text for p in info_container.find_all('p')])
+
+    return _review_record(review_id, company, job_title, department, location, review_date, rating, pros, cons)
+
+def parse_reviews_page_bs4(content):
+    soup = BeautifulSoup(content, "html.parser")
+    review_meta_tags = soup.find_all("span", attrs={"itemscope": True, "itemtype": REVIEW_ITEMTYPE})
+    if not review_meta_tags:
+        return None
+
+    visible_divs = index_visible_divs(soup)
+    reviews = []
+    for review_meta in review_meta_tags:
+        parsed_data = parse_review_block(review_meta, soup, visible_divs)
+        if parsed_data:
+            reviews.append(parsed_data)
+    return reviews
+
+
+# ------------------ lxml backend ------------------
+def _first_itemprops_lxml(element, tag):
+    found = {}
+    for child in element.iterdescendants(tag):
+        itemprop = child.get('itemprop')
+        if itemprop is not None:
+            found.setdefault(itemprop, child)
+    return found
+
+def _parse_review_lxml(review_span, visible_divs):
+    review_id = review_span.get('id')
+    if not review_id:
+        return None
+
+    metas = _first_itemprops_lxml(review_span, 'meta')
+    spans = _first_itemprops_lxml(review_span, 'span')
+    author_span = spans.get('author')
+    author_metas = _first_itemprops_lxml(author_span, 'meta') if author_span is not None else {}
+
+    company = metas['name'].attrib['content'] if 'name' in metas else ""
+    job_title = author_metas['jobTitle'].attrib['content'] if 'jobTitle' in author_metas else ""
+    location = author_metas['workLocation'].attrib['content'] if 'workLocation' in author_metas else ""
+    review_date = metas['datePublished'].attrib['content'] if 'datePublished' in metas else ""
+    rating = metas['ratingValue'].attrib['content'] if 'ratingValue' in metas else ""
+
+    review_body_span = spans.get('reviewBody')
+    pros, cons = _split_review_body(review_body_span.text_content()) if review_body_span is not None else ("", "")
+
+    department = ""
+    visible_review_div = visible_divs.get(review_id)
+    if visible_review_div is not None:
+        info_containers = visible_review_div.xpath(INFO_CONTAINER_XPATH)
+        if info_containers:
+            department = _department_from([p.text_content() for p in info_containers[0].iterdescendants('p')])
+
+    return _review_record(review_id, company, job_title, department, location, review_date, rating, pros, cons)
+
+def parse_reviews_page_lxml(content):
+    if not content:
+        return None
+    # Decode the way BeautifulSoup does so both backends agree on pages without a charset
+    if isinstance(content, bytes):
+        content = UnicodeDammit(content, is_html=True).unicode_markup or ""
+    try:
+        tree = lxml_html.document_fromstring(
+            content.encode("utf-8"), parser=lxml_html.HTMLParser(encoding="utf-8")
+        )
+    except (etree.ParserError, ValueError):
+        return None
+    review_spans = tree.xpath(REVIEW_XPATH)
+    if not review_spans:
+        return None
+
+    visible_divs = {}
+    for div in tree.iter('div'):
+        div_id = div.get('id')
+        if div_id is not None:
+            visible_divs.setdefault(div_id, div)
+
+    reviews = []
+    for review_span in review_spans:
+        parsed_data = _parse_review_lxml(review_span, visible_divs)
+        if parsed_data:
+            reviews.append(parsed_data)
+    return reviews
+
+
+PARSER_BACKENDS = {
+    "bs4": parse_reviews_page_bs4,
+    "lxml": parse_reviews_page_lxml,
+}
+
+def parse_reviews_page(content, parser=None):
+    """
+    Parse every review on a fetched page with the chosen backend ("lxml" or "bs4").
+    Returns None when the page has no review markup (i.e. we are past the last page).
+    """
+    backend = parser or DEFAULT_PARSER
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend '{backend}', expected one of {sorted(PARSER_BACKENDS)}")
+    if backend == "lxml" and lxml_html is None:
+        backend = "bs4"
+    return PARSER_BACKENDS[backend](content)
@@ -0,0 +1,141 @@
+"""
+Append-only, segment-based store for scraped reviews.
+
+Reviews are partitioned by company under `data/review_store/<slug>/`. Each
+append writes only the genuinely new rows as one immutable segment and adds
+their ids to a persistent `review_ids.txt` index, so deduplication costs
+O(new rows) rather than a re-read of the whole history. `compact()` folds the
+segments back into one; the flat `<slug>_reviews.csv` is a materialised view
+written only by `materialize()`. Segments are written in `DATA_FORMAT` (see
+etl/storage.py); CSV and Parquet segments can coexist in one partition.
+"""
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from etl.storage import DATA_FORMAT, read_table, write_table
+
+COMPACT_AFTER_SEGMENTS = int(os.getenv("REVIEW_STORE_COMPACT_AFTER", "32"))
+
+
+class ReviewStore:
+    def __init__(self, root):
+        self.root = Path(root)
+        self._indexes = {}
+
+    def _partition(self, company_slug):
+        return self.root / company_slug
+
+    def _index_path(self, company_slug):
+        return self._partition(company_slug) / "review_ids.txt"
+
+    def segments(self, company_slug):
+        segment_dir = self._partition(company_slug) / "segments"
+        if not segment_dir.exists():
+            return []
+        return sorted(p for p in segment_dir.glob("seg_*") if p.suffix in (".csv", ".parquet"))
+
+    def companies(self):
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir()) if self.root.exists() else []
+
+    def index(self, company_slug):
+        """Set of ReviewIDs already stored for a company (loaded once, kept in sync by append)."""
+        if company_slug not in self._indexes:
+            index_path = self._index_path(company_slug)
+            if index_path.exists():
+                with open(index_path, "r") as f:
+                    self._indexes[company_slug] = set(f.read().split())
+            else:
+                self._indexes[company_slug] = self._rebuild_index(company_slug)
+        return self._indexes[company_slug]
+
+    def _rebuild_index(self, company_slug):
+        ids = set()
+        for segment in self.segments(company_slug):
+            ids.update(read_table(segment, columns=["ReviewID"])["ReviewID"].astype(str))
+        if ids:
+            self._write_index(company_slug, ids)
+        return ids
+
+    def _write_index(self, company_slug, ids):
+        index_path = self._index_path(company_slug)
+        tmp_path = index_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(sorted(ids)) + "\n")
+        os.replace(tmp_path, index_path)
+
+    def count(self, company_slug):
+        return len(self.index(company_slug))
+
+    def append(self, company_slug, df):
+        """Write the rows of `df` whose ReviewID is not stored yet as a new segment. Returns them."""
+        known = self.index(company_slug)
+        new_df = df[~df["ReviewID"].isin(known)].drop_duplicates(subset="ReviewID")
+        if new_df.empty:
+            return new_df
+
+        segment_dir = self._partition(company_slug) / "segments"
+        os.makedirs(segment_dir, exist_ok=True)
+        name = f"seg_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.{DATA_FORMAT}"
+        write_table(new_df, segment_dir / name)
+
+        # Index after the segment so a crash can only leave ids missing (fixed by compaction)
+        new_ids = new_df["ReviewID"].astype(str).tolist()
+        with open(self._index_path(company_slug), "a") as f:
+            f.write("\n".join(new_ids) + "\n")
+        known.update(new_ids)
+
+        if len(self.segments(company_slug)) > COMPACT_AFTER_SEGMENTS:
+            self.compact(company_slug)
+        return new_df
+
+    def read(self, company_slug, columns=None):
+        """All stored reviews for a company, oldest segment first."""
+        frames = [read_table(segment, columns=columns) for segment in self.segments(company_slug)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+    def compact(self, company_slug):
+        """Merge all segments of a company into one (dropping any duplicates) and rebuild its index."""
+        old_segments = self.segments(company_slug)
+        if len(old_segments) <= 1:
+            return
+        combined = self.read(company_slug).drop_duplicates(subset="ReviewID")
+        segment_dir = self._partition(company_slug) / "segments"
+        name = f"seg_{datetime.now().strftime('%Y%m%d_%H%M%S')}_compacted.{DATA_FORMAT}"
+        write_table(combined, segment_dir / name)
+        for segment in old_segments:
+            if segment.name != name:
+                segment.unlink()
+        ids = set(combined["ReviewID"].astype(str))
+        self._write_index(company_slug, ids)
+        self._indexes[company_slug] = ids
+        print(f" Compacted {len(old_segments)} segments for {company_slug} ({len(combined)} reviews)")
+
+    def materialize(self, company_slug, latest_path, backup_dir=None):
+        """Regenerate the flat `<slug>_reviews.csv` view (plus a timestamped backup)."""
+        from etl.utils import save_with_backup
+        df = self.read(company_slug)
+        if backup_dir is not None:
+            save_with_backup(df, latest_path, backup_dir, prefix=f"{company_slug}_reviews")
+        else:
+            df.to_csv(latest_path, index=False)
+        return df
+
+
+def count_reviews(company_slug, data_dir):
+    """Number of stored reviews for a company, read from the id index rather than the data."""
+    store = ReviewStore(Path(data_dir) / "review_store")
+    if store.segments(company_slug):
+        return store.count(company_slug)
+    return len(load_reviews(company_slug, data_dir))
+
+def load_reviews(company_slug, data_dir):
+    """Reviews for a company from the store, falling back to a legacy `<slug>_reviews.csv`."""
+    store = ReviewStore(Path(data_dir) / "review_store")
+    if store.segments(company_slug):
+        return store.read(company_slug)
+    legacy_path = Path(data_dir) / f"{company_slug}_reviews.csv"
+    return pd.read_csv(legacy_path) if legacy_path.exists() else pd.DataFrame()
@@ -1,139 +1,313 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import time
-from datetime import datetime
 from pathlib import Path
 import os
 import urllib3
+from etl.http_session import ScraperSession
+from etl.page_cache import PageCache, read_blob
+from etl.review_store import ReviewStore
+from etl.review_parsers import parse_reviews_page
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-def parse_review_block(review_meta, soup):
-    review_id = review_meta.get('id')
-    if not review_id:
-        return None
-#add
-    company = review_meta.select_one('meta[itemprop="name"]')['content'] if review_meta.select_one('meta[itemprop="name"]') else ""
-    author_span = review_meta.find('span', itemprop="author")
-    job_title = author_span.select_one('meta[itemprop="jobTitle"]')['content'] if author_span and author_span.select_one('meta[itemprop="jobTitle"]') else ""
-    location = author_span.select_one('meta[itemprop="workLocation"]')['content'] if author_span and author_span.select_one('meta[itemprop="workLocation"]') else ""
-    review_date = review_meta.select_one('meta[itemprop="datePublished"]')['content'] if review_meta.select_one('meta[itemprop="datePublished"]') else ""
-    rating = review_meta.select_one('meta[itemprop="ratingValue"]')['content'] if review_meta.select_one('meta[itemprop="ratingValue"]') else ""
-
-    pros, cons = "", ""
-    review_body_span = review_meta.find('span', itemprop='reviewBody')
-    if review_body_span:
-        full_text = review_body_span.text.replace('\xa0', ' ').strip()
-        if "Dislikes:" in full_text:
-            parts = full_text.split("Dislikes:")
-            pros = parts[0].replace("Likes:", "").strip()
-            cons = parts[1].strip()
-        else:
-            pros = full_text.replace("Likes:", "").strip()
-
-    department = ""
-    visible_review_div = soup.find('div', id=review_id)
-    if visible_review_div:
-        info_container = visible_review_div.find('div', class_="flex mt-1")
-        if info_container:
-            p_tags = info_container.find_all('p')
-            if p_tags:
-                department_text = p_tags[-1].text.strip()
-                if "Department" in department_text:
-                    department = department_text
-
-    return {
-        "ReviewID": review_id,
-        "Company": company,
-        "JobTitle": job_title,
-        "Department": department,
-        "Location": location,
-        "ReviewDate": review_date,
-        "OverallRating": rating,
-        "Pros": pros,
-        "Cons": cons
-    }
-
-def scrape_reviews(company_slug, num_pages=3, delay=1, save_csv=True):
+AMBITIONBOX_URL = os.getenv("AMBITIONBOX_URL", "https://www.ambitionbox.com")
+
+
+class TokenBucket:
+    """
+    Async token bucket: allows `rate` requests per second on average with bursts
+    of up to `capacity`. A rate of None (or 0) disables limiting.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def read_last_page(meta_path):
+    if meta_path.exists():
+        try:
+            with open(meta_path, 'r') as f:
+                return int(f.read().strip())
+        except Exception:
+            return 0
+    return 0
+
+def write_last_page(meta_path, page):
+    with open(meta_path, 'w') as f:
+        f.write(str(page))
+
+def fetch_page(session, page_url, headers, cache=None, company_slug=None, page=None):
+    """Fetch a page through the shared session and keep a raw copy in the page cache."""
+    content = session.fetch(page_url, headers)
+    if content is not None and cache is not None:
+        cache.put(company_slug, page, content)
+    return content
+
+async def _scrape_pages_async(session, base_url, pages, headers, meta_path, concurrency, rate, parser=None,
+                              cache=None, company_slug=None, bucket=None, slots=None):
+    """
+    Fetch and parse pages with up to `concurrency` requests in flight, started no faster
+    than `rate` per second. Results are committed strictly in page order: the last-page
+    checkpoint only moves past a page once it and every page before it are parsed, and
+    the first failed or empty page ends the run. Pages answered with 304 Not Modified
+    were parsed on an earlier run and are committed without new reviews.
+    Several crawls can share one `bucket` (rate limit) and `slots` (global in-flight cap).
+    """
+    bucket = bucket or TokenBucket(rate)
+    slots = slots or asyncio.Semaphore(concurrency)
+
+    async def fetch_and_parse(page):
+        async with slots:
+            return await _fetch_and_parse(page)
+
+    async def _fetch_and_parse(page):
+        await bucket.acquire()
+        page_url = f"{base_url}?page={page}"
+        print(f"→ Scraping page {page}: {page_url}")
+        try:
+            content = await asyncio.to_thread(fetch_page, session, page_url, headers, cache, company_slug, page)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching page {page_url}: {e}")
+            return None
+        if content is None:
+            print(f"Page {page} not modified since last scrape.")
+            return []
+        page_reviews = await asyncio.to_thread(parse_reviews_page, content, parser)
+        if page_reviews is None:
+            print(f"No reviews found on page {page}. Possibly last page. Stopping.")
+        return page_reviews
+
+    pages = list(pages)
+    in_flight = {}
+    reviews_data = []
+    next_to_schedule = 0
+    try:
+        for i, page in enumerate(pages):
+            # Keep a sliding window of `concurrency` pages ahead of the checkpoint
+            while next_to_schedule < len(pages) and next_to_schedule < i + concurrency:
+                scheduled_page = pages[next_to_schedule]
+                in_flight[scheduled_page] = asyncio.create_task(fetch_and_parse(scheduled_page))
+                next_to_schedule += 1
+
+            page_reviews = await in_flight.pop(page)
+            if page_reviews is None:
+                break
+            reviews_data.extend(page_reviews)
+            write_last_page(meta_path, page)
+    finally:
+        for task in in_flight.values():
+            task.cancel()
+        await asyncio.gather(*in_flight.values(), return_exceptions=True)
+
+    return reviews_data
+
+def save_reviews(company_slug, new_df, data_dir, backup_dir, materialize_csv=False):
+    """Append freshly scraped reviews to the company's partition of the review store."""
+    store = ReviewStore(data_dir / "review_store")
+    latest_path = data_dir / f"{company_slug}_reviews.csv"
+    if not store.segments(company_slug) and latest_path.exists():
+        # One-time import of the pre-store CSV so its ids take part in dedup
+        store.append(company_slug, pd.read_csv(latest_path))
+    added_df = store.append(company_slug, new_df)
+    print(f"✅ Review store updated: {len(added_df)} new reviews "
+          f"(total {store.count(company_slug)}) in {store.root / company_slug}")
+
+    if materialize_csv:
+        store.materialize(company_slug, latest_path, backup_dir)
+
+def scrape_reviews(company_slug, num_pages=3, delay=1, save_csv=True, concurrency=1, base_url=None, data_dir=None,
+                   parser=None, session=None, cache_pages=True, materialize_csv=False):
+    """
+    Incrementally scrape `num_pages` review pages for `company_slug`, continuing from the
+    last checkpointed page. With concurrency > 1 pages are fetched by the asyncio engine,
+    rate-limited to one request per `delay` seconds instead of sleeping between pages.
+    `base_url` and `data_dir` can point the scraper at a local stand-in and scratch directory.
+    `parser` selects the HTML backend ("lxml" or "bs4", default SCRAPER_PARSER).
+    Pass a `ScraperSession` to share one connection pool across several scrapes.
+    Fetched pages are kept in `data/page_cache` (see `replay_reviews`) unless `cache_pages` is False.
+    New reviews are appended to the review store; pass `materialize_csv=True` to also
+    regenerate `{company_slug}_reviews.csv` and its backup.
+    """
     project_root = Path(__file__).resolve().parent.parent
-    data_dir = project_root / "data"
+    data_dir = Path(data_dir) if data_dir else project_root / "data"
     backup_dir = project_root / "Backup" / "reviews"
     meta_dir = data_dir  # Keep metadata next to CSV
 
-    base_url = f"https://www.ambitionbox.com/reviews/{company_slug}-reviews"
+    base_url = base_url or f"{AMBITIONBOX_URL}/reviews/{company_slug}-reviews"
     headers = {'User-Agent': 'Mozilla/5.0'}
     reviews_data = []
 
     # == Track last scraped page number ==
-    latest_path = data_dir / f"{company_slug}_reviews.csv"
     meta_path = meta_dir / f"{company_slug}_last_page.txt"
     os.makedirs(data_dir, exist_ok=True)
     os.makedirs(backup_dir, exist_ok=True)
 
     # ==== Load last scraped page index ====
-    last_scraped_page = 0
-    if meta_path.exists():
-        try:
-            with open(meta_path, 'r') as f:
-                last_scraped_page = int(f.read().strip())
-        except Exception:
-            last_scraped_page = 0
+    last_scraped_page = read_last_page(meta_path)
+
+    owns_session = session is None
+    if owns_session:
+        session = ScraperSession(validators_path=data_dir / "http_validators.json", pool_size=max(concurrency, 10))
+    cache = PageCache(data_dir / "page_cache") if cache_pages else None
 
     print(f" Last scraped page: {last_scraped_page}")
     start_page = last_scraped_page + 1
     end_page = start_page + num_pages - 1
 
-    for page in range(start_page, end_page + 1):
-        page_url = f"{base_url}?page={page}"
-        print(f"→ Scraping page {page}: {page_url}")
-        try:
-            res = requests.get(page_url, headers=headers, verify=False)
-            res.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching page {page_url}: {e}")
-            break
+    if concurrency > 1:
+        rate = 1 / delay if delay else None
+        reviews_data = asyncio.run(_scrape_pages_async(
+            session, base_url, range(start_page, end_page + 1), headers, meta_path, concurrency, rate, parser,
+            cache, company_slug
+        ))
+    else:
+        for page in range(start_page, end_page + 1):
+            page_url = f"{base_url}?page={page}"
+            print(f"→ Scraping page {page}: {page_url}")
+            try:
+                content = fetch_page(session, page_url, headers, cache, company_slug, page)
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching page {page_url}: {e}")
+                break
 
-        soup = BeautifulSoup(res.content, "html.parser")
-        review_meta_tags = soup.find_all("span", attrs={"itemscope": True, "itemtype": "https://schema.org/Review"})
-        if not review_meta_tags:
-            print(f"No reviews found on page {page}. Possibly last page. Stopping.")
-            break
+            if content is None:
+                print(f"Page {page} not modified since last scrape.")
+                write_last_page(meta_path, page)
+                time.sleep(delay)
+                continue
+
+            page_reviews = parse_reviews_page(content, parser)
+            if page_reviews is None:
+                print(f"No reviews found on page {page}. Possibly last page. Stopping.")
+                break
+            reviews_data.extend(page_reviews)
 
-        for review_meta in review_meta_tags:
-            parsed_data = parse_review_block(review_meta, soup)
-            if parsed_data:
-                reviews_data.append(parsed_data)
+            # Update last scraped page number
+            write_last_page(meta_path, page)
 
-        # Update last scraped page number
-        with open(meta_path, 'w') as f:
-            f.write(str(page))
+            time.sleep(delay)
 
-        time.sleep(delay)
+    session.save()
+    print(f" HTTP: {session.summary()}")
+    if owns_session:
+        session.close()
+    if cache is not None:
+        freed = cache.evict()
+        if freed:
+            print(f" Page cache: evicted {freed / 1024:.1f} KB")
 
     new_df = pd.DataFrame(reviews_data)
 
     if save_csv and not new_df.empty:
-        # === Load existing data and append ===
-        if latest_path.exists():
-            existing_df = pd.read_csv(latest_path)
-            combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-            combined_df.drop_duplicates(subset="ReviewID", inplace=True)
-        else:
-            combined_df = new_df
-
-        # Save updated full version
-        combined_df.to_csv(latest_path, index=False)
-        print(f"✅ Main file updated: {latest_path} (total {len(combined_df)} reviews)")
-
-        # Save versioned backup
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_path = backup_dir / f"{company_slug}_reviews_{timestamp}.csv"
-        combined_df.to_csv(backup_path, index=False)
-        print(f" Backup saved to: {backup_path}")
+        save_reviews(company_slug, new_df, data_dir, backup_dir, materialize_csv)
 
     return new_df
 
+def scrape_companies(company_slugs, num_pages=3, delay=1, save_csv=True, concurrency=4, site_url=None, data_dir=None,
+                     parser=None, cache_pages=True, materialize_csv=False):
+    """
+    Crawl several companies in one event loop. All companies share one connection pool,
+    one token bucket (one request per `delay` seconds overall) and `concurrency` request
+    slots, handed out first-come-first-served so companies interleave fairly. Each company
+    keeps its own `{slug}_last_page.txt` checkpoint and its own partition of the review store.
+    Returns {slug: DataFrame of new reviews}.
+    """
+    project_root = Path(__file__).resolve().parent.parent
+    data_dir = Path(data_dir) if data_dir else project_root / "data"
+    backup_dir = project_root / "Backup" / "reviews"
+    os.makedirs(data_dir, exist_ok=True)
+    os.makedirs(backup_dir, exist_ok=True)
+
+    site_url = site_url or AMBITIONBOX_URL
+    headers = {'User-Agent': 'Mozilla/5.0'}
+    rate = 1 / delay if delay else None
+    session = ScraperSession(validators_path=data_dir / "http_validators.json", pool_size=max(concurrency, 10))
+    cache = PageCache(data_dir / "page_cache") if cache_pages else None
+
+    async def crawl_all():
+        bucket = TokenBucket(rate)
+        slots = asyncio.Semaphore(concurrency)
+        # Small per-company windows so no company can hold all the slots
+        window = max(1, concurrency // max(1, len(company_slugs)))
+        crawls = []
+        for company_slug in company_slugs:
+            meta_path = data_dir / f"{company_slug}_last_page.txt"
+            start_page = read_last_page(meta_path) + 1
+            print(f" {company_slug}: starting at page {start_page}")
+            crawls.append(_scrape_pages_async(
+                session, f"{site_url}/reviews/{company_slug}-reviews", range(start_page, start_page + num_pages),
+                headers, meta_path, window, rate, parser, cache, company_slug, bucket=bucket, slots=slots
+            ))
+        return await asyncio.gather(*crawls)
+
+    results = asyncio.run(crawl_all())
+
+    session.save()
+    print(f" HTTP: {session.summary()}")
+    session.close()
+    if cache is not None:
+        cache.evict()
+
+    new_reviews = {}
+    for company_slug, reviews_data in zip(company_slugs, results):
+        new_df = pd.DataFrame(reviews_data)
+        if save_csv and not new_df.empty:
+            save_reviews(company_slug, new_df, data_dir, backup_dir, materialize_csv)
+        new_reviews[company_slug] = new_df
+    return new_reviews
+
+def _parse_cached_page(blob_path, parser):
+    return parse_reviews_page(read_blob(blob_path), parser) or []
+
+def replay_reviews(company_slug, data_dir=None, parser=None, workers=None):
+    """
+    Re-parse every cached page for `company_slug` offline, spread over a process pool.
+    Returns the reviews in page order; nothing is fetched and no checkpoint is touched.
+    """
+    project_root = Path(__file__).resolve().parent.parent
+    data_dir = Path(data_dir) if data_dir else project_root / "data"
+    cached_pages = PageCache(data_dir / "page_cache").pages(company_slug)
+    print(f" Replaying {len(cached_pages)} cached pages for {company_slug}")
+    if not cached_pages:
+        return pd.DataFrame()
+
+    blob_paths = [blob_path for _, blob_path in cached_pages]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        page_results = pool.map(_parse_cached_page, blob_paths, [parser] * len(blob_paths), chunksize=8)
+        reviews_data = [review for page_reviews in page_results for review in page_reviews]
+    return pd.DataFrame(reviews_data)
+
 # For standalone testing
 if __name__ == "__main__":
-    df = scrape_reviews("nineleaps-technology-solutions", num_pages=1)
+    if os.getenv("SCRAPER_REPLAY", "false").lower() == "true":
+        df = replay_reviews("nineleaps-technology-solutions")
+    elif os.getenv("SCRAPER_COMPANIES"):
+        company_slugs = [slug.strip() for slug in os.getenv("SCRAPER_COMPANIES").split(',') if slug.strip()]
+        concurrency = int(os.getenv("SCRAPER_CONCURRENCY", "4"))
+        results = scrape_companies(company_slugs, num_pages=1, concurrency=concurrency)
+        df = pd.concat(results.values(), ignore_index=True)
+    else:
+        concurrency = int(os.getenv("SCRAPER_CONCURRENCY", "1"))
+        materialize_csv = os.getenv("MATERIALIZE_REVIEWS_CSV", "false").lower() == "true"
+        df = scrape_reviews("nineleaps-technology-solutions", num_pages=1, concurrency=concurrency,
+                            materialize_csv=materialize_csv)
     print(df.head())
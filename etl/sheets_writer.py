@@ -0,0 +1,176 @@
+"""
+Chunked, resumable writes of a DataFrame to a Google Sheet.
+
+Rows are serialised lazily, `SHEETS_BATCH_ROWS` at a time. A batch is halved
+whenever its JSON payload would exceed `SHEETS_BATCH_BYTES`. Each batch is
+written with `values().batchUpdate` to an explicit range, so a retried request
+overwrites the same cells instead of appending them a second time. Rate-limit
+and server errors (429/5xx) are retried with exponential backoff and jitter.
+
+Resuming is keyed on review_id. The ids of each confirmed batch are added to
+the caller's ID index, and rows whose ids are already in it are skipped. The
+first row of a push is recorded in a small progress file before any data is
+sent. If the push is interrupted between writing a batch and recording its ids,
+the next push reads the review_ids that landed below that row back from the
+sheet. Re-running an interrupted push therefore writes each row once, even
+when new rows have joined the frame in the meantime.
+"""
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+SHEETS_BATCH_ROWS = int(os.getenv("SHEETS_BATCH_ROWS", "2000"))
+SHEETS_BATCH_BYTES = int(os.getenv("SHEETS_BATCH_BYTES", str(2 * 1024 * 1024)))
+SHEETS_MAX_RETRIES = int(os.getenv("SHEETS_MAX_RETRIES", "6"))
+SHEETS_BACKOFF = float(os.getenv("SHEETS_BACKOFF", "1.0"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _status(error):
+    """HTTP status of a googleapiclient HttpError (or anything shaped like one)."""
+    resp = getattr(error, "resp", None)
+    status = getattr(resp, "status", None)
+    return int(status) if status is not None else None
+
+
+def execute_with_retry(request, max_retries=None, backoff=None):
+    """`request.execute()`, retrying quota and server errors with exponential backoff."""
+    max_retries = SHEETS_MAX_RETRIES if max_retries is None else max_retries
+    backoff = SHEETS_BACKOFF if backoff is None else backoff
+    for attempt in range(max_retries + 1):
+        try:
+            return request.execute()
+        except Exception as e:
+            if _status(e) not in RETRY_STATUSES or attempt == max_retries:
+                raise
+            wait = backoff * (2 ** attempt) * (1 + random.random())
+            print(f"⚠️ Sheets API returned {_status(e)}, retrying in {wait:.1f}s ({attempt + 1}/{max_retries})")
+            time.sleep(wait)
+
+
+def _load_progress(progress_path):
+    if progress_path and Path(progress_path).exists():
+        with open(progress_path, "r") as f:
+            return json.load(f)
+    return None
+
+
+def _save_progress(progress_path, progress):
+    if not progress_path:
+        return
+    progress_path = Path(progress_path)
+    os.makedirs(progress_path.parent, exist_ok=True)
+    tmp_path = progress_path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, progress_path)
+
+
+def _clear_progress(progress_path):
+    if progress_path and Path(progress_path).exists():
+        os.remove(progress_path)
+
+
+def _batches(df, batch_rows, max_bytes):
+    """
+    (offset, rows as lists of str), each within the row and byte bounds. A batch that had to be
+    halved to fit sets the size of the ones after it, so each batch is serialised about once.
+    """
+    offset = 0
+    while offset < len(df):
+        while True:
+            values = df.iloc[offset:offset + batch_rows].astype(str).values.tolist()
+            if batch_rows == 1 or len(json.dumps(values)) <= max_bytes:
+                break
+            batch_rows //= 2
+        yield offset, values
+        offset += len(values)
+
+
+def _column_letter(index):
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+
+def read_column(service, spreadsheet_id, sheet_name, column, first_row=2):
+    """Values of the column headed `column` (found in row 1), from `first_row` down; [] if there is no such column."""
+    header = execute_with_retry(service.spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id, range=f"{sheet_name}!1:1"))
+    names = header.get("values", [[]])[0]
+    if column not in names:
+        return []
+    letter = _column_letter(names.index(column))
+    result = execute_with_retry(service.spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id, range=f"{sheet_name}!{letter}{first_row}:{letter}", majorDimension="COLUMNS"))
+    return [v for v in result["values"][0] if v] if result.get("values") else []
+
+
+def _sheet_properties(service, spreadsheet_id, sheet_name):
+    spreadsheet = execute_with_retry(service.spreadsheets().get(
+        spreadsheetId=spreadsheet_id, fields="sheets.properties"))
+    for sheet in spreadsheet.get("sheets", []):
+        properties = sheet.get("properties", {})
+        if properties.get("title") == sheet_name:
+            return properties
+    raise ValueError(f"Sheet {sheet_name!r} not found in spreadsheet {spreadsheet_id}")
+
+
+def write_rows_resumable(service, spreadsheet_id, sheet_name, df, written_ids, progress_path=None,
+                         batch_rows=SHEETS_BATCH_ROWS, max_bytes=SHEETS_BATCH_BYTES, key="review_id"):
+    """
+    Append the rows of `df` whose `key` is not in `written_ids` (an IdIndex) below the last
+    used row of `sheet_name`, with a header row if the sheet is empty, in size-bounded batches.
+    The ids of each confirmed batch are added to `written_ids`. Returns the number of data rows
+    written by this call.
+    """
+    progress = _load_progress(progress_path)
+    if progress and (progress["spreadsheet_id"], progress["sheet"]) == (spreadsheet_id, sheet_name):
+        # An interrupted push may have written rows after the last batch whose ids were recorded
+        landed = read_column(service, spreadsheet_id, sheet_name, key, first_row=progress["start_row"])
+        recovered = written_ids.add(landed)
+        if recovered:
+            print(f"🔄 Recorded {recovered} rows an interrupted Sheets push had already written")
+
+    df = df[~written_ids.contains(df[key])]
+    if df.empty:
+        _clear_progress(progress_path)
+        print("✅ These rows were already written to Google Sheets; nothing to do.")
+        return 0
+
+    used = execute_with_retry(service.spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id, range=f"{sheet_name}!A:A", majorDimension="COLUMNS"))
+    used_rows = len(used.get("values", [[]])[0]) if used.get("values") else 0
+    header = used_rows == 0
+    start_row = used_rows + 2 if header else used_rows + 1
+
+    # Make sure the grid is tall enough for the explicit ranges below
+    properties = _sheet_properties(service, spreadsheet_id, sheet_name)
+    last_row = start_row + len(df) - 1
+    row_count = properties.get("gridProperties", {}).get("rowCount", 0)
+    if last_row > row_count:
+        execute_with_retry(service.spreadsheets().batchUpdate(spreadsheetId=spreadsheet_id, body={"requests": [
+            {"appendDimension": {"sheetId": properties["sheetId"], "dimension": "ROWS",
+                                 "length": last_row - row_count}}]}))
+    _save_progress(progress_path, {"spreadsheet_id": spreadsheet_id, "sheet": sheet_name, "start_row": start_row})
+
+    if header:
+        execute_with_retry(service.spreadsheets().values().batchUpdate(spreadsheetId=spreadsheet_id, body={
+            "valueInputOption": "USER_ENTERED",
+            "data": [{"range": f"{sheet_name}!A{start_row - 1}", "values": [df.columns.tolist()]}]}))
+
+    written = 0
+    for offset, values in _batches(df, batch_rows, max_bytes):
+        execute_with_retry(service.spreadsheets().values().batchUpdate(spreadsheetId=spreadsheet_id, body={
+            "valueInputOption": "USER_ENTERED",
+            "data": [{"range": f"{sheet_name}!A{start_row + offset}", "values": values}]}))
+        written_ids.add(df[key].iloc[offset:offset + len(values)])
+        written += len(values)
+    _clear_progress(progress_path)
+    return written
@@ -0,0 +1,58 @@
+"""
+Concurrent fan-out of push.py's output sinks.
+
+Each sink (PostgreSQL, Google Sheets, ...) is a zero-argument callable that
+writes its rows and returns a small dict describing what it did. `run_sinks`
+starts every sink in its own daemon thread and waits for each one at most its
+own timeout. Writes are I/O-bound, so the push takes about as long as the
+slowest sink instead of the sum of all of them. A sink that raises or times
+out is reported as failed without affecting the others.
+
+A timed-out sink cannot be interrupted. It is abandoned and dies with the
+process, and the sinks are written so this is safe: the database load runs in
+one transaction, and the Sheets writer resumes from its progress file.
+`SINK_TIMEOUT` (seconds) is the default timeout.
+"""
+import os
+import threading
+import time
+
+SINK_TIMEOUT = float(os.getenv("SINK_TIMEOUT", "900"))
+
+
+def _run(name, sink, result):
+    start = time.perf_counter()
+    try:
+        result["detail"] = sink() or {}
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result["seconds"] = round(time.perf_counter() - start, 3)
+
+
+def run_sinks(sinks, timeouts=None, default_timeout=None):
+    """
+    Run `sinks` ({name: callable}) concurrently. Returns {name: result}, where each result has
+    `status` ("ok", "failed" or "timeout"), `seconds`, `error` (None on success) and `detail`
+    (the sink's return value).
+    """
+    timeouts = timeouts or {}
+    default_timeout = SINK_TIMEOUT if default_timeout is None else default_timeout
+    results = {name: {"sink": name, "status": "running", "seconds": None, "error": None, "detail": {}}
+               for name in sinks}
+    threads = {}
+    for name, sink in sinks.items():
+        threads[name] = threading.Thread(target=_run, args=(name, sink, results[name]),
+                                         name=f"sink-{name}", daemon=True)
+        threads[name].start()
+
+    start = time.perf_counter()
+    for name, thread in threads.items():
+        timeout = timeouts.get(name, default_timeout)
+        thread.join(max(0.0, timeout - (time.perf_counter() - start)))
+        if thread.is_alive():
+            results[name] = {"sink": name, "status": "timeout", "seconds": round(time.perf_counter() - start, 3),
+                             "error": f"no result after {timeout:g}s", "detail": {}}
+    return results
@@ -0,0 +1,160 @@
+"""
+Typed table storage for the artifacts in data/ and Backup/.
+
+Stages hand data to each other as tables named like `hrms_latest` or
+`reviews_enriched_latest`. With `DATA_FORMAT=parquet` (the default when pyarrow
+is installed) they are written as Parquet: dates stay dates, department /
+location / salary_band are dictionary-encoded categoricals, and reads can
+project columns and push row filters down to the file. `DATA_FORMAT=csv` keeps
+the old CSV files. `export_csv` writes a CSV copy of a Parquet table for tools
+that still expect one; with `DATA_EXPORT_CSV=true`, `save_with_backup` keeps
+that copy next to every latest table it writes.
+
+Filters use pyarrow's form: a list of `(column, op, value)` tuples that must
+all hold, with op one of ==, !=, <, <=, >, >=, in, not in. CSV tables apply
+the same filters after loading.
+"""
+import importlib.util
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+DATA_FORMAT = os.getenv("DATA_FORMAT", "parquet" if HAS_PYARROW else "csv")
+EXPORT_CSV = os.getenv("DATA_EXPORT_CSV", "false").lower() == "true"
+
+CATEGORICAL_COLUMNS = ["department", "location", "salary_band"]
+DATE_COLUMNS = ["review_date", "joining_date", "exit_date"]
+
+_FILTER_OPS = {
+    "==": lambda s, v: s == v,
+    "=": lambda s, v: s == v,
+    "!=": lambda s, v: s != v,
+    "<": lambda s, v: s < v,
+    "<=": lambda s, v: s <= v,
+    ">": lambda s, v: s > v,
+    ">=": lambda s, v: s >= v,
+    "in": lambda s, v: s.isin(list(v)),
+    "not in": lambda s, v: ~s.isin(list(v)),
+}
+
+
+def table_path(data_dir, name, data_format=None):
+    """Where table `name` is written in `data_format` (default: DATA_FORMAT)."""
+    return Path(data_dir) / f"{name}.{data_format or DATA_FORMAT}"
+
+
+def find_table(data_dir, name):
+    """Existing file for table `name`, preferring DATA_FORMAT; None if it has never been written."""
+    for data_format in dict.fromkeys([DATA_FORMAT, "parquet", "csv"]):
+        path = table_path(data_dir, name, data_format)
+        if path.exists():
+            return path
+    return None
+
+
+def with_categoricals(df):
+    """Categorical department/location/salary_band (matched case-insensitively) for Parquet."""
+    df = df.copy()
+    for col in df.columns:
+        if str(col).lower() in CATEGORICAL_COLUMNS and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def write_table(df, path):
+    """Write `df` to `path` (format from the suffix), atomically replacing any previous file or part directory."""
+    path = Path(path)
+    os.makedirs(path.parent, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    if path.suffix == ".parquet":
+        with_categoricals(df).to_parquet(tmp_path, index=False)
+    else:
+        df.to_csv(tmp_path, index=False)
+    if path.is_dir():
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+
+
+def read_table(path, columns=None, filters=None):
+    """
+    Read a table written by `write_table` (or a Parquet part directory). `columns` projects
+    and `filters` selects rows; for Parquet both are applied while reading the file.
+    """
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=columns, filters=filters or None)
+
+    header = pd.read_csv(path, nrows=0).columns
+    wanted = list(columns) if columns else list(header)
+    needed = wanted + [col for col, _, _ in filters or [] if col not in wanted]
+    df = pd.read_csv(path, usecols=needed, parse_dates=[c for c in DATE_COLUMNS if c in needed])
+    for col, op, value in filters or []:
+        df = df[_FILTER_OPS[op](df[col], value)]
+    return df[wanted].reset_index(drop=True)
+
+
+def count_rows(path):
+    """Row count from Parquet footers, or by counting CSV lines, without loading the data."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        parts = sorted(path.glob("part-*.parquet")) if path.is_dir() else [path]
+        return sum(pq.read_metadata(part).num_rows for part in parts)
+
+    newlines, last_byte = 0, b"\n"
+    with open(path, "rb") as f:
+        while block := f.read(1 << 20):
+            newlines += block.count(b"\n")
+            last_byte = block[-1:]
+    if last_byte != b"\n":
+        newlines += 1
+    return max(newlines - 1, 0)
+
+
+def iter_table_blocks(path, rows):
+    """
+    The rows of a table as DataFrames of exactly `rows` rows (the last one may be shorter),
+    read one block at a time, so the whole table is never in memory. Parquet part
+    directories are read part by part, and the blocks do not depend on where the parts end.
+    """
+    path = Path(path)
+    if path.suffix != ".parquet":
+        header = pd.read_csv(path, nrows=0).columns
+        yield from pd.read_csv(path, chunksize=rows, parse_dates=[c for c in DATE_COLUMNS if c in header])
+        return
+
+    import pyarrow.parquet as pq
+    parts = sorted(path.glob("part-*.parquet")) if path.is_dir() else [path]
+    pending = []
+    for part in parts:
+        for batch in pq.ParquetFile(part).iter_batches(batch_size=rows):
+            pending.append(batch.to_pandas())
+            if sum(len(p) for p in pending) >= rows:
+                block = pd.concat(pending, ignore_index=True)
+                while len(block) >= rows:
+                    yield with_categoricals(block.iloc[:rows])
+                    block = block.iloc[rows:].reset_index(drop=True)
+                pending = [block]
+    block = pd.concat(pending, ignore_index=True) if pending else pd.DataFrame()
+    if len(block):
+        yield with_categoricals(block)
+
+
+def export_csv(path, csv_path=None):
+    """Write a CSV copy of a Parquet table (default: same name with .csv) for compatibility."""
+    path = Path(path)
+    csv_path = Path(csv_path) if csv_path else path.with_suffix(".csv")
+    read_table(path).to_csv(csv_path, index=False)
+    return csv_path
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python etl/storage.py <table.parquet> [output.csv]")
+        sys.exit(1)
+    print(f"✅ Exported {export_csv(*sys.argv[1:3])}")
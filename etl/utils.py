@@ -1,20 +1,20 @@
 from pathlib import Path
-from datetime import datetime
-import os
 import pandas as pd
+from etl.storage import EXPORT_CSV, write_table
+from etl.backup_store import BackupStore
 
 def save_with_backup(df: pd.DataFrame, latest_path: Path, backup_dir: Path, prefix: str = None):
     """
-    Save DataFrame to 'latest_path' and also save a timestamped backup in 'backup_dir'.
-    If 'prefix' is given, the backup file will be named '{prefix}_{timestamp}.csv'.
+    Save DataFrame to 'latest_path' and also record a snapshot in the deduplicated backup
+    store at 'backup_dir' (see etl/backup_store.py), named '{prefix}_{timestamp}' or
+    'backup_{timestamp}'. Old snapshots of the prefix are pruned by the retention policy.
     """
-    os.makedirs(backup_dir, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    if prefix:
-        backup_file = backup_dir / f"{prefix}_{timestamp}.csv"
-    else:
-        backup_file = backup_dir / f"backup_{timestamp}.csv"
+    latest_path = Path(latest_path)
+    store = BackupStore(backup_dir)
     # Always backup BEFORE overwriting latest
-    df.to_csv(backup_file, index=False)
-    df.to_csv(latest_path, index=False)
-    print(f"Saved latest to {latest_path} and backup to {backup_file}")
+    manifest_path = store.snapshot(df, prefix or "backup")
+    write_table(df, latest_path)
+    if EXPORT_CSV and latest_path.suffix == ".parquet":
+        df.to_csv(latest_path.with_suffix(".csv"), index=False)
+    store.prune(prefix or "backup")
+    print(f"Saved latest to {latest_path} and backup to {manifest_path}")
@@ -4,18 +4,48 @@ CREATE TABLE IF NOT EXISTS merged_data (
     job_title TEXT,
     department TEXT,
     location TEXT,
-    review_date TEXT,
+    review_date DATE,
     overall_rating REAL,
     pros TEXT,
     cons TEXT,
     employee_id TEXT,
     name TEXT,
-    status TEXT,
-    joining_date TEXT,
-    exit_date TEXT,
+    status TEXT CONSTRAINT merged_data_status_check CHECK (status IN ('Active', 'Exited')),
+    joining_date DATE,
+    exit_date DATE,
     engagement_score REAL,
     performance_rating INTEGER,
     salary_band TEXT,
     gender TEXT,
     age INTEGER
 );
+
+-- Reporting filters: attrition by department, date ranges, employee lookups
+CREATE INDEX IF NOT EXISTS merged_data_department_status_idx ON merged_data (department, status);
+CREATE INDEX IF NOT EXISTS merged_data_review_date_idx ON merged_data (review_date);
+CREATE INDEX IF NOT EXISTS merged_data_employee_id_idx ON merged_data (employee_id);
+
+-- Additive KPI aggregates per department, review month ("YYYY-MM") and status, kept by push.py (etl/aggregates.py)
+CREATE TABLE IF NOT EXISTS hr_kpi_monthly (
+    department TEXT NOT NULL,
+    month TEXT NOT NULL,
+    status TEXT NOT NULL,
+    employees BIGINT NOT NULL DEFAULT 0,
+    performance_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    performance_count BIGINT NOT NULL DEFAULT 0,
+    engagement_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    engagement_count BIGINT NOT NULL DEFAULT 0,
+    age_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    age_count BIGINT NOT NULL DEFAULT 0,
+    tenure_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    tenure_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (department, month, status)
+);
+
+-- Employees per chart dimension and value (salary_band, gender, perf_bucket, hire/exit month), kept by push.py
+CREATE TABLE IF NOT EXISTS hr_kpi_counts (
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    employees BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, value)
+);
@@ -0,0 +1,27 @@
+"""Shared fixtures: the two enriched rows fake rows are generated from."""
+import pandas as pd
+import pytest
+
+from etl.data_merger import generate_fake_rows
+
+COLUMNS = ["review_id", "company", "job_title", "department", "location", "review_date", "overall_rating",
+           "pros", "cons", "employee_id", "name", "status", "joining_date", "exit_date", "engagement_score",
+           "performance_rating", "salary_band", "gender", "age"]
+
+
+@pytest.fixture(scope="session")
+def seed_frame():
+    """Two enriched rows, the vocabulary generate_fake_rows draws job titles, departments etc. from."""
+    return pd.DataFrame([
+        ["r1", "Nineleaps Technology Solutions", "Data Engineer", "IT Support", "Bangalore / Bengaluru",
+         "2024-12-18", 2, "p", "c", "EMP0001", "Diya Iyer", "Active", "2020-06-25", None, 4.4, 5, "B", "Female", 31],
+        ["r2", "Nineleaps Technology Solutions", "SDE", "Software Development", "Hyderabad / Secunderabad",
+         "2025-01-31", 5, "p", "c", "EMP0002", "Ishaan Sharma", "Exited", "2021-09-27", "2023-01-02", 6.5, 5, "A",
+         "Male", 45],
+    ], columns=COLUMNS)
+
+
+@pytest.fixture(scope="session")
+def fake_rows(seed_frame):
+    """fake_rows(n, rng): n enriched rows generated from `seed_frame`."""
+    return lambda n, rng: generate_fake_rows(n, seed_frame, rng)
@@ -0,0 +1,99 @@
+"""KPI aggregates maintained by push.push_to_database, on SQLite."""
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from etl import push
+from etl.aggregates import (COUNTS_TABLE, chart_data_from_aggregates, department_summary_from_aggregates,
+                            kpis_from_aggregates, read_aggregates, read_counts, rebuild_aggregates)
+from etl.db_loader import ensure_schema, load_dataframe
+from etl.Email_Report import compute_kpis, department_summary
+from etl.id_index import IdIndex
+from etl.report_charts import chart_data
+from etl.report_sources import load_from_postgres, prepare_report_frame
+
+
+def row_kpis(engine):
+    df = prepare_report_frame(load_from_postgres(engine))
+    return compute_kpis(df), department_summary(df)
+
+
+def aggregate_kpis(engine):
+    with engine.connect() as conn:
+        agg = read_aggregates(conn)
+    return kpis_from_aggregates(agg), department_summary_from_aggregates(agg)
+
+
+def test_pushes_keep_the_aggregates_equal_to_the_rows(tmp_path, fake_rows):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hr.db'}")
+    rng = np.random.default_rng(0)
+    pushed_ids = IdIndex(tmp_path / "pushed_ids.npy")
+    for _ in range(3):
+        push.push_to_database(engine, fake_rows(400, rng), pushed_ids)
+
+    kpis, summary = row_kpis(engine)
+    agg_kpis, agg_summary = aggregate_kpis(engine)
+    assert kpis == agg_kpis
+    pd.testing.assert_frame_equal(summary.reset_index(drop=True), agg_summary, check_dtype=False)
+    assert_same_chart_data(engine)
+
+
+def assert_same_chart_data(engine):
+    rows = chart_data(prepare_report_frame(load_from_postgres(engine)))
+    with engine.connect() as conn:
+        agg = chart_data_from_aggregates(read_aggregates(conn), read_counts(conn))
+    assert agg.keys() == rows.keys()
+    pd.testing.assert_frame_equal(agg["dept_counts"], rows["dept_counts"], check_dtype=False)
+    for key in ("salary_band", "gender", "hire_month", "exit_month"):
+        pd.testing.assert_series_equal(agg[key].sort_index(), rows[key].sort_index(), check_dtype=False,
+                                       check_names=False)
+    assert agg["perf_bucket"].tolist() == rows["perf_bucket"].tolist()
+
+
+def test_push_leaves_an_unbuilt_table_to_an_explicit_rebuild(tmp_path, capsys, fake_rows):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hr.db'}")
+    rng = np.random.default_rng(1)
+    ensure_schema(engine)
+    load_dataframe(fake_rows(500, rng), "merged_data", engine)  # rows from before upgrading
+
+    push.push_to_database(engine, fake_rows(100, rng), IdIndex(tmp_path / "pushed_ids.npy"))
+    assert "python etl/aggregates.py rebuild" in capsys.readouterr().out
+    with engine.connect() as conn:
+        assert read_aggregates(conn).empty
+
+    with engine.begin() as conn:
+        rebuild_aggregates(conn)
+    assert row_kpis(engine)[0] == aggregate_kpis(engine)[0]
+    assert aggregate_kpis(engine)[0]["total_employees"] == 600
+
+
+def test_an_unbuilt_counts_table_does_not_stop_the_kpi_updates(tmp_path, capsys, fake_rows):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hr.db'}")
+    rng = np.random.default_rng(2)
+    pushed_ids = IdIndex(tmp_path / "pushed_ids.npy")
+    push.push_to_database(engine, fake_rows(300, rng), pushed_ids)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"DELETE FROM {COUNTS_TABLE}")  # upgrading from before hr_kpi_counts
+
+    push.push_to_database(engine, fake_rows(100, rng), pushed_ids)
+    assert f"{COUNTS_TABLE} not built" in capsys.readouterr().out
+    assert row_kpis(engine)[0] == aggregate_kpis(engine)[0]
+    with engine.connect() as conn:
+        assert read_counts(conn).empty
+
+    with engine.begin() as conn:
+        rebuild_aggregates(conn)
+    assert_same_chart_data(engine)
+
+
+def test_overwritten_rows_move_between_aggregate_buckets(tmp_path, monkeypatch, fake_rows):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hr.db'}")
+    monkeypatch.setattr(push, "PUSH_UPSERT_MODE", "update")
+    df = fake_rows(400, np.random.default_rng(3))
+    push.push_to_database(engine, df, IdIndex(tmp_path / "pushed_ids.npy"))
+
+    changed = df.iloc[:150].assign(status="Exited", salary_band="A", performance_rating=1, exit_date="2025-02-03")
+    push.push_to_database(engine, changed, IdIndex(tmp_path / "again.npy"))
+
+    assert row_kpis(engine)[0] == aggregate_kpis(engine)[0]
+    assert_same_chart_data(engine)
@@ -0,0 +1,42 @@
+"""data_merger.merge_with_faker on a scratch data directory."""
+import pandas as pd
+
+from etl.data_merger import merge_with_faker
+from etl.internal_hrms_data_generator import stream_hrms_dummy_data
+from etl.review_store import ReviewStore
+from etl.storage import find_table
+
+SLUG = "nineleaps-technology-solutions"
+
+
+def reviews(start, n):
+    return pd.DataFrame({
+        "ReviewID": [f"R{i:05d}" for i in range(start, start + n)],
+        "Company": "Nineleaps Technology Solutions",
+        "JobTitle": "Data Engineer",
+        "Department": "Software Development Department",
+        "Location": "Bangalore / Bengaluru",
+        "ReviewDate": "2025-01-31",
+        "OverallRating": 4,
+        "Pros": "p",
+        "Cons": "c",
+    })
+
+
+def test_a_merge_without_fresh_reviews_returns_the_enriched_table(tmp_path):
+    data_dir = tmp_path / "data"
+    ReviewStore(data_dir / "review_store").append(SLUG, reviews(0, 40))
+    stream_hrms_dummy_data(200, seed=0, data_dir=data_dir, backup=False)
+    first = merge_with_faker(fake_count=10, seed=0, data_dir=data_dir, backup_dir=tmp_path / "Backup")
+    assert len(first) == 50
+
+    hrms_path = find_table(data_dir, "hrms_latest")
+    hidden = hrms_path.rename(tmp_path / hrms_path.name)  # nothing to enrich, so HRMS is not needed
+    again = merge_with_faker(fake_count=10, seed=0, data_dir=data_dir, backup_dir=tmp_path / "Backup")
+    assert again["review_id"].tolist() == first["review_id"].tolist()
+
+    hidden.rename(hrms_path)
+    ReviewStore(data_dir / "review_store").append(SLUG, reviews(40, 5))
+    grown = merge_with_faker(fake_count=10, seed=0, data_dir=data_dir, backup_dir=tmp_path / "Backup")
+    assert grown["review_id"].tolist()[:50] == first["review_id"].tolist() and len(grown) == 65
+
@@ -0,0 +1,86 @@
+"""db_loader.upsert_dataframe on PostgreSQL, plain and partitioned by review_date.
+
+Needs a scratch database: set TEST_DATABASE_URL (each test works in its own schema).
+"""
+import os
+import uuid
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, text
+
+from etl import push
+from etl.db_loader import ensure_schema, upsert_dataframe
+from etl.id_index import IdIndex
+from etl.migrate_schema import is_partitioned, migrate
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+
+@pytest.fixture(params=[False, True], ids=["plain", "partitioned"])
+def engine(request):
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    admin = create_engine(TEST_DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(TEST_DATABASE_URL, connect_args={"options": f"-csearch_path={schema}"})
+    ensure_schema(engine)
+    migrate(engine, partition=request.param)
+    yield engine
+    engine.dispose()
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    admin.dispose()
+
+
+def rows_for(engine, review_id):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT review_date::text FROM merged_data WHERE review_id = :id"),
+                            {"id": review_id}).scalars().all()
+
+
+@pytest.fixture
+def rows(fake_rows):
+    df = fake_rows(20, np.random.default_rng(0))
+    df["review_date"] = "2023-03-01"
+    return df
+
+
+def test_a_changed_review_date_updates_the_one_row(engine, rows):
+    upsert_dataframe(rows, "merged_data", engine)
+    moved = rows.iloc[:1].assign(review_date="2025-07-15", engagement_score=9.9)
+
+    for _ in range(2):
+        result = upsert_dataframe(moved, "merged_data", engine, mode="update")
+        assert (result["inserted"], result["updated"]) == (0, 1)
+
+    assert rows_for(engine, moved["review_id"].iloc[0]) == ["2025-07-15"]
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM merged_data")).scalar() == len(rows)
+
+
+def test_ignore_mode_skips_a_known_review_id_with_another_review_date(engine, rows):
+    upsert_dataframe(rows, "merged_data", engine)
+    moved = rows.iloc[:1].assign(review_date="2025-07-15")
+
+    for _ in range(2):
+        result = upsert_dataframe(moved, "merged_data", engine)
+        assert (result["inserted"], result["skipped"]) == (0, 1)
+
+    assert rows_for(engine, moved["review_id"].iloc[0]) == ["2023-03-01"]
+
+
+def test_push_records_only_the_rows_the_upsert_accepted(engine, rows, tmp_path):
+    with engine.connect() as conn:
+        partitioned = is_partitioned(conn)
+    rows.loc[0, "review_date"] = None
+    pushed_ids = IdIndex(tmp_path / "pushed_ids.npy")
+
+    result = push.push_to_database(engine, rows, pushed_ids)
+
+    no_date = rows["review_id"].iloc[0]
+    assert result["rejected"] == (1 if partitioned else 0)
+    assert (no_date in pushed_ids) is not partitioned  # a rejected row stays pending for the next push
+    assert pushed_ids.contains(rows["review_id"].iloc[1:]).all()
+    assert (result["inserted"], result["skipped"]) == (len(rows) - result["rejected"], 0)
@@ -0,0 +1,45 @@
+"""Streamed HRMS generation (etl/internal_hrms_data_generator.py) and its backups."""
+import pytest
+
+from etl import backup_store
+from etl.backup_store import BackupStore
+from etl.internal_hrms_data_generator import stream_hrms_dummy_data
+from etl.storage import read_table
+
+
+@pytest.fixture(autouse=True)
+def small_backup_chunks(monkeypatch):
+    monkeypatch.setattr(backup_store, "BACKUP_CHUNK_ROWS", 300)
+
+
+def chunk_files(backup_dir):
+    return sorted(p.name for p in (backup_dir / "chunks").glob("*/*"))
+
+
+@pytest.mark.parametrize("output_format", ["csv", "parquet"])
+def test_streamed_backups_go_through_the_deduplicated_store(tmp_path, output_format):
+    data_dir, backup_dir = tmp_path / "data", tmp_path / "Backup"
+    stream_hrms_dummy_data(1200, chunk_rows=500, output_format=output_format, seed=0, data_dir=data_dir,
+                           backup_dir=backup_dir)
+    first = chunk_files(backup_dir)
+    stream_hrms_dummy_data(1500, chunk_rows=500, output_format=output_format, seed=1, data_dir=data_dir,
+                           backup_dir=backup_dir)
+
+    assert sorted(p.name for p in backup_dir.iterdir()) == ["chunks", "manifests"]  # no full copies
+    assert len(first) == 4
+    assert set(first) < set(chunk_files(backup_dir)) and len(chunk_files(backup_dir)) == 5  # one new block
+    restored = BackupStore(backup_dir).restore("hrms_data")
+    table = read_table(data_dir / f"hrms_latest.{output_format}")
+    assert restored["employee_id"].tolist() == table["employee_id"].tolist()
+    assert restored["employee_id"].is_unique and len(restored) == 1500
+
+
+@pytest.mark.parametrize("existing, requested", [("parquet", "csv"), ("csv", "parquet")])
+def test_an_existing_table_in_the_other_format_is_not_counted_as_empty(tmp_path, existing, requested):
+    stream_hrms_dummy_data(500, output_format=existing, seed=0, data_dir=tmp_path, backup=False)
+    with pytest.raises(ValueError, match=f"hrms_latest.{existing}"):
+        stream_hrms_dummy_data(800, output_format=requested, seed=0, data_dir=tmp_path, backup=False)
+    assert not (tmp_path / f"hrms_latest.{requested}").exists()
+
+    assert stream_hrms_dummy_data(800, output_format=existing, seed=0, data_dir=tmp_path, backup=False) == 300
+    assert read_table(tmp_path / f"hrms_latest.{existing}")["employee_id"].is_unique
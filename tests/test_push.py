@@ -0,0 +1,75 @@
+"""push.py's per-sink ID indexes and pending rows, on SQLite and the Sheets stand-in."""
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+
+from benchmarks.sheets_standin import FakeSheetsService
+from etl import push
+from etl.db_loader import ensure_schema, load_dataframe
+from etl.storage import table_path, write_table
+
+SHEET = "Master Data"
+
+
+@pytest.fixture
+def upgraded(tmp_path, monkeypatch, fake_rows):
+    """A deployment from before the ID indexes: rows in merged_data and on the sheet, no index files."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'hr.db'}")
+    data_dir = tmp_path / "data"
+    df = fake_rows(300, np.random.default_rng(0))
+    old, new = df.iloc[:250], df.iloc[250:]
+    ensure_schema(engine)
+    load_dataframe(old, "merged_data", engine)
+    service = FakeSheetsService(sheets=(SHEET,))
+    rows = [df.columns.tolist()] + old.iloc[:240].astype(str).values.tolist()
+    service.spreadsheets().values().append(spreadsheetId="sheet-id", range=f"{SHEET}!A1", valueInputOption="RAW",
+                                           body={"values": rows}).execute()
+    write_table(df, table_path(data_dir, "reviews_enriched_latest", "parquet"))
+    monkeypatch.setattr(push, "get_sheets_service", lambda: service)
+    monkeypatch.setattr(push, "SHEET_NAME", SHEET)
+    return engine, data_dir, df, old, new
+
+
+def test_first_push_after_upgrading_sends_only_rows_the_sinks_lack(upgraded):
+    engine, data_dir, df, old, new = upgraded
+
+    pushed_ids = push.pushed_id_index(data_dir, engine)
+    sheets_ids = push.sheets_id_index(data_dir, pushed_ids)
+
+    assert len(pushed_ids) == len(old) and len(sheets_ids) == 240
+    db_df = push.pending_push_rows(df.iloc[0:0], data_dir, pushed_ids)
+    sheets_df = push.pending_push_rows(df.iloc[0:0], data_dir, sheets_ids)
+    assert sorted(db_df["review_id"]) == sorted(new["review_id"])
+    assert sorted(sheets_df["review_id"]) == sorted(old["review_id"].iloc[240:].tolist() + new["review_id"].tolist())
+
+
+def test_indexes_are_built_once(upgraded, monkeypatch):
+    engine, data_dir, df, old, new = upgraded
+    push.sheets_id_index(data_dir, push.pushed_id_index(data_dir, engine))
+    load_dataframe(new, "merged_data", engine)
+    monkeypatch.setattr(push, "get_sheets_service", lambda: pytest.fail("the sheet was read again"))
+
+    pushed_ids = push.pushed_id_index(data_dir, engine)
+    assert len(pushed_ids) == len(old)
+    assert len(push.sheets_id_index(data_dir, pushed_ids)) == 240
+
+
+def test_unreadable_sheet_falls_back_to_the_database_ids(upgraded, monkeypatch, capsys):
+    engine, data_dir, df, old, new = upgraded
+
+    def unavailable():
+        raise FileNotFoundError("credentials.json")
+
+    monkeypatch.setattr(push, "get_sheets_service", unavailable)
+    sheets_ids = push.sheets_id_index(data_dir, push.pushed_id_index(data_dir, engine))
+    assert len(sheets_ids) == len(old)
+    assert "Could not read review_ids from Google Sheets" in capsys.readouterr().out
+
+
+def test_fresh_deployment_starts_with_empty_indexes(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hr.db'}")
+    monkeypatch.setattr(push, "get_sheets_service", lambda: FakeSheetsService(sheets=(SHEET,)))
+    monkeypatch.setattr(push, "SHEET_NAME", SHEET)
+    pushed_ids = push.pushed_id_index(tmp_path, engine)
+    assert len(pushed_ids) == 0 and pushed_ids.exists()
+    assert len(push.sheets_id_index(tmp_path, pushed_ids)) == 0
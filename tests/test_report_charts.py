@@ -0,0 +1,42 @@
+"""Chart specs rendered on the forkserver chart pool (etl/report_charts.py)."""
+import numpy as np
+import pytest
+
+from etl import report_charts
+from etl.Email_Report import department_summary
+from etl.report_charts import chart_specs, render_specs
+from etl.report_sources import prepare_report_frame
+from etl.storage import with_categoricals
+
+
+@pytest.fixture(scope="module")
+def specs(fake_rows):
+    df = prepare_report_frame(with_categoricals(fake_rows(500, np.random.default_rng(0))))
+    return chart_specs(df, department_summary(df))
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool():
+    report_charts._discard_chart_pool()
+    yield
+    report_charts._discard_chart_pool()
+
+
+def test_pool_renders_the_same_pngs_as_serial(specs):
+    serial = render_specs(specs, workers=1)
+    assert report_charts._pool is None
+    assert render_specs(specs, workers=2) == serial
+
+
+def test_one_forkserver_pool_of_a_fixed_size_is_reused(specs):
+    render_specs(specs, workers=2)
+    pool = report_charts._pool
+    assert pool._mp_context.get_start_method() == "forkserver"
+    assert pool._max_workers == 2
+
+    render_specs(specs[:2], workers=2)
+    assert report_charts._pool is pool
+
+    render_specs(specs[:2], workers=3)  # another size replaces the pool rather than adding one
+    assert report_charts._pool is not pool and report_charts._pool._max_workers == 3
+    assert pool._shutdown_thread
@@ -0,0 +1,63 @@
+"""Email_Report.build_report on a SQLite stand-in for the postgres source."""
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from etl import Email_Report, push, report_sources
+from etl.aggregates import AGG_TABLE, COUNTS_TABLE
+from etl.Email_Report import build_report, compute_kpis, department_summary
+from etl.id_index import IdIndex
+from etl.report_charts import chart_specs, render_specs
+from etl.report_sources import load_from_postgres, prepare_report_frame
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch, fake_rows):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hr.db'}")
+    rng = np.random.default_rng(0)
+    pushed_ids = IdIndex(tmp_path / "pushed_ids.npy")
+    for _ in range(2):
+        push.push_to_database(engine, fake_rows(500, rng), pushed_ids)
+    monkeypatch.setattr(Email_Report, "get_engine", lambda: engine)
+    monkeypatch.setattr(report_sources, "get_engine", lambda: engine)
+    return engine
+
+
+def test_postgres_summary_comes_from_the_aggregates_without_reading_rows(engine, monkeypatch):
+    df = prepare_report_frame(load_from_postgres(engine))
+    monkeypatch.setattr(Email_Report, "load_report_data", lambda source: pytest.fail("rows were read"))
+
+    report = build_report("postgres", outputs=())
+
+    assert report["kpis"] == compute_kpis(df)
+    pd.testing.assert_frame_equal(report["dept_summary"], department_summary(df), check_dtype=False)
+    assert "load" not in report["timings"]
+
+
+def test_postgres_pdf_draws_its_charts_from_the_aggregates(engine, tmp_path, monkeypatch):
+    df = prepare_report_frame(load_from_postgres(engine))
+    from_rows = dict(render_specs(chart_specs(df, department_summary(df)), workers=1))
+    monkeypatch.setattr(Email_Report, "load_report_data", lambda source, log=None: pytest.fail("rows were read"))
+
+    report = build_report("postgres", outputs=("pdf",), output_dir=str(tmp_path))
+
+    assert "load" not in report["timings"] and (tmp_path / Email_Report.REPORT_PDF).exists()
+    charts = {p.name: p.read_bytes() for p in (tmp_path / "charts").iterdir()}
+    assert charts == from_rows  # pixel-identical to the charts drawn from the rows
+
+
+def test_charts_read_the_rows_while_the_chart_counts_are_empty(engine, tmp_path):
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"DELETE FROM {COUNTS_TABLE}")
+    report = build_report("postgres", outputs=("charts",), output_dir=str(tmp_path))
+    assert "load" in report["timings"]
+    assert len(list((tmp_path / "charts").iterdir())) == 7
+
+
+def test_falls_back_to_the_rows_while_the_aggregates_are_empty(engine):
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"DELETE FROM {AGG_TABLE}")
+    report = build_report("postgres", outputs=())
+    assert report["kpis"]["total_employees"] == 1000
+    assert "load" in report["timings"]
@@ -0,0 +1,65 @@
+"""Reports built on the long-lived worker process (etl/report_worker.py)."""
+import functools
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from etl.report_sources import load_from_local
+from etl.report_worker import run_report
+from etl.storage import table_path, with_categoricals, write_table
+
+
+@pytest.fixture
+def local_rows(tmp_path, fake_rows):
+    df = fake_rows(2000, np.random.default_rng(0))
+    write_table(with_categoricals(df), table_path(tmp_path, "reviews_enriched_latest", "parquet"))
+    return functools.partial(load_from_local, tmp_path)
+
+
+def test_concurrent_callers_get_their_own_output(local_rows, tmp_path):
+    results = {}
+
+    def build(report_type):
+        results[report_type] = run_report(data_source=local_rows, report_type=report_type,
+                                          output_dir=str(tmp_path / report_type))
+
+    threads = [threading.Thread(target=build, args=(report_type,)) for report_type in ("Full", "Summary")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for report_type, other in (("Full", "Summary"), ("Summary", "Full")):
+        success, output, error = results[report_type]
+        assert success, error
+        assert f"PDF {report_type} Report Generated" in output
+        assert f"PDF {other} Report Generated" not in output
+        assert (tmp_path / report_type / "HR_Analytics_Report.pdf").exists()
+
+
+def test_errors_come_back_with_the_traceback(tmp_path):
+    success, _, error = run_report(data_source="no-such-source", output_dir=str(tmp_path))
+    assert not success
+    assert "ValueError: Unknown report source" in error
+
+
+def test_a_stuck_report_times_out_and_the_worker_is_replaced(local_rows, tmp_path):
+    start = time.perf_counter()
+    success, _, error = run_report(timeout=1, data_source=functools.partial(time.sleep, 60),
+                                   output_dir=str(tmp_path))
+    assert not success and "did not finish within 1s" in error
+    assert time.perf_counter() - start < 10
+
+    success, _, error = run_report(data_source=local_rows, outputs=(), output_dir=str(tmp_path))
+    assert success, error
+
+
+def test_a_crashed_worker_is_replaced(local_rows, tmp_path):
+    success, _, error = run_report(data_source=functools.partial(os._exit, 1), output_dir=str(tmp_path))
+    assert not success and "crashed" in error
+
+    success, _, error = run_report(data_source=local_rows, outputs=(), output_dir=str(tmp_path))
+    assert success, error
@@ -0,0 +1,66 @@
+"""lxml and BeautifulSoup review parsers agree on the saved AmbitionBox pages in fixtures/ambitionbox."""
+from pathlib import Path
+
+import pytest
+
+from etl.review_parsers import parse_reviews_page
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "ambitionbox"
+PAGES = sorted(FIXTURES.glob("*.html"))
+
+# Reviews each page should yield (None: no review markup, i.e. past the last page)
+EXPECTED_COUNTS = {
+    "reviews_page.html": 3,
+    "missing_itemprops.html": 3,
+    "non_ascii_utf8.html": 2,
+    "non_ascii_no_charset.html": 2,
+    "empty_page.html": None,
+    "past_last_page.html": None,
+}
+
+
+def test_every_fixture_has_an_expected_count():
+    assert sorted(p.name for p in PAGES) == sorted(EXPECTED_COUNTS)
+
+
+@pytest.mark.parametrize("page", PAGES, ids=lambda p: p.name)
+def test_backends_agree(page):
+    content = page.read_bytes()
+    lxml_reviews = parse_reviews_page(content, "lxml")
+    assert lxml_reviews == parse_reviews_page(content, "bs4")
+    expected = EXPECTED_COUNTS[page.name]
+    assert (None if lxml_reviews is None else len(lxml_reviews)) == expected
+
+
+def test_fields_on_a_full_page():
+    first, second, third = parse_reviews_page((FIXTURES / "reviews_page.html").read_bytes(), "lxml")
+    assert first == {
+        "ReviewID": "rev-84312001",
+        "Company": "Nineleaps Technology Solutions",
+        "JobTitle": "Software Engineer",
+        "Department": "Engineering - Software & QA Department",
+        "Location": "Bangalore / Bengaluru",
+        "ReviewDate": "2025-07-28",
+        "OverallRating": "4",
+        "Pros": "Good learning curve & supportive team. Flexible hours.",
+        "Cons": "Appraisal cycle could be faster.",
+    }
+    assert (second["Department"], second["Pros"], second["Cons"]) == (
+        "Data Science & Analytics Department", "Colleagues.", "")
+    assert (third["Department"], third["Pros"], third["Cons"]) == ("", "", "No onsite opportunities.")
+
+
+def test_missing_itemprops_become_empty_strings():
+    reviews = parse_reviews_page((FIXTURES / "missing_itemprops.html").read_bytes(), "lxml")
+    assert [r["ReviewID"] for r in reviews] == ["rev-91000001", "rev-91000002", "rev-91000003"]
+    assert reviews[0]["JobTitle"] == reviews[0]["OverallRating"] == reviews[0]["Pros"] == ""
+    assert (reviews[1]["JobTitle"], reviews[1]["Location"], reviews[1]["Department"]) == ("Project Manager", "", "")
+
+
+def test_non_ascii_text_survives_with_and_without_a_charset():
+    with_charset = parse_reviews_page((FIXTURES / "non_ascii_utf8.html").read_bytes(), "bs4")
+    without_charset = parse_reviews_page((FIXTURES / "non_ascii_no_charset.html").read_bytes(), "lxml")
+    assert with_charset == without_charset
+    assert with_charset[0]["JobTitle"] == "डेटा इंजीनियर"
+    assert with_charset[0]["Cons"] == "वेतन वृद्धि धीमी है"
+    assert with_charset[1]["Pros"] == "Café, crèche & a façade of calm — “great” culture."
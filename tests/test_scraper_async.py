@@ -0,0 +1,94 @@
+"""The asyncio scraper engine against the local AmbitionBox stand-in."""
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.ambitionbox_standin import render_review_page, serve
+from etl import reviews_scraper
+from etl.http_session import ScraperSession
+from etl.reviews_scraper import TokenBucket, read_last_page, scrape_reviews
+
+SLUG = "acme"
+
+
+def review_pages(num_pages, per_page=3):
+    return [render_review_page([{
+        "ReviewID": f"review-{page}-{i}", "Company": "Acme", "JobTitle": "Engineer", "Location": "Pune",
+        "Department": "Engineering Department", "ReviewDate": "2025-01-01", "OverallRating": 4,
+        "Pros": f"page {page}", "Cons": "",
+    } for i in range(per_page)]) for page in range(1, num_pages + 1)]
+
+
+@pytest.fixture
+def standin():
+    servers = []
+
+    def start(pages, **kwargs):
+        server, url = serve(pages, **kwargs)
+        servers.append(server)
+        return server, f"{url}/reviews/{SLUG}-reviews"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def scrape(base_url, data_dir, num_pages, concurrency, delay=0):
+    session = ScraperSession(max_retries=0, backoff=0)
+    try:
+        return scrape_reviews(SLUG, num_pages=num_pages, delay=delay, save_csv=False, concurrency=concurrency,
+                              base_url=base_url, data_dir=data_dir, session=session, cache_pages=False)
+    finally:
+        session.close()
+
+
+def test_checkpoint_follows_page_order_when_pages_finish_out_of_order(standin, tmp_path, monkeypatch):
+    # Pages 2-4 finish before page 1; page 4 fails while later pages are already in flight
+    _, base_url = standin(review_pages(8), page_latency={1: 0.3}, fail_pages={4})
+    checkpoints = []
+    write_last_page = reviews_scraper.write_last_page
+    monkeypatch.setattr(reviews_scraper, "write_last_page",
+                        lambda path, page: (checkpoints.append(page), write_last_page(path, page)))
+
+    df = scrape(base_url, tmp_path, num_pages=6, concurrency=4)
+
+    assert checkpoints == [1, 2, 3]
+    assert read_last_page(tmp_path / f"{SLUG}_last_page.txt") == 3
+    assert sorted(df["Pros"].unique()) == ["page 1", "page 2", "page 3"]
+
+
+def test_rerun_resumes_after_the_failed_page(standin, tmp_path):
+    pages = review_pages(6)
+    _, base_url = standin(pages, fail_pages={3})
+    scrape(base_url, tmp_path, num_pages=6, concurrency=3)
+    assert read_last_page(tmp_path / f"{SLUG}_last_page.txt") == 2
+
+    _, base_url = standin(pages)
+    df = scrape(base_url, tmp_path, num_pages=4, concurrency=3)
+    assert read_last_page(tmp_path / f"{SLUG}_last_page.txt") == 6
+    assert sorted(df["Pros"].unique()) == ["page 3", "page 4", "page 5", "page 6"]
+
+
+def test_requests_respect_the_token_bucket_rate(standin, tmp_path):
+    rate = 20
+    server, base_url = standin(review_pages(10))
+    scrape(base_url, tmp_path, num_pages=10, concurrency=5, delay=1 / rate)
+
+    times = sorted(t for t, _ in server.request_log)
+    assert len(times) == 10
+    # A bucket of capacity 1 lets the first request through at once and one more every 1/rate seconds
+    assert times[-1] - times[0] >= (len(times) - 1) / rate * 0.9
+
+
+def test_token_bucket_allows_a_burst_of_capacity_then_the_rate():
+    async def acquire_all(bucket, n):
+        start = time.monotonic()
+        for _ in range(n):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(acquire_all(TokenBucket(rate=None), 50)) < 0.05
+    assert asyncio.run(acquire_all(TokenBucket(rate=50, capacity=5), 5)) < 0.05
+    elapsed = asyncio.run(acquire_all(TokenBucket(rate=50, capacity=1), 11))
+    assert 10 / 50 * 0.9 <= elapsed < 10 / 50 + 0.2
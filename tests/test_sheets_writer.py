@@ -0,0 +1,189 @@
+"""Batched, resumable Sheets writes (etl/sheets_writer.py) against the in-process Sheets stand-in."""
+import json
+
+import pandas as pd
+import pytest
+
+from benchmarks.sheets_standin import FakeHttpError, FakeSheetsService
+from etl import sheets_writer
+from etl.id_index import IdIndex
+from etl.sheets_writer import execute_with_retry, write_rows_resumable
+
+SHEET = "Master Data"
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(sheets_writer, "SHEETS_BACKOFF", 0.0)
+
+
+@pytest.fixture
+def sheets_ids(tmp_path):
+    return IdIndex(tmp_path / "sheets_ids.npy")
+
+
+def frame(rows, start=0):
+    return pd.DataFrame({
+        "review_id": [f"r{i}" for i in range(start, start + rows)],
+        "department": [f"Dept {i % 7}" for i in range(start, start + rows)],
+        "rating": [i % 5 + 0.5 for i in range(start, start + rows)],
+    })
+
+
+def record_writes(service):
+    """List that receives every value range written, as (A1 range, number of rows, payload bytes)."""
+    writes = []
+    batch_update_values = service._batch_update_values
+
+    def recorded(data):
+        for item in data:
+            writes.append((item["range"], len(item["values"]), len(json.dumps(item["values"]))))
+        return batch_update_values(data)
+
+    service._batch_update_values = recorded
+    return writes
+
+
+def data_rows(writes):
+    return [w for w in writes if not w[0].endswith("!A1")]
+
+
+def sheet_frame(service):
+    header, *rows = service.rows(SHEET)
+    return pd.DataFrame(rows, columns=header)
+
+
+def assert_each_row_once(service, df):
+    sheet = sheet_frame(service)
+    assert not sheet["review_id"].duplicated().any()
+    assert sorted(sheet["review_id"]) == sorted(df["review_id"])
+
+
+def test_writes_header_and_rows_within_the_row_and_byte_bounds(tmp_path, sheets_ids):
+    service = FakeSheetsService(sheets=(SHEET,))
+    writes = record_writes(service)
+    df = frame(2500)  # more rows than the stand-in's initial grid
+
+    written = write_rows_resumable(service, "sheet-id", SHEET, df, sheets_ids, progress_path=tmp_path / "progress.json",
+                                   batch_rows=300, max_bytes=4000)
+
+    assert written == len(df)
+    batches = data_rows(writes)
+    assert all(rows <= 300 and size <= 4000 for _, rows, size in batches)
+    assert max(rows for _, rows, _ in batches) < 300  # the byte bound halved the batches
+    sizes = [rows for _, rows, _ in batches]
+    assert sizes == sorted(sizes, reverse=True)  # a halved size carries over instead of restarting at 300
+    assert sum(rows for _, rows, _ in batches) == len(df)
+    pd.testing.assert_frame_equal(sheet_frame(service), df.astype(str))
+    assert len(sheets_ids) == len(df)
+
+
+def test_appends_below_existing_rows_without_a_second_header(tmp_path, sheets_ids):
+    service = FakeSheetsService(sheets=(SHEET,))
+    write_rows_resumable(service, "sheet-id", SHEET, frame(10), sheets_ids, progress_path=tmp_path / "progress.json")
+    write_rows_resumable(service, "sheet-id", SHEET, frame(15), sheets_ids, progress_path=tmp_path / "progress.json")
+    pd.testing.assert_frame_equal(sheet_frame(service), frame(15).astype(str))
+
+
+def test_retries_rate_limit_errors(sheets_ids):
+    service = FakeSheetsService(sheets=(SHEET,), fail_every=3)
+    df = frame(200)
+    assert write_rows_resumable(service, "sheet-id", SHEET, df, sheets_ids, batch_rows=20) == len(df)
+    assert service.rate_limited > 0
+    pd.testing.assert_frame_equal(sheet_frame(service), df.astype(str))
+
+
+def test_gives_up_after_max_retries_and_does_not_retry_client_errors():
+    class Failing:
+        def __init__(self, status):
+            self.status, self.attempts = status, 0
+
+        def execute(self):
+            self.attempts += 1
+            raise FakeHttpError(self.status, "error")
+
+    quota = Failing(429)
+    with pytest.raises(FakeHttpError):
+        execute_with_retry(quota, max_retries=3, backoff=0)
+    assert quota.attempts == 4
+
+    bad_request = Failing(400)
+    with pytest.raises(FakeHttpError):
+        execute_with_retry(bad_request, max_retries=3, backoff=0)
+    assert bad_request.attempts == 1
+
+
+def test_resumes_after_an_interruption_without_writing_a_row_twice(tmp_path, sheets_ids):
+    progress_path = tmp_path / "progress.json"
+    service = FakeSheetsService(sheets=(SHEET,), crash_after=8)
+    writes = record_writes(service)
+    df = frame(1000)
+
+    with pytest.raises(ConnectionError):
+        write_rows_resumable(service, "sheet-id", SHEET, df, sheets_ids, progress_path=progress_path, batch_rows=100)
+    before = sum(rows for _, rows, _ in data_rows(writes))
+    assert 0 < before < len(df)
+    assert len(sheets_ids) == before
+    assert json.loads(progress_path.read_text())["start_row"] == 2
+
+    service.crash_after = None
+    written = write_rows_resumable(service, "sheet-id", SHEET, df, sheets_ids, progress_path=progress_path,
+                                   batch_rows=100)
+
+    assert written == len(df) - before
+    ranges = [r for r, _, _ in data_rows(writes)]
+    assert len(ranges) == len(set(ranges))
+    assert sum(rows for _, rows, _ in data_rows(writes)) == len(df)
+    pd.testing.assert_frame_equal(sheet_frame(service), df.astype(str))
+    assert not progress_path.exists()
+
+    # A completed push of the same rows is a no-op
+    assert write_rows_resumable(service, "sheet-id", SHEET, df, sheets_ids, progress_path=progress_path) == 0
+    assert len(service.rows(SHEET)) == len(df) + 1
+
+
+def test_new_rows_joining_an_interrupted_push_do_not_duplicate_the_rows_already_sent(tmp_path, sheets_ids):
+    progress_path = tmp_path / "progress.json"
+    service = FakeSheetsService(sheets=(SHEET,), crash_after=6)
+    with pytest.raises(ConnectionError):
+        write_rows_resumable(service, "sheet-id", SHEET, frame(500), sheets_ids, progress_path=progress_path,
+                             batch_rows=100)
+    partial = len(service.rows(SHEET)) - 1
+    assert 0 < partial < 500
+
+    service.crash_after = None
+    grown = frame(700)  # new merged rows arrived before the next push
+    written = write_rows_resumable(service, "sheet-id", SHEET, grown, sheets_ids, progress_path=progress_path,
+                                   batch_rows=100)
+
+    assert written == len(grown) - partial
+    assert_each_row_once(service, grown)
+
+
+def test_rows_written_but_not_yet_recorded_are_read_back_from_the_sheet(tmp_path):
+    class LosesTheThirdBatch(IdIndex):
+        """Crashes after the third batch reached the sheet, before its ids were recorded."""
+        calls = 0
+
+        def add(self, ids):
+            self.calls += 1
+            if self.calls == 3:
+                raise ConnectionError("killed")
+            return super().add(ids)
+
+    progress_path = tmp_path / "progress.json"
+    service = FakeSheetsService(sheets=(SHEET,))
+    df = frame(500)
+    with pytest.raises(ConnectionError):
+        write_rows_resumable(service, "sheet-id", SHEET, df, LosesTheThirdBatch(tmp_path / "sheets_ids.npy"),
+                             progress_path=progress_path, batch_rows=100)
+    assert len(service.rows(SHEET)) - 1 == 300
+    sheets_ids = IdIndex(tmp_path / "sheets_ids.npy")
+    assert len(sheets_ids) == 200
+
+    written = write_rows_resumable(service, "sheet-id", SHEET, df, sheets_ids, progress_path=progress_path,
+                                   batch_rows=100)
+
+    assert written == 200
+    assert_each_row_once(service, df)
+    assert len(sheets_ids) == len(df)